@@ -0,0 +1,37 @@
+"""Add shared UNLOGGED rate-limit counter table.
+
+Revision ID: 0024_rate_limit_counters
+Revises: 0023_outbox_notify_trigger
+Create Date: 2026-10-17 09:00:00.000000
+
+Rollback safety notes:
+- Table is UNLOGGED: contents are truncated on crash recovery, which only resets rate-limit windows.
+- Rollback drops `rate_limit_counters`; no other tables are touched.
+"""
+
+from alembic import op
+
+
+revision = "0024_rate_limit_counters"
+down_revision = "0023_outbox_notify_trigger"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE UNLOGGED TABLE rate_limit_counters (
+            key VARCHAR(320) PRIMARY KEY,
+            tat DOUBLE PRECISION NOT NULL DEFAULT 0,
+            blocked_until DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at DOUBLE PRECISION NOT NULL DEFAULT 0
+        );
+        """
+    )
+    op.create_index("ix_rate_limit_counters_updated_at", "rate_limit_counters", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_counters_updated_at", table_name="rate_limit_counters")
+    op.drop_table("rate_limit_counters")
@@ -0,0 +1,34 @@
+"""Add (channel_id, id DESC) index for keyset chat history paging.
+
+Revision ID: 0025_chat_messages_keyset_index
+Revises: 0024_rate_limit_counters
+Create Date: 2026-10-17 12:00:00.000000
+
+Rollback safety notes:
+- Indexes are built and dropped CONCURRENTLY outside the migration transaction, so `chat_messages` stays writable.
+- The composite index replaces `ix_chat_messages_channel_id` (its leading column serves the same lookups).
+- Rollback recreates the single-column index before dropping the composite one.
+"""
+
+from alembic import op
+
+
+revision = "0025_chat_messages_keyset_index"
+down_revision = "0024_rate_limit_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_messages_channel_id_id "
+            "ON chat_messages (channel_id, id DESC)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chat_messages_channel_id")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chat_messages_channel_id ON chat_messages (channel_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chat_messages_channel_id_id")
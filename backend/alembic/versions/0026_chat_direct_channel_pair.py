@@ -0,0 +1,62 @@
+"""Add canonical member pair key to DIRECT chat channels.
+
+Revision ID: 0026_chat_direct_channel_pair
+Revises: 0025_chat_messages_keyset_index
+Create Date: 2026-10-17 13:00:00.000000
+
+Rollback safety notes:
+- Columns are nullable and only populated for DIRECT channels; other channel kinds are untouched.
+- Backfill keys each DIRECT channel with exactly two members. When several channels exist for the same pair, only
+  the oldest one is keyed; the duplicates keep working through their membership rows but are no longer returned by
+  `POST /chat/channels/direct`.
+- Rollback drops the unique constraint and both columns.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0026_chat_direct_channel_pair"
+down_revision = "0025_chat_messages_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_channels", sa.Column("direct_low_user_id", sa.Integer(), nullable=True))
+    op.add_column("chat_channels", sa.Column("direct_high_user_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        WITH pairs AS (
+            SELECT m.channel_id, MIN(m.user_id) AS low_user_id, MAX(m.user_id) AS high_user_id
+            FROM chat_members m
+            JOIN chat_channels c ON c.id = m.channel_id
+            WHERE c.kind = 'DIRECT'
+            GROUP BY m.channel_id
+            HAVING COUNT(DISTINCT m.user_id) = 2
+        ),
+        ranked AS (
+            SELECT
+                channel_id,
+                low_user_id,
+                high_user_id,
+                ROW_NUMBER() OVER (PARTITION BY low_user_id, high_user_id ORDER BY channel_id) AS pair_rank
+            FROM pairs
+        )
+        UPDATE chat_channels
+        SET direct_low_user_id = ranked.low_user_id, direct_high_user_id = ranked.high_user_id
+        FROM ranked
+        WHERE chat_channels.id = ranked.channel_id AND ranked.pair_rank = 1
+        """
+    )
+    op.create_unique_constraint(
+        "uq_chat_channels_direct_pair",
+        "chat_channels",
+        ["direct_low_user_id", "direct_high_user_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_chat_channels_direct_pair", "chat_channels", type_="unique")
+    op.drop_column("chat_channels", "direct_high_user_id")
+    op.drop_column("chat_channels", "direct_low_user_id")
@@ -4,19 +4,34 @@ from datetime import UTC, datetime
 
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from packaging.version import InvalidVersion, Version
-from sqlalchemy import select
+from packaging.version import Version
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import TokenPayloadError, decode_access_token
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.release_policy import ReleasePolicy
 from app.models.session import UserSession
 from app.models.user import User
+from app.services.auth_context_cache import (
+    CachedAuthContext,
+    attach_cached_instance,
+    auth_context_cache,
+    cached_context_is_usable,
+    detached_cached_instance,
+    snapshot_columns,
+)
 from app.services.content import content_contract_signature
-from app.services.release_policy import ensure_release_policy, evaluate_version
-from app.services.session_drain import enforce_session_drain
+from app.services.release_policy import (
+    ensure_release_policy,
+    evaluate_version,
+    get_release_policy_snapshot,
+    safe_version,
+)
+from app.services.session_drain import SESSION_DRAIN_STATE_DRAINING, enforce_session_drain
+from app.services.session_touch import session_touch_buffer
 
 security = HTTPBearer(auto_error=False)
 
@@ -36,6 +51,11 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def get_client_version(x_client_version: str | None = Header(default=None)) -> str | None:
     return x_client_version
 
@@ -56,40 +76,65 @@ def _unauthorized(message: str = "Authentication required") -> HTTPException:
 
 
 def _safe_version(raw: str | None) -> Version:
-    try:
-        return Version((raw or "0.0.0").strip() or "0.0.0")
-    except InvalidVersion:
-        return Version("0.0.0")
+    return safe_version(raw)
 
 
 def _requires_latest_build(version_status) -> bool:
     return _safe_version(version_status.client_version) < _safe_version(version_status.latest_version)
 
 
-def get_auth_context(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    client_version: str | None = Depends(get_client_version),
-    client_content_version: str | None = Depends(get_client_content_version),
-    client_content_contract: str | None = Depends(get_client_content_contract),
-) -> AuthContext:
-    if credentials is None or credentials.scheme.lower() != "bearer":
-        raise _unauthorized()
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
 
-    try:
-        payload = decode_access_token(credentials.credentials)
-    except TokenPayloadError as exc:
-        raise _unauthorized(str(exc)) from exc
 
-    session_id = str(payload["sid"])
-    user_id = int(payload["sub"])
+def _version_status_detail(evaluated, *, force_update: bool) -> dict:
+    return {
+        "client_version": evaluated.client_version,
+        "latest_version": evaluated.latest_version,
+        "min_supported_version": evaluated.min_supported_version,
+        "client_content_version_key": evaluated.client_content_version_key,
+        "latest_content_version_key": evaluated.latest_content_version_key,
+        "min_supported_content_version_key": evaluated.min_supported_content_version_key,
+        "enforce_after": evaluated.enforce_after.isoformat() if evaluated.enforce_after else None,
+        "update_available": evaluated.update_available,
+        "content_update_available": evaluated.content_update_available,
+        "force_update": force_update,
+        "update_feed_url": evaluated.update_feed_url,
+    }
+
+
+def _assert_content_contract(client_content_contract: str | None) -> None:
+    server_contract = content_contract_signature()
+    normalized_contract = (client_content_contract or "").strip()
+    if normalized_contract and normalized_contract != server_contract:
+        raise HTTPException(
+            status_code=status.HTTP_426_UPGRADE_REQUIRED,
+            detail={
+                "message": "Content contract mismatch. Update required before login.",
+                "code": "content_contract_mismatch",
+                "server_content_contract": server_contract,
+                "client_content_contract": normalized_contract,
+            },
+        )
+
 
+def _resolve_auth_context(
+    db: Session,
+    *,
+    session_id: str,
+    user_id: int,
+    client_version: str | None,
+    client_content_version: str | None,
+    client_content_contract: str | None,
+) -> CachedAuthContext:
     session = db.get(UserSession, session_id)
     if session is None or session.user_id != user_id:
         raise _unauthorized("Session not found")
     if session.revoked_at is not None:
         raise _unauthorized("Session revoked")
-    if session.expires_at <= datetime.now(UTC):
+    if _as_utc(session.expires_at) <= datetime.now(UTC):
         raise _unauthorized("Session expired")
 
     user = db.get(User, user_id)
@@ -109,12 +154,12 @@ def get_auth_context(
             },
         )
 
-    policy = ensure_release_policy(db)
-    evaluated = evaluate_version(
-        policy,
+    version_inputs = (
         client_version or session.client_version,
         client_content_version or session.client_content_version_key,
     )
+    policy = get_release_policy_snapshot(db)
+    evaluated = evaluate_version(policy, version_inputs[0], version_inputs[1])
     if _requires_latest_build(evaluated):
         session.revoked_at = datetime.now(UTC)
         db.add(session)
@@ -124,33 +169,10 @@ def get_auth_context(
             detail={
                 "message": "A newer client build is required before login.",
                 "code": "latest_build_required",
-                "version_status": {
-                    "client_version": evaluated.client_version,
-                    "latest_version": evaluated.latest_version,
-                    "min_supported_version": evaluated.min_supported_version,
-                    "client_content_version_key": evaluated.client_content_version_key,
-                    "latest_content_version_key": evaluated.latest_content_version_key,
-                    "min_supported_content_version_key": evaluated.min_supported_content_version_key,
-                    "enforce_after": evaluated.enforce_after.isoformat() if evaluated.enforce_after else None,
-                    "update_available": evaluated.update_available,
-                    "content_update_available": evaluated.content_update_available,
-                    "force_update": evaluated.force_update,
-                    "update_feed_url": evaluated.update_feed_url,
-                },
-            },
-        )
-    server_contract = content_contract_signature()
-    normalized_contract = (client_content_contract or "").strip()
-    if normalized_contract and normalized_contract != server_contract:
-        raise HTTPException(
-            status_code=status.HTTP_426_UPGRADE_REQUIRED,
-            detail={
-                "message": "Content contract mismatch. Update required before login.",
-                "code": "content_contract_mismatch",
-                "server_content_contract": server_contract,
-                "client_content_contract": normalized_contract,
+                "version_status": _version_status_detail(evaluated, force_update=evaluated.force_update),
             },
         )
+    _assert_content_contract(client_content_contract)
 
     if evaluated.force_update:
         session.revoked_at = datetime.now(UTC)
@@ -161,31 +183,143 @@ def get_auth_context(
             detail={
                 "message": "Update required before login",
                 "code": "force_update",
-                "version_status": {
-                    "client_version": evaluated.client_version,
-                    "latest_version": evaluated.latest_version,
-                    "min_supported_version": evaluated.min_supported_version,
-                    "client_content_version_key": evaluated.client_content_version_key,
-                    "latest_content_version_key": evaluated.latest_content_version_key,
-                    "min_supported_content_version_key": evaluated.min_supported_content_version_key,
-                    "enforce_after": evaluated.enforce_after.isoformat() if evaluated.enforce_after else None,
-                    "update_available": evaluated.update_available,
-                    "content_update_available": evaluated.content_update_available,
-                    "force_update": True,
-                    "update_feed_url": evaluated.update_feed_url,
-                },
+                "version_status": _version_status_detail(evaluated, force_update=True),
             },
         )
 
-    session.last_seen_at = datetime.now(UTC)
+    return CachedAuthContext(
+        session_id=session.id,
+        user_id=user.id,
+        session_values=snapshot_columns(session),
+        user_values=snapshot_columns(user),
+        version_inputs=version_inputs,
+        version_status=evaluated,
+        resolved_at=datetime.now(UTC),
+        policy_revision=policy.revision,
+    )
+
+
+def _touch_session(
+    db: Session,
+    entry: CachedAuthContext,
+    *,
+    client_version: str | None,
+    client_content_version: str | None,
+) -> CachedAuthContext:
+    values: dict[str, object] = {"last_seen_at": datetime.now(UTC)}
     if client_version:
-        session.client_version = client_version
+        values["client_version"] = client_version
     if client_content_version:
-        session.client_content_version_key = client_content_version
-    db.add(session)
+        values["client_content_version_key"] = client_content_version
+    touched = entry.with_session_values(values)
+    if settings.session_touch_write_behind_enabled:
+        session_touch_buffer.record(
+            touched.session_id,
+            last_seen_at=touched.session_values["last_seen_at"],
+            client_version=touched.session_values["client_version"],
+            client_content_version_key=touched.session_values["client_content_version_key"],
+        )
+        return touched
+    # Core UPDATE keeps the touch out of ORM flush events so it does not invalidate the cache entry.
+    db.execute(update(UserSession).where(UserSession.id == entry.session_id).values(**values))
     db.commit()
+    return touched
+
+
+def _is_cacheable(entry: CachedAuthContext) -> bool:
+    if entry.user_values.get("is_admin"):
+        return True
+    # Draining sessions need a per-request deadline check in enforce_session_drain.
+    return entry.session_values.get("drain_state") != SESSION_DRAIN_STATE_DRAINING
+
+
+def _auth_context_entry(
+    db: Session,
+    credentials: HTTPAuthorizationCredentials | None,
+    client_version: str | None,
+    client_content_version: str | None,
+    client_content_contract: str | None,
+) -> CachedAuthContext:
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise _unauthorized()
+
+    try:
+        payload = decode_access_token(credentials.credentials)
+    except TokenPayloadError as exc:
+        raise _unauthorized(str(exc)) from exc
+
+    session_id = str(payload["sid"])
+    user_id = int(payload["sub"])
+
+    entry = auth_context_cache.get(session_id)
+    if entry is not None:
+        version_inputs = (
+            client_version or entry.session_values.get("client_version"),
+            client_content_version or entry.session_values.get("client_content_version_key"),
+        )
+        if not cached_context_is_usable(
+            entry,
+            user_id=user_id,
+            version_inputs=version_inputs,
+            policy_revision=get_release_policy_snapshot(db).revision,
+            now=datetime.now(UTC),
+        ):
+            auth_context_cache.invalidate_session(session_id)
+            entry = None
+    if entry is None:
+        entry = _resolve_auth_context(
+            db,
+            session_id=session_id,
+            user_id=user_id,
+            client_version=client_version,
+            client_content_version=client_content_version,
+            client_content_contract=client_content_contract,
+        )
+    else:
+        _assert_content_contract(client_content_contract)
+
+    entry = _touch_session(
+        db,
+        entry,
+        client_version=client_version,
+        client_content_version=client_content_version,
+    )
+    if _is_cacheable(entry):
+        auth_context_cache.put(entry)
+    return entry
+
 
-    return AuthContext(user=user, session=session, version_status=evaluated)
+def get_auth_context(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    client_version: str | None = Depends(get_client_version),
+    client_content_version: str | None = Depends(get_client_content_version),
+    client_content_contract: str | None = Depends(get_client_content_contract),
+) -> AuthContext:
+    entry = _auth_context_entry(db, credentials, client_version, client_content_version, client_content_contract)
+    session = attach_cached_instance(db, UserSession, entry.session_values)
+    user = attach_cached_instance(db, User, entry.user_values)
+    return AuthContext(user=user, session=session, version_status=entry.version_status)
+
+
+async def get_async_auth_context(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    client_version: str | None = Depends(get_client_version),
+    client_content_version: str | None = Depends(get_client_content_version),
+    client_content_contract: str | None = Depends(get_client_content_contract),
+) -> AuthContext:
+    # Cache hits do no I/O; misses run the sync resolver on the async connection via greenlet.
+    entry = await db.run_sync(
+        _auth_context_entry,
+        credentials,
+        client_version,
+        client_content_version,
+        client_content_contract,
+    )
+    session = detached_cached_instance(UserSession, entry.session_values)
+    user = detached_cached_instance(User, entry.user_values)
+    return AuthContext(user=user, session=session, version_status=entry.version_status)
 
 
 def get_current_user(context: AuthContext = Depends(get_auth_context)) -> User:
@@ -5,12 +5,13 @@ from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from packaging.version import InvalidVersion, Version
+from packaging.version import Version
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import (
     AuthContext,
+    get_async_auth_context,
     get_auth_context,
     get_client_content_contract,
     get_client_content_version,
@@ -26,10 +27,8 @@ from app.core.security import (
     create_refresh_token,
     create_totp_secret,
     decode_access_token,
-    hash_password,
     hash_token,
     verify_totp_code,
-    verify_password,
 )
 from app.models.session import UserSession
 from app.models.user import User
@@ -46,6 +45,7 @@ from app.schemas.auth import (
 from app.schemas.common import VersionStatus
 from app.services.content import content_contract_signature
 from app.services.observability import record_auth_login_result
+from app.services.password_hashing import PasswordHashingBusyError, password_hashing_pool
 from app.services.security_events import write_security_event
 from app.services.rate_limit import (
     AUTH_ACCOUNT_RULE,
@@ -54,7 +54,7 @@ from app.services.rate_limit import (
     rate_limiter,
     request_ip,
 )
-from app.services.release_policy import ensure_release_policy, evaluate_version
+from app.services.release_policy import evaluate_version, get_release_policy_snapshot, safe_version
 from app.services.session_drain import enforce_session_drain
 from app.services.ws_ticket import issue_ws_ticket
 
@@ -83,10 +83,32 @@ def _version_status_payload(version_status) -> dict:
 
 
 def _safe_version(raw: str | None) -> Version:
+    return safe_version(raw)
+
+
+def _password_hashing_busy(exc: PasswordHashingBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "message": "Authentication is busy. Please try again shortly.",
+            "code": "auth_busy",
+            "retry_after_seconds": exc.retry_after_seconds,
+        },
+    )
+
+
+def _hash_password(password: str) -> str:
+    try:
+        return password_hashing_pool.hash(password)
+    except PasswordHashingBusyError as exc:
+        raise _password_hashing_busy(exc) from exc
+
+
+def _verify_password(password: str, password_hash: str) -> bool:
     try:
-        return Version((raw or "0.0.0").strip() or "0.0.0")
-    except InvalidVersion:
-        return Version("0.0.0")
+        return password_hashing_pool.verify(password, password_hash)
+    except PasswordHashingBusyError as exc:
+        raise _password_hashing_busy(exc) from exc
 
 
 def _requires_latest_build(version_status) -> bool:
@@ -216,13 +238,13 @@ def register(
     user = User(
         email=payload.email.lower(),
         display_name=payload.display_name.strip(),
-        password_hash=hash_password(payload.password),
+        password_hash=_hash_password(payload.password),
     )
     db.add(user)
     db.commit()
     db.refresh(user)
 
-    release_policy = ensure_release_policy(db)
+    release_policy = get_release_policy_snapshot(db)
     version_status = evaluate_version(release_policy, client_version or "0.0.0", client_content_version_key)
     if _requires_latest_build(version_status):
         raise HTTPException(
@@ -288,7 +310,7 @@ def login(
     ensure_not_rate_limited("auth_account", account_key, AUTH_ACCOUNT_RULE)
 
     user = db.execute(select(User).where(User.email == payload.email.lower())).scalar_one_or_none()
-    if user is None or not verify_password(payload.password, user.password_hash):
+    if user is None or not _verify_password(payload.password, user.password_hash):
         record_auth_login_result(False)
         rate_limiter.record_failure("auth_ip", ip_key, AUTH_IP_RULE)
         rate_limiter.record_failure("auth_account", account_key, AUTH_ACCOUNT_RULE)
@@ -321,7 +343,7 @@ def login(
         )
         raise
 
-    release_policy = ensure_release_policy(db)
+    release_policy = get_release_policy_snapshot(db)
     version_status = evaluate_version(release_policy, payload.client_version, payload.client_content_version_key)
     normalized_contract = (client_content_contract or "").strip()
     server_contract = content_contract_signature()
@@ -519,7 +541,7 @@ def refresh(
             },
         )
 
-    release_policy = ensure_release_policy(db)
+    release_policy = get_release_policy_snapshot(db)
     version_status = evaluate_version(release_policy, payload.client_version, payload.client_content_version_key)
     normalized_contract = (client_content_contract or "").strip()
     server_contract = content_contract_signature()
@@ -679,7 +701,7 @@ def create_ws_ticket(context: AuthContext = Depends(get_auth_context), db: Sessi
 
 
 @router.get("/me")
-def me(context: AuthContext = Depends(get_auth_context)):
+async def me(context: AuthContext = Depends(get_async_auth_context)):
     return {
         "user_id": context.user.id,
         "email": context.user.email,
@@ -5,9 +5,17 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import AuthContext, get_auth_context, get_db, require_admin_context
+from app.api.deps import (
+    AuthContext,
+    get_async_auth_context,
+    get_async_db,
+    get_auth_context,
+    get_db,
+    require_admin_context,
+)
 from app.core.config import settings
 from app.models.character import Character
 from app.models.level import Level
@@ -34,6 +42,7 @@ from app.services.content import (
 )
 from app.services.instance_manager import assign_session_world_instance
 from app.services.party_manager import get_active_party_for_user
+from app.services.realtime import realtime_hub
 from app.services.runtime_config import load_runtime_gameplay_config
 from app.services.world_entry_bridge import WorldEntryBridgeError, fetch_world_entry_bootstrap
 
@@ -490,10 +499,15 @@ def _version_status_model(context: AuthContext) -> VersionStatus:
 
 
 @router.get("", response_model=list[CharacterResponse])
-def list_characters(context: AuthContext = Depends(get_auth_context), db: Session = Depends(get_db)):
-    xp_per_level = _xp_per_level(db)
-    rows = db.execute(
-        select(Character).where(Character.user_id == context.user.id).order_by(Character.created_at.asc())
+async def list_characters(
+    context: AuthContext = Depends(get_async_auth_context),
+    db: AsyncSession = Depends(get_async_db),
+):
+    xp_per_level = await db.run_sync(_xp_per_level)
+    rows = (
+        await db.execute(
+            select(Character).where(Character.user_id == context.user.id).order_by(Character.created_at.asc())
+        )
     ).scalars()
     return [_to_response(row, xp_per_level=xp_per_level) for row in rows]
 
@@ -709,6 +723,8 @@ def bootstrap_character_world(
     context.session.current_location_y = world_y
     db.add(context.session)
     db.commit()
+    # Open /events/ws sockets pick the new instance/party up from the hub instead of re-reading the session.
+    realtime_hub.assign_user_scope(context.user.id, instance_id=assignment.instance_id, party_id=assignment.party_id)
     db.refresh(character)
     bridge_entry: dict = {"status": "skipped", "reason": "bridge_disabled"}
     if settings.world_service_world_entry_bridge_enabled:
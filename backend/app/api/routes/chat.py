@@ -1,49 +1,168 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime, timedelta
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import AuthContext, get_auth_context, get_db
+from app.api.deps import AuthContext, get_async_auth_context, get_async_db, get_auth_context, get_db
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.character import Character
 from app.models.chat import ChatChannel, ChatMember, ChatMessage
 from app.models.session import UserSession
 from app.models.user import User
 from app.schemas.chat import ChannelResponse, ChatMessageCreateRequest, ChatMessageResponse, DirectChannelRequest
+from app.services.chat_access_cache import chat_access_cache
+from app.services.chat_recent_cache import chat_recent_cache
+from app.services.chat_write_behind import chat_write_behind
 from app.services.rate_limit import CHAT_ACCOUNT_RULE, CHAT_IP_RULE, ensure_not_rate_limited, request_ip
 from app.services.realtime import ConnectionMeta, realtime_hub
-from app.services.release_policy import ensure_release_policy, evaluate_version
+from app.services.release_policy import evaluate_version, get_release_policy_snapshot
 from app.services.session_drain import enforce_session_drain
 from app.services.ws_ticket import WsTicketError, consume_ws_ticket
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-def _can_access_channel(db: Session, user_id: int, channel: ChatChannel) -> bool:
-    if channel.kind == "GLOBAL":
+def _member_channel_ids_query(user_id: int):
+    return select(ChatMember.channel_id).where(ChatMember.user_id == user_id)
+
+
+# Access answers are cached per user and channel; mapper events on ChatMember/ChatChannel invalidate them.
+def _can_access_channel(db: Session, user_id: int, channel_id: int) -> bool:
+    kind = chat_access_cache.channel_kind(channel_id)
+    if kind is None:
+        channel = db.get(ChatChannel, channel_id)
+        if channel is None:
+            return False
+        kind = channel.kind
+        chat_access_cache.put_channel_kind(channel_id, kind)
+    if kind == "GLOBAL":
         return True
-    member = db.execute(
-        select(ChatMember).where(and_(ChatMember.channel_id == channel.id, ChatMember.user_id == user_id))
-    ).scalar_one_or_none()
-    return member is not None
+    member_channel_ids = chat_access_cache.memberships(user_id)
+    if member_channel_ids is None:
+        member_channel_ids = frozenset(db.execute(_member_channel_ids_query(user_id)).scalars())
+        chat_access_cache.put_memberships(user_id, member_channel_ids)
+    return channel_id in member_channel_ids
+
+
+async def _can_access_channel_async(db: AsyncSession, user_id: int, channel_id: int) -> bool:
+    kind = chat_access_cache.channel_kind(channel_id)
+    if kind is None:
+        channel = await db.get(ChatChannel, channel_id)
+        if channel is None:
+            return False
+        kind = channel.kind
+        chat_access_cache.put_channel_kind(channel_id, kind)
+    if kind == "GLOBAL":
+        return True
+    member_channel_ids = chat_access_cache.memberships(user_id)
+    if member_channel_ids is None:
+        member_channel_ids = frozenset((await db.execute(_member_channel_ids_query(user_id))).scalars())
+        chat_access_cache.put_memberships(user_id, member_channel_ids)
+    return channel_id in member_channel_ids
+
+
+def _direct_channel_insert(db: Session):
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(ChatChannel)
+    return postgresql.insert(ChatChannel)
 
 
 def _to_channel_response(channel: ChatChannel) -> ChannelResponse:
     return ChannelResponse(id=channel.id, name=channel.name, kind=channel.kind, guild_id=channel.guild_id)
 
 
-def _require_selected_character(db: Session, user_id: int) -> None:
-    selected = db.execute(
-        select(Character.id).where(and_(Character.user_id == user_id, Character.is_selected.is_(True)))
-    ).scalar_one_or_none()
-    if selected is None:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={"message": "Character must be selected before using in-game chat", "code": "character_required"},
+def _to_message_response(message: ChatMessage, sender_display_name: str) -> ChatMessageResponse:
+    return ChatMessageResponse(
+        id=message.id,
+        channel_id=message.channel_id,
+        sender_user_id=message.sender_user_id,
+        sender_display_name=sender_display_name,
+        content=message.content,
+        created_at=message.created_at,
+    )
+
+
+def _persist_message(
+    db: Session,
+    *,
+    channel_id: int,
+    sender_user_id: int,
+    sender_display_name: str,
+    content: str,
+) -> ChatMessageResponse:
+    message_id = chat_write_behind.allocate_id() if chat_write_behind.accepting else None
+    if message_id is not None:
+        created_at = datetime.now(UTC)
+        response = ChatMessageResponse(
+            id=message_id,
+            channel_id=channel_id,
+            sender_user_id=sender_user_id,
+            sender_display_name=sender_display_name,
+            content=content,
+            created_at=created_at,
         )
+        encoded = response.model_dump_json()
+        values = {
+            "id": message_id,
+            "channel_id": channel_id,
+            "sender_user_id": sender_user_id,
+            "content": content,
+            "created_at": created_at,
+        }
+        if chat_write_behind.submit(values, encoded):
+            chat_recent_cache.append(channel_id, message_id, encoded)
+            return response
+
+    message = ChatMessage(id=message_id, channel_id=channel_id, sender_user_id=sender_user_id, content=content)
+    db.add(message)
+    db.commit()
+    db.refresh(message)
+    response = _to_message_response(message, sender_display_name)
+    chat_recent_cache.append(channel_id, message.id, response.model_dump_json())
+    return response
+
+
+def _selected_character_query(user_id: int):
+    return select(Character.id).where(and_(Character.user_id == user_id, Character.is_selected.is_(True)))
+
+
+def _character_required() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail={"message": "Character must be selected before using in-game chat", "code": "character_required"},
+    )
+
+
+def _has_selected_character(db: Session, user_id: int) -> bool:
+    if chat_access_cache.selected_character(user_id) is not None:
+        return True
+    character_id = db.execute(_selected_character_query(user_id)).scalar_one_or_none()
+    if character_id is None:
+        return False
+    chat_access_cache.put_selected_character(user_id, character_id)
+    return True
+
+
+def _require_selected_character(db: Session, user_id: int) -> None:
+    if not _has_selected_character(db, user_id):
+        raise _character_required()
+
+
+async def _require_selected_character_async(db: AsyncSession, user_id: int) -> None:
+    if chat_access_cache.selected_character(user_id) is not None:
+        return
+    character_id = (await db.execute(_selected_character_query(user_id))).scalar_one_or_none()
+    if character_id is None:
+        raise _character_required()
+    chat_access_cache.put_selected_character(user_id, character_id)
 
 
 @router.get("/channels", response_model=list[ChannelResponse])
@@ -79,64 +198,116 @@ def create_or_get_direct_channel(
             detail={"message": "Target user not found", "code": "target_not_found"},
         )
 
-    rows = db.execute(
-        select(ChatChannel)
-        .join(ChatMember, ChatMember.channel_id == ChatChannel.id)
-        .where(ChatChannel.kind == "DIRECT")
-    ).scalars().all()
-
-    for channel in rows:
-        members = db.execute(select(ChatMember.user_id).where(ChatMember.channel_id == channel.id)).scalars().all()
-        if sorted(members) == sorted([context.user.id, payload.target_user_id]):
-            return _to_channel_response(channel)
+    low_user_id, high_user_id = sorted((context.user.id, target_user.id))
+    pair_query = select(ChatChannel).where(
+        ChatChannel.direct_low_user_id == low_user_id,
+        ChatChannel.direct_high_user_id == high_user_id,
+    )
+    existing = db.execute(pair_query).scalar_one_or_none()
+    if existing is not None:
+        return _to_channel_response(existing)
 
     ordered = sorted([context.user.display_name, target_user.display_name])
-    channel = ChatChannel(name=f"DM: {ordered[0]} / {ordered[1]}", kind="DIRECT")
-    db.add(channel)
-    db.commit()
-    db.refresh(channel)
+    channel_id = db.execute(
+        _direct_channel_insert(db)
+        .values(
+            name=f"DM: {ordered[0]} / {ordered[1]}",
+            kind="DIRECT",
+            direct_low_user_id=low_user_id,
+            direct_high_user_id=high_user_id,
+        )
+        .on_conflict_do_nothing(index_elements=["direct_low_user_id", "direct_high_user_id"])
+        .returning(ChatChannel.id)
+    ).scalar_one_or_none()
+    if channel_id is None:
+        # A concurrent open of the same pair won the insert; its channel and members are committed by now.
+        db.rollback()
+        return _to_channel_response(db.execute(pair_query).scalar_one())
 
-    db.add(ChatMember(channel_id=channel.id, user_id=context.user.id))
-    db.add(ChatMember(channel_id=channel.id, user_id=target_user.id))
+    db.add(ChatMember(channel_id=channel_id, user_id=context.user.id))
+    db.add(ChatMember(channel_id=channel_id, user_id=target_user.id))
     db.commit()
 
-    return _to_channel_response(channel)
+    return _to_channel_response(db.get(ChatChannel, channel_id))
+
+
+def _settled_prefix(channel_id: int, messages: list[ChatMessage]) -> list[ChatMessage]:
+    # Ids are reserved in leased blocks per worker and rows commit in batches, so a lower id can still become
+    # visible shortly after a higher one. An after_id page therefore stops before any row that a lower,
+    # not-yet-visible id could still precede: rows behind a locally queued id, or rows newer than the settle
+    # window (id lease + flush delay). The client's next catch-up read picks them up.
+    floor = chat_write_behind.lowest_pending_id(channel_id)
+    horizon = datetime.now(UTC) - timedelta(seconds=max(0.0, settings.chat_after_id_settle_seconds))
+    settled: list[ChatMessage] = []
+    for message in messages:
+        created_at = message.created_at if message.created_at.tzinfo else message.created_at.replace(tzinfo=UTC)
+        if (floor is not None and message.id >= floor) or created_at > horizon:
+            break
+        settled.append(message)
+    return settled
 
 
 @router.get("/messages", response_model=list[ChatMessageResponse])
-def list_messages(
+async def list_messages(
     channel_id: int = Query(..., ge=1),
     limit: int = Query(default=100, ge=1, le=500),
-    context: AuthContext = Depends(get_auth_context),
-    db: Session = Depends(get_db),
+    before_id: int | None = Query(default=None, ge=1),
+    after_id: int | None = Query(default=None, ge=0),
+    context: AuthContext = Depends(get_async_auth_context),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    _require_selected_character(db, context.user.id)
-    channel = db.get(ChatChannel, channel_id)
-    if channel is None or not _can_access_channel(db, context.user.id, channel):
+    await _require_selected_character_async(db, context.user.id)
+    if not await _can_access_channel_async(db, context.user.id, channel_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"message": "Channel not found", "code": "channel_not_found"},
         )
 
-    rows = db.execute(
-        select(ChatMessage, User)
-        .join(User, User.id == ChatMessage.sender_user_id)
-        .where(ChatMessage.channel_id == channel_id)
-        .order_by(ChatMessage.created_at.desc())
-        .limit(limit)
-    ).all()
-    rows.reverse()
-    return [
-        ChatMessageResponse(
-            id=message.id,
-            channel_id=message.channel_id,
-            sender_user_id=message.sender_user_id,
-            sender_display_name=user.display_name,
-            content=message.content,
-            created_at=message.created_at,
+    if before_id is None and after_id is None:
+        cached = chat_recent_cache.newest(channel_id, limit)
+        if cached is not None:
+            return Response(content=f"[{','.join(cached)}]", media_type="application/json")
+
+    # A newest-page miss loads the full ring so the following reads are served from memory.
+    prime = before_id is None and after_id is None and chat_recent_cache.enabled and limit <= chat_recent_cache.capacity
+    prime_version = chat_recent_cache.write_version() if prime else 0
+    fetch = chat_recent_cache.capacity if prime else limit
+
+    # Keyset paging on (channel_id, id DESC): every page is an index range scan, however deep the history.
+    query = select(ChatMessage).where(ChatMessage.channel_id == channel_id)
+    if before_id is not None:
+        query = query.where(ChatMessage.id < before_id)
+    if after_id is not None:
+        query = query.where(ChatMessage.id > after_id)
+    if after_id is not None and before_id is None:
+        messages = _settled_prefix(
+            channel_id, list((await db.execute(query.order_by(ChatMessage.id.asc()).limit(fetch))).scalars())
         )
-        for message, user in rows
+    else:
+        messages = list((await db.execute(query.order_by(ChatMessage.id.desc()).limit(fetch))).scalars())
+        messages.reverse()
+
+    sender_ids = {message.sender_user_id for message in messages}
+    names = (
+        dict((await db.execute(select(User.id, User.display_name).where(User.id.in_(sender_ids)))).all())
+        if sender_ids
+        else {}
+    )
+    responses = [
+        _to_message_response(message, names.get(message.sender_user_id, f"user:{message.sender_user_id}"))
+        for message in messages
     ]
+    if prime:
+        # Rows still queued for write-behind are in no query result yet; keep them in the ring.
+        persisted = {response.id for response in responses}
+        chat_recent_cache.prime(
+            channel_id,
+            [(response.id, response.model_dump_json()) for response in responses]
+            + [item for item in chat_write_behind.pending_for_channel(channel_id) if item[0] not in persisted],
+            version=prime_version,
+        )
+        responses = responses[-limit:]
+    return responses
 
 
 @router.post("/messages", response_model=ChatMessageResponse)
@@ -149,29 +320,20 @@ async def create_message(
     _require_selected_character(db, context.user.id)
     ensure_not_rate_limited("chat_ip", f"ip:{request_ip(request)}", CHAT_IP_RULE)
     ensure_not_rate_limited("chat_account", f"acct:{context.user.id}", CHAT_ACCOUNT_RULE)
-    channel = db.get(ChatChannel, payload.channel_id)
-    if channel is None or not _can_access_channel(db, context.user.id, channel):
+    if not _can_access_channel(db, context.user.id, payload.channel_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={"message": "Channel not found", "code": "channel_not_found"},
         )
 
-    message = ChatMessage(
+    # Queue backpressure and the inline fallback both block, so persistence runs off the event loop.
+    response = await run_in_threadpool(
+        _persist_message,
+        db,
         channel_id=payload.channel_id,
         sender_user_id=context.user.id,
-        content=payload.content.strip(),
-    )
-    db.add(message)
-    db.commit()
-    db.refresh(message)
-
-    response = ChatMessageResponse(
-        id=message.id,
-        channel_id=message.channel_id,
-        sender_user_id=message.sender_user_id,
         sender_display_name=context.user.display_name,
-        content=message.content,
-        created_at=message.created_at,
+        content=payload.content.strip(),
     )
 
     await realtime_hub.broadcast(
@@ -221,13 +383,10 @@ async def chat_ws(websocket: WebSocket):
         if session.revoked_at is not None:
             await websocket.close(code=4401, reason="Session revoked")
             return
-        selected_character = db.execute(
-            select(Character.id).where(and_(Character.user_id == user_id, Character.is_selected.is_(True)))
-        ).scalar_one_or_none()
-        if selected_character is None:
+        if not _has_selected_character(db, user_id):
             await websocket.close(code=4403, reason="Character required")
             return
-        if not _can_access_channel(db, user_id, channel):
+        if not _can_access_channel(db, user_id, channel_id):
             await websocket.close(code=4403, reason="Channel access denied")
             return
 
@@ -247,7 +406,7 @@ async def chat_ws(websocket: WebSocket):
             await websocket.close(code=4401, reason="Publish drain cutoff reached")
             return
 
-        policy = ensure_release_policy(db)
+        policy = get_release_policy_snapshot(db)
         effective_content_version_key = client_content_version_key or session.client_content_version_key
         version_status = evaluate_version(policy, client_version, effective_content_version_key)
         if version_status.force_update and not user.is_admin:
@@ -285,6 +444,7 @@ async def chat_ws(websocket: WebSocket):
 
         while True:
             data = await websocket.receive_text()
+            realtime_hub.touch(websocket)
             if data.strip().lower() == "ping":
                 await websocket.send_text(json.dumps({"type": "pong"}))
                 continue
@@ -314,23 +474,19 @@ async def chat_ws(websocket: WebSocket):
                     )
                 )
                 continue
-            msg = ChatMessage(channel_id=channel_id, sender_user_id=user_id, content=content)
-            db.add(msg)
-            db.commit()
-            db.refresh(msg)
-
+            response = await run_in_threadpool(
+                _persist_message,
+                db,
+                channel_id=channel_id,
+                sender_user_id=user_id,
+                sender_display_name=user.display_name,
+                content=content,
+            )
             await realtime_hub.broadcast(
                 channel_id,
                 {
                     "type": "chat_message",
-                    "message": {
-                        "id": msg.id,
-                        "channel_id": msg.channel_id,
-                        "sender_user_id": msg.sender_user_id,
-                        "sender_display_name": user.display_name,
-                        "content": msg.content,
-                        "created_at": msg.created_at.isoformat(),
-                    },
+                    "message": response.model_dump(mode="json"),
                 },
             )
     except WebSocketDisconnect:
@@ -6,6 +6,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import SessionLocal
 from app.models.character import Character
 from app.models.level import Level
@@ -19,9 +20,10 @@ from app.services.observability import (
     record_zone_scope_update,
 )
 from app.services.realtime import ConnectionMeta, realtime_hub
-from app.services.release_policy import ensure_release_policy, evaluate_version
+from app.services.release_policy import evaluate_version, get_release_policy_snapshot
 from app.services.session_drain import enforce_session_drain
 from app.services.ws_ticket import WsTicketError, consume_ws_ticket
+from app.services.zone_presence import zone_presence_aggregator
 
 router = APIRouter(prefix="/events", tags=["events"])
 
@@ -31,6 +33,11 @@ async def events_ws(websocket: WebSocket):
     ws_ticket = websocket.query_params.get("ticket")
     client_version = websocket.query_params.get("client_version") or "0.0.0"
     client_content_version_key = websocket.query_params.get("client_content_version_key")
+    resume_stream = websocket.query_params.get("resume_stream")
+    try:
+        resume_from_seq = int(websocket.query_params["resume_from_seq"])
+    except (KeyError, TypeError, ValueError):
+        resume_from_seq = None
     if ws_ticket is None:
         record_ws_disconnect("missing_ticket")
         await websocket.close(code=4401, reason="Missing ticket")
@@ -59,7 +66,7 @@ async def events_ws(websocket: WebSocket):
             await websocket.close(code=4401, reason="Session revoked")
             return
 
-        policy = ensure_release_policy(db)
+        policy = get_release_policy_snapshot(db)
         effective_content_key = client_content_version_key or session.client_content_version_key
         version_status = evaluate_version(policy, client_version, effective_content_key)
         if version_status.force_update and not user.is_admin:
@@ -104,7 +111,7 @@ async def events_ws(websocket: WebSocket):
             if current_level is not None:
                 initial_hub_zone = bool(current_level.is_town_hub)
 
-        await realtime_hub.connect(
+        resume = await realtime_hub.connect(
             websocket,
             ConnectionMeta(
                 user_id=user_id,
@@ -121,7 +128,10 @@ async def events_ws(websocket: WebSocket):
                         )
                     ).scalar_one_or_none()
                 ),
+                resumable=True,
             ),
+            resume_stream=resume_stream,
+            resume_from_seq=resume_from_seq,
         )
         await websocket.send_text(
             json.dumps(
@@ -132,6 +142,9 @@ async def events_ws(websocket: WebSocket):
                     "party_id": session.current_party_id,
                     "level_id": session.current_level_id,
                     "is_hub_zone": initial_hub_zone,
+                    "stream_id": resume.stream_id if resume is not None else None,
+                    "last_event_seq": resume.last_event_seq if resume is not None else 0,
+                    "resume": resume.status if resume is not None else None,
                 }
             )
         )
@@ -150,6 +163,7 @@ async def events_ws(websocket: WebSocket):
 
         while True:
             data = await websocket.receive_text()
+            realtime_hub.touch(websocket)
             if data.strip().lower() == "ping":
                 await websocket.send_text(json.dumps({"type": "pong"}))
                 continue
@@ -238,18 +252,27 @@ async def events_ws(websocket: WebSocket):
                     location_y = int(location_y) if location_y is not None else None
                 except (TypeError, ValueError):
                     location_y = None
+                update = {
+                    "user_id": user_id,
+                    "character_id": character_id,
+                    "level_id": level_id,
+                    "location_x": location_x,
+                    "location_y": location_y,
+                }
+                sender_meta = realtime_hub.connection_meta(websocket)
+                instance_id = sender_meta.instance_id if sender_meta is not None else None
+                if settings.zone_presence_conflation_enabled:
+                    zone_presence_aggregator.submit(
+                        zone_level_id=level_id, user_id=user_id, update=update, instance_id=instance_id
+                    )
+                    continue
                 await realtime_hub.broadcast_zone(
                     zone_level_id=level_id,
                     include_adjacent_preview=True,
                     exclude_user_id=user_id,
-                    payload={
-                        "type": "zone_presence",
-                        "user_id": user_id,
-                        "character_id": character_id,
-                        "level_id": level_id,
-                        "location_x": location_x,
-                        "location_y": location_y,
-                    },
+                    conflate_key=f"zone_presence:{user_id}",
+                    instance_id=instance_id,
+                    payload={"type": "zone_presence", **update},
                 )
     except WebSocketDisconnect:
         record_ws_disconnect("client_disconnect")
@@ -26,6 +26,7 @@ from app.schemas.gameplay import (
     WorldSyncRequest,
     WorldSyncResponse,
 )
+from app.services.audit_sink import audit_sink
 from app.services.gameplay_authority import movement_sanity_ok, resolve_combat_and_rewards
 from app.services.observability import record_world_sync_result
 from app.services.security_events import write_security_event
@@ -69,18 +70,30 @@ def _audit_action(
     action_type: str,
     accepted: bool,
     reason_code: str,
+    deferred: bool = False,
 ) -> None:
-    db.add(
-        GameplayActionAudit(
-            session_id=context.session.id,
-            user_id=context.user.id,
-            character_id=character_id,
-            action_nonce=nonce,
-            action_type=action_type,
-            accepted=accepted,
-            reason_code=reason_code,
-        )
-    )
+    values = {
+        "session_id": context.session.id,
+        "user_id": context.user.id,
+        "character_id": character_id,
+        "action_nonce": nonce,
+        "action_type": action_type,
+        "accepted": accepted,
+        "reason_code": reason_code,
+        "created_at": datetime.now(UTC),
+    }
+    # Accepted rows stay in the request transaction: their nonce constraint guards replays.
+    if deferred and audit_sink.enqueue(GameplayActionAudit, values):
+        return
+    db.add(GameplayActionAudit(**values))
+
+
+def _finish_rejected_action(db: Session) -> None:
+    # Rejections only read before writing their audit rows, so anything pending is an inline fallback row.
+    if db.new:
+        db.commit()
+    else:
+        db.rollback()
 
 
 @router.post("/resolve-action", response_model=ResolveActionResponse)
@@ -112,6 +125,7 @@ def resolve_action(
             action_type=payload.action_type,
             accepted=False,
             reason_code="movement_sanity_failed",
+            deferred=True,
         )
         write_security_event(
             db,
@@ -127,7 +141,7 @@ def resolve_action(
                 "previous_y": context.session.current_location_y,
             },
         )
-        db.commit()
+        _finish_rejected_action(db)
         return ResolveActionResponse(
             accepted=False,
             reason_code="movement_sanity_failed",
@@ -141,9 +155,10 @@ def resolve_action(
             character_experience=character.experience,
         )
 
+    # Paced against accepted actions only: rejected rows go through the audit sink and may not be written yet.
     latest = db.execute(
         select(GameplayActionAudit)
-        .where(GameplayActionAudit.session_id == context.session.id)
+        .where(GameplayActionAudit.session_id == context.session.id, GameplayActionAudit.accepted.is_(True))
         .order_by(desc(GameplayActionAudit.id))
         .limit(1)
     ).scalar_one_or_none()
@@ -158,6 +173,7 @@ def resolve_action(
                 action_type=payload.action_type,
                 accepted=False,
                 reason_code="action_rate_limited",
+                deferred=True,
             )
             write_security_event(
                 db,
@@ -167,7 +183,7 @@ def resolve_action(
                 session_id=context.session.id,
                 detail={"character_id": character.id, "elapsed_seconds": elapsed},
             )
-            db.commit()
+            _finish_rejected_action(db)
             return ResolveActionResponse(
                 accepted=False,
                 reason_code="action_rate_limited",
@@ -2,9 +2,17 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import AuthContext, get_auth_context, get_db, require_admin_context
+from app.api.deps import (
+    AuthContext,
+    get_async_auth_context,
+    get_async_db,
+    get_auth_context,
+    get_db,
+    require_admin_context,
+)
 from app.models.level import Level
 from app.schemas.level import (
     LevelGridPoint,
@@ -537,8 +545,12 @@ def save_level_order(
 
 
 @router.get("/{level_id}", response_model=LevelResponse)
-def get_level(level_id: int, context: AuthContext = Depends(get_auth_context), db: Session = Depends(get_db)):
-    level = db.get(Level, level_id)
+async def get_level(
+    level_id: int,
+    context: AuthContext = Depends(get_async_auth_context),
+    db: AsyncSession = Depends(get_async_db),
+):
+    level = await db.get(Level, level_id)
     if level is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends
 from sqlalchemy import and_, select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import AuthContext, get_auth_context, get_db
+from app.api.deps import AuthContext, get_async_auth_context, get_async_db
 from app.models.chat import ChatChannel, ChatMember
 from app.models.guild import Guild, GuildMember
 from app.models.user import Friendship, User
@@ -16,30 +16,39 @@ router = APIRouter(prefix="/lobby", tags=["lobby"])
 
 
 @router.get("/overview", response_model=LobbyOverviewResponse)
-def lobby_overview(context: AuthContext = Depends(get_auth_context), db: Session = Depends(get_db)):
-    friend_rows = db.execute(
-        select(Friendship, User)
-        .join(User, User.id == Friendship.friend_user_id)
-        .where(and_(Friendship.user_id == context.user.id, Friendship.status == "accepted"))
+async def lobby_overview(
+    context: AuthContext = Depends(get_async_auth_context),
+    db: AsyncSession = Depends(get_async_db),
+):
+    friend_rows = (
+        await db.execute(
+            select(Friendship, User)
+            .join(User, User.id == Friendship.friend_user_id)
+            .where(and_(Friendship.user_id == context.user.id, Friendship.status == "accepted"))
+        )
     ).all()
     friends = [
         FriendResponse(user_id=user.id, display_name=user.display_name, status=friendship.status)
         for friendship, user in friend_rows
     ]
 
-    guild_rows = db.execute(
-        select(GuildMember, Guild)
-        .join(Guild, Guild.id == GuildMember.guild_id)
-        .where(GuildMember.user_id == context.user.id)
+    guild_rows = (
+        await db.execute(
+            select(GuildMember, Guild)
+            .join(Guild, Guild.id == GuildMember.guild_id)
+            .where(GuildMember.user_id == context.user.id)
+        )
     ).all()
 
     guilds: list[GuildResponse] = []
     for guild_member, guild in guild_rows:
-        member_rows = db.execute(
-            select(GuildMember, User)
-            .join(User, User.id == GuildMember.user_id)
-            .where(GuildMember.guild_id == guild.id)
-            .order_by(User.display_name.asc())
+        member_rows = (
+            await db.execute(
+                select(GuildMember, User)
+                .join(User, User.id == GuildMember.user_id)
+                .where(GuildMember.guild_id == guild.id)
+                .order_by(User.display_name.asc())
+            )
         ).all()
         members = [
             GuildMemberResponse(user_id=user.id, display_name=user.display_name, rank=member.rank)
@@ -56,7 +65,7 @@ def lobby_overview(context: AuthContext = Depends(get_auth_context), db: Session
     )
     channels = [
         ChannelResponse(id=channel.id, name=channel.name, kind=channel.kind, guild_id=channel.guild_id)
-        for channel in db.execute(channels_query).scalars()
+        for channel in (await db.execute(channels_query)).scalars()
     ]
 
     return LobbyOverviewResponse(
@@ -11,16 +11,24 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, require_ops_token
 from app.core.config import settings
+from app.core.security import verified_token_cache
 from app.models.admin_audit import AdminActionAudit
 from app.models.event_pipeline import WorldOutbox
 from app.models.release_record import ReleaseRecord
 from app.schemas.ops import ActivateReleaseRequest, ReleasePolicyResponse
 from app.services.admin_audit import write_admin_audit
+from app.services.audit_sink import audit_sink
+from app.services.auth_context_cache import auth_context_cache
+from app.services.chat_access_cache import chat_access_cache
+from app.services.chat_recent_cache import chat_recent_cache
+from app.services.chat_write_behind import chat_write_behind
 from app.services.content import get_active_snapshot
 from app.services.instance_manager import instance_runtime_metrics
 from app.services.observability import build_publish_drain_metrics, snapshot_latency_stats, zone_runtime_stats
+from app.services.password_hashing import password_hashing_pool
 from app.services.rate_limit import rate_limiter
 from app.services.realtime import realtime_hub
+from app.services.realtime_bus import realtime_bus
 from app.services.release_policy import activate_release, ensure_release_policy
 from app.services.security_events import list_security_events, security_event_stats
 from app.services.session_drain import (
@@ -29,6 +37,8 @@ from app.services.session_drain import (
     run_publish_drain_countdown,
     start_publish_drain,
 )
+from app.services.session_touch import session_touch_buffer
+from app.services.zone_presence import zone_presence_aggregator
 
 router = APIRouter(prefix="/ops/release", tags=["ops"])
 
@@ -130,6 +140,17 @@ def metrics(db: Session = Depends(get_db)):
         "instance_runtime": instance_runtime_metrics(db),
         "publish_drain": build_publish_drain_metrics(db),
         "rate_limiter": rate_limiter.stats(),
+        "auth_context_cache": auth_context_cache.stats(),
+        "session_touch": session_touch_buffer.snapshot_stats(),
+        "password_hashing": password_hashing_pool.stats(),
+        "jwt_verify_cache": verified_token_cache.stats(),
+        "audit_sink": audit_sink.snapshot_stats(),
+        "realtime_send_queues": realtime_hub.send_queue_stats(),
+        "realtime_bus": realtime_bus.snapshot_stats(),
+        "zone_presence": zone_presence_aggregator.stats(),
+        "chat_recent_cache": chat_recent_cache.stats(),
+        "chat_write_behind": chat_write_behind.snapshot_stats(),
+        "chat_access_cache": chat_access_cache.stats(),
         "security_events": security_event_stats(db),
         "runtime_health": {
             "db_probe_latency_ms": _db_probe_latency_ms(db),
@@ -8,8 +8,8 @@ from app.api.deps import get_client_content_version, get_client_version, get_db
 from app.models.content import ContentVersion
 from app.schemas.release import ReleaseSummaryResponse
 from app.services.release_policy import (
-    ensure_release_policy,
     evaluate_version,
+    get_release_policy_snapshot,
     get_latest_release_record,
     get_release_record_for_build,
 )
@@ -31,7 +31,7 @@ def release_summary(
     client_version: str | None = Depends(get_client_version),
     client_content_version_key: str | None = Depends(get_client_content_version),
 ):
-    policy = ensure_release_policy(db)
+    policy = get_release_policy_snapshot(db)
     decision = evaluate_version(policy, client_version, client_content_version_key)
     latest_record = get_latest_release_record(db)
     client_record = get_release_record_for_build(db, decision.client_version)
@@ -30,6 +30,50 @@ class Settings(BaseSettings):
     chat_write_rate_limit_max_per_ip: int = 40
     chat_write_rate_limit_max_per_account: int = 30
     chat_write_rate_limit_lockout_seconds: int = 30
+    rate_limit_sweep_interval_seconds: float = 30.0
+    rate_limit_backend: str = "memory"
+    rate_limit_shared_flush_interval_seconds: float = 0.5
+    auth_context_cache_ttl_seconds: float = 5.0
+    auth_context_cache_max_entries: int = 20000
+    session_touch_write_behind_enabled: bool = True
+    session_touch_flush_interval_seconds: float = 5.0
+    release_policy_cache_ttl_seconds: float = 10.0
+    password_hash_pool_workers: int = 2
+    password_hash_max_queue_depth: int = 16
+    password_hash_timeout_seconds: float = 10.0
+    jwt_verify_cache_max_entries: int = 50000
+    audit_sink_enabled: bool = True
+    audit_sink_max_queue_size: int = 10000
+    audit_sink_batch_size: int = 500
+    audit_sink_flush_interval_seconds: float = 0.25
+    audit_sink_overflow_policy: str = "drop"
+    audit_sink_block_timeout_seconds: float = 0.05
+    realtime_send_queue_max_frames: int = 256
+    realtime_send_overflow_policy: str = "drop_oldest"
+    realtime_heartbeat_interval_seconds: float = 25.0
+    realtime_idle_timeout_seconds: float = 0.0
+    realtime_idle_reap_batch_size: int = 200
+    realtime_global_notify_rate_per_second: int = 2000
+    realtime_global_notify_wave_interval_ms: int = 100
+    realtime_reconnect_jitter_ms: int = 30000
+    realtime_resume_buffer_frames: int = 64
+    realtime_resume_window_seconds: float = 60.0
+    zone_presence_conflation_enabled: bool = True
+    zone_presence_tick_ms: int = 150
+    chat_recent_cache_ttl_seconds: float = 5.0
+    chat_recent_cache_messages_per_channel: int = 100
+    chat_recent_cache_max_channels: int = 2048
+    chat_write_behind_enabled: bool = True
+    chat_write_behind_max_queue_size: int = 20000
+    chat_write_behind_batch_size: int = 200
+    chat_write_behind_flush_interval_seconds: float = 0.1
+    chat_write_behind_block_timeout_seconds: float = 0.05
+    chat_write_behind_id_block_size: int = 100
+    chat_write_behind_id_lease_seconds: float = 1.0
+    chat_after_id_settle_seconds: float = 2.0
+    chat_write_behind_synchronous_commit: bool = True
+    chat_access_cache_ttl_seconds: float = 10.0
+    chat_access_cache_max_entries: int = 50000
     runtime_gameplay_config_path: str = "/app/runtime/gameplay_config.json"
     runtime_gameplay_staged_config_path: str = "/app/runtime/gameplay_config.staged.json"
     runtime_gameplay_backup_config_path: str = "/app/runtime/gameplay_config.backup.json"
@@ -51,6 +95,11 @@ class Settings(BaseSettings):
     outbox_notify_channel: str = "world_outbox_new"
     outbox_notify_listen_timeout_seconds: float = 5.0
     outbox_notify_reconnect_delay_seconds: float = 2.0
+    realtime_bus_enabled: bool = False
+    realtime_bus_channel: str = "realtime_fanout"
+    realtime_bus_max_queue_size: int = 10000
+    realtime_bus_batch_size: int = 100
+    realtime_bus_listen_timeout_seconds: float = 5.0
 
     db_host: str
     db_port: int = 5432
@@ -59,6 +108,8 @@ class Settings(BaseSettings):
     db_password: str
     db_sslmode: str = "require"
     db_connect_timeout: int = 5
+    async_db_pool_size: int = 10
+    async_db_max_overflow: int = 20
 
     @property
     def database_url(self) -> str:
@@ -1,6 +1,9 @@
+from collections import OrderedDict
 from datetime import UTC, datetime, timedelta
 import hashlib
 import secrets
+from threading import RLock
+import time
 from uuid import uuid4
 from io import BytesIO
 
@@ -47,7 +50,101 @@ def create_access_token(user_id: int, session_id: str) -> str:
     return jwt.encode(payload, settings.jwt_secret, algorithm="HS256")
 
 
+class VerifiedTokenCache:
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._entries: OrderedDict[bytes, tuple[int, dict]] = OrderedDict()
+        self._digests_by_session: dict[str, set[bytes]] = {}
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._purged = 0
+        self._evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=20).digest()
+
+    def get(self, digest: bytes) -> dict | None:
+        if self._max_entries == 0:
+            return None
+        now = int(time.time())
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, payload = entry
+            if now >= expires_at:
+                self._drop(digest)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self._hits += 1
+            return payload
+
+    def put(self, digest: bytes, payload: dict) -> None:
+        if self._max_entries == 0:
+            return
+        try:
+            expires_at = int(payload["exp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        session_id = str(payload["sid"])
+        with self._lock:
+            self._drop(digest)
+            self._entries[digest] = (expires_at, payload)
+            self._digests_by_session.setdefault(session_id, set()).add(digest)
+            while len(self._entries) > self._max_entries:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def purge_session(self, session_id: str) -> None:
+        with self._lock:
+            for digest in list(self._digests_by_session.get(session_id, ())):
+                if self._drop(digest):
+                    self._purged += 1
+
+    def _drop(self, digest: bytes) -> bool:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return False
+        session_id = str(entry[1]["sid"])
+        digests = self._digests_by_session.get(session_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                self._digests_by_session.pop(session_id, None)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+                "purged_total": self._purged,
+                "evictions_total": self._evictions,
+            }
+
+    def reset_for_tests(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_session.clear()
+            self._hits = 0
+            self._misses = 0
+            self._purged = 0
+            self._evictions = 0
+
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.jwt_verify_cache_max_entries)
+
+
 def decode_access_token(token: str) -> dict:
+    digest = VerifiedTokenCache.digest(token)
+    cached = verified_token_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(
             token,
@@ -60,7 +157,8 @@ def decode_access_token(token: str) -> dict:
         raise TokenPayloadError("Invalid token") from exc
     if "sub" not in payload or "sid" not in payload:
         raise TokenPayloadError("Invalid token payload")
-    return payload
+    verified_token_cache.put(digest, payload)
+    return dict(payload)
 
 
 def create_refresh_token() -> str:
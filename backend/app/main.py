@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import UTC, datetime
 import logging
 from uuid import uuid4
@@ -14,8 +15,14 @@ from sqlalchemy import select
 from app.api.router import api_router
 from app.core.config import settings
 from app.core.logging import configure_logging
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, async_engine
 from app.models.chat import ChatChannel
+from app.services.audit_sink import AuditSinkWorkerHandle, start_audit_sink_worker, stop_audit_sink_worker
+from app.services.chat_write_behind import (
+    ChatWriteBehindWorkerHandle,
+    start_chat_write_behind_worker,
+    stop_chat_write_behind_worker,
+)
 from app.services.content import ensure_content_seed
 from app.services.instance_manager import expire_stale_instances
 from app.services.outbox_notify_worker import (
@@ -26,14 +33,39 @@ from app.services.outbox_notify_worker import (
     start_outbox_notify_worker,
     stop_outbox_notify_worker,
 )
+from app.services.password_hashing import password_hashing_pool
+from app.services.rate_limit import (
+    RateLimitFlusherHandle,
+    RateLimitSweeperHandle,
+    SharedRateLimiter,
+    rate_limiter,
+    start_rate_limit_flusher,
+    start_rate_limit_sweeper,
+    stop_rate_limit_flusher,
+    stop_rate_limit_sweeper,
+)
+from app.services.realtime import realtime_hub
+from app.services.realtime_bus import RealtimeBusWorkerHandle, start_realtime_bus_worker, stop_realtime_bus_worker
 from app.services.release_policy import ensure_release_policy
 from app.services.session_drain import finalize_due_publish_drains
+from app.services.session_touch import (
+    SessionTouchFlusherHandle,
+    start_session_touch_flusher,
+    stop_session_touch_flusher,
+)
 from app.services.ws_ticket import purge_expired_ws_tickets
+from app.services.zone_presence import zone_presence_aggregator
 
 app = FastAPI(title="children-of-ikphelion-backend", version="0.1.0")
 configure_logging()
 logger = logging.getLogger("children-of-ikphelion.api")
 _outbox_notify_worker_handle: OutboxNotifyWorkerHandle | None = None
+_session_touch_flusher_handle: SessionTouchFlusherHandle | None = None
+_rate_limit_sweeper_handle: RateLimitSweeperHandle | None = None
+_rate_limit_flusher_handle: RateLimitFlusherHandle | None = None
+_audit_sink_worker_handle: AuditSinkWorkerHandle | None = None
+_realtime_bus_worker_handle: RealtimeBusWorkerHandle | None = None
+_chat_write_behind_handle: ChatWriteBehindWorkerHandle | None = None
 
 _cors_origins = [entry.strip() for entry in settings.cors_allowed_origins.split(",") if entry.strip()]
 if _cors_origins:
@@ -49,7 +81,9 @@ app.include_router(api_router)
 
 @app.on_event("startup")
 def startup_seed() -> None:
-    global _outbox_notify_worker_handle
+    global _outbox_notify_worker_handle, _session_touch_flusher_handle, _rate_limit_sweeper_handle
+    global _rate_limit_flusher_handle, _audit_sink_worker_handle, _realtime_bus_worker_handle
+    global _chat_write_behind_handle
     db = SessionLocal()
     try:
         ensure_content_seed(db)
@@ -77,12 +111,84 @@ def startup_seed() -> None:
             logger=logger,
         )
 
+    if settings.session_touch_write_behind_enabled:
+        _session_touch_flusher_handle = start_session_touch_flusher(
+            session_factory=SessionLocal,
+            interval_seconds=settings.session_touch_flush_interval_seconds,
+            logger=logger,
+        )
+
+    if settings.request_rate_limit_enabled:
+        _rate_limit_sweeper_handle = start_rate_limit_sweeper(
+            interval_seconds=settings.rate_limit_sweep_interval_seconds,
+            logger=logger,
+        )
+    if settings.request_rate_limit_enabled and isinstance(rate_limiter, SharedRateLimiter):
+        _rate_limit_flusher_handle = start_rate_limit_flusher(
+            session_factory=SessionLocal,
+            limiter=rate_limiter,
+            interval_seconds=settings.rate_limit_shared_flush_interval_seconds,
+            logger=logger,
+        )
+
+    if settings.audit_sink_enabled:
+        _audit_sink_worker_handle = start_audit_sink_worker(
+            session_factory=SessionLocal,
+            interval_seconds=settings.audit_sink_flush_interval_seconds,
+            logger=logger,
+        )
+
+    if settings.chat_write_behind_enabled:
+        _chat_write_behind_handle = start_chat_write_behind_worker(
+            session_factory=SessionLocal,
+            interval_seconds=settings.chat_write_behind_flush_interval_seconds,
+            logger=logger,
+        )
+
+    if settings.realtime_bus_enabled:
+        # Sync startup handlers run on the event loop thread; remote frames are handed back to this loop.
+        _realtime_bus_worker_handle = start_realtime_bus_worker(
+            connector=PsycopgNotifyConnector(psycopg_dsn_from_sqlalchemy_url(settings.database_url)),
+            hub=realtime_hub,
+            loop=asyncio.get_running_loop(),
+            listen_timeout_seconds=settings.realtime_bus_listen_timeout_seconds,
+            reconnect_delay_seconds=settings.outbox_notify_reconnect_delay_seconds,
+            logger=logger,
+        )
+
 
 @app.on_event("shutdown")
 def shutdown_workers() -> None:
-    global _outbox_notify_worker_handle
+    global _outbox_notify_worker_handle, _session_touch_flusher_handle, _rate_limit_sweeper_handle
+    global _rate_limit_flusher_handle, _audit_sink_worker_handle, _realtime_bus_worker_handle
+    global _chat_write_behind_handle
     stop_outbox_notify_worker(_outbox_notify_worker_handle)
     _outbox_notify_worker_handle = None
+    stop_session_touch_flusher(_session_touch_flusher_handle)
+    _session_touch_flusher_handle = None
+    stop_rate_limit_sweeper(_rate_limit_sweeper_handle)
+    _rate_limit_sweeper_handle = None
+    stop_rate_limit_flusher(_rate_limit_flusher_handle)
+    _rate_limit_flusher_handle = None
+    stop_audit_sink_worker(_audit_sink_worker_handle)
+    _audit_sink_worker_handle = None
+    stop_chat_write_behind_worker(_chat_write_behind_handle)
+    _chat_write_behind_handle = None
+    stop_realtime_bus_worker(_realtime_bus_worker_handle)
+    _realtime_bus_worker_handle = None
+    password_hashing_pool.shutdown()
+
+
+@app.on_event("shutdown")
+async def stop_realtime_tasks() -> None:
+    await zone_presence_aggregator.stop()
+    await realtime_hub.stop_heartbeat()
+    await realtime_hub.stop_paced_notifications()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    await async_engine.dispose()
 
 
 def _request_id(request: Request) -> str:
@@ -24,6 +24,7 @@ from app.models.instance import WorldInstance, WorldInstanceMember
 from app.models.level import Level
 from app.models.party import Party, PartyInvite, PartyMember
 from app.models.publish_drain import PublishDrainEvent, PublishDrainSessionAudit
+from app.models.rate_limit import RateLimitCounter
 from app.models.release_record import ReleaseRecord
 from app.models.release_policy import ReleasePolicy
 from app.models.security_event import SecurityEventAudit
@@ -59,6 +60,7 @@ __all__ = [
     "AdminActionAudit",
     "PublishDrainEvent",
     "PublishDrainSessionAudit",
+    "RateLimitCounter",
     "ReleaseRecord",
     "ReleasePolicy",
     "SecurityEventAudit",
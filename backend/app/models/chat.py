@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -8,11 +8,17 @@ from app.db.base import Base
 
 class ChatChannel(Base):
     __tablename__ = "chat_channels"
+    __table_args__ = (
+        UniqueConstraint("direct_low_user_id", "direct_high_user_id", name="uq_chat_channels_direct_pair"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(96), nullable=False)
     kind: Mapped[str] = mapped_column(String(16), nullable=False, default="GLOBAL")
     guild_id: Mapped[int | None] = mapped_column(ForeignKey("guilds.id", ondelete="CASCADE"), nullable=True, index=True)
+    # Canonical (smaller, larger) member ids of a DIRECT channel; NULL for every other kind.
+    direct_low_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    direct_high_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
 
@@ -32,7 +38,10 @@ class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    channel_id: Mapped[int] = mapped_column(ForeignKey("chat_channels.id", ondelete="CASCADE"), nullable=False, index=True)
+    channel_id: Mapped[int] = mapped_column(ForeignKey("chat_channels.id", ondelete="CASCADE"), nullable=False)
     sender_user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     content: Mapped[str] = mapped_column(String(2000), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+Index("ix_chat_messages_channel_id_id", ChatMessage.channel_id, ChatMessage.id.desc())
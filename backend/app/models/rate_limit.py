@@ -0,0 +1,13 @@
+from sqlalchemy import Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RateLimitCounter(Base):
+    __tablename__ = "rate_limit_counters"
+
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)
+    tat: Mapped[float] = mapped_column(Float(), nullable=False, default=0.0)
+    blocked_until: Mapped[float] = mapped_column(Float(), nullable=False, default=0.0)
+    updated_at: Mapped[float] = mapped_column(Float(), nullable=False, default=0.0, index=True)
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from threading import Condition, Event, Thread
+import time
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.gameplay import GameplayActionAudit
+from app.models.security_event import SecurityEventAudit
+
+SessionFactory = Callable[[], Session]
+AuditModel = type[SecurityEventAudit] | type[GameplayActionAudit]
+
+AUDIT_OVERFLOW_DROP = "drop"
+AUDIT_OVERFLOW_BLOCK = "block"
+
+
+@dataclass
+class AuditSinkStats:
+    enqueued_total: int = 0
+    written_total: int = 0
+    dropped_overflow_total: int = 0
+    dropped_invalid_total: int = 0
+    inline_fallback_total: int = 0
+    blocked_total: int = 0
+    flushes_total: int = 0
+    flush_failures_total: int = 0
+    last_batch_size: int = 0
+    max_queue_depth: int = 0
+
+
+class AuditSink:
+    def __init__(
+        self,
+        *,
+        max_queue_size: int,
+        batch_size: int,
+        overflow_policy: str,
+        block_timeout_seconds: float,
+    ) -> None:
+        self._max_queue_size = max(1, int(max_queue_size))
+        self._batch_size = max(1, int(batch_size))
+        policy = (overflow_policy or "").strip().lower()
+        self._overflow_policy = policy if policy in {AUDIT_OVERFLOW_DROP, AUDIT_OVERFLOW_BLOCK} else AUDIT_OVERFLOW_DROP
+        self._block_timeout_seconds = max(0.0, float(block_timeout_seconds))
+        self._queue: deque[tuple[AuditModel, dict[str, Any]]] = deque()
+        self._cond = Condition()
+        self._accepting = False
+        self.stats = AuditSinkStats()
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def set_accepting(self, accepting: bool) -> None:
+        with self._cond:
+            self._accepting = accepting
+            self._cond.notify_all()
+
+    def enqueue(self, model: AuditModel, values: dict[str, Any]) -> bool:
+        # False tells the caller to write the row inline (sink not running, or backpressure timed out).
+        with self._cond:
+            if not self._accepting:
+                return False
+            if len(self._queue) >= self._max_queue_size:
+                if self._overflow_policy == AUDIT_OVERFLOW_DROP:
+                    self.stats.dropped_overflow_total += 1
+                    return True
+                self.stats.blocked_total += 1
+                self._cond.notify_all()
+                deadline = time.monotonic() + self._block_timeout_seconds
+                while self._accepting and len(self._queue) >= self._max_queue_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._accepting or len(self._queue) >= self._max_queue_size:
+                    self.stats.inline_fallback_total += 1
+                    return False
+            self._queue.append((model, values))
+            self.stats.enqueued_total += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._queue))
+            if len(self._queue) >= self._batch_size:
+                self._cond.notify_all()
+            return True
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def wait_for_work(self, timeout_seconds: float) -> None:
+        with self._cond:
+            if len(self._queue) < self._batch_size:
+                self._cond.wait(timeout_seconds)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def flush(self, session_factory: SessionFactory) -> int:
+        written = 0
+        while True:
+            with self._cond:
+                if not self._queue:
+                    break
+                batch = [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+                self._cond.notify_all()
+            try:
+                written += self._write_batch(session_factory, batch)
+            except Exception:
+                with self._cond:
+                    self._queue.extendleft(reversed(batch))
+                    self.stats.flush_failures_total += 1
+                raise
+        return written
+
+    def _write_batch(self, session_factory: SessionFactory, batch: list[tuple[AuditModel, dict[str, Any]]]) -> int:
+        grouped: dict[AuditModel, list[dict[str, Any]]] = {}
+        for model, values in batch:
+            grouped.setdefault(model, []).append(values)
+        db = session_factory()
+        try:
+            try:
+                for model, rows in grouped.items():
+                    db.execute(_insert_statement(db, model), rows)
+                db.commit()
+                invalid = 0
+            except IntegrityError:
+                # One bad row (e.g. a user deleted before the flush) must not sink the whole batch.
+                db.rollback()
+                invalid = 0
+                for model, rows in grouped.items():
+                    for row in rows:
+                        try:
+                            db.execute(_insert_statement(db, model), [row])
+                            db.commit()
+                        except IntegrityError:
+                            db.rollback()
+                            invalid += 1
+        finally:
+            db.close()
+        with self._cond:
+            self.stats.flushes_total += 1
+            self.stats.written_total += len(batch) - invalid
+            self.stats.dropped_invalid_total += invalid
+            self.stats.last_batch_size = len(batch)
+        return len(batch) - invalid
+
+    def snapshot_stats(self) -> dict[str, int | str]:
+        with self._cond:
+            return {
+                "accepting": int(self._accepting),
+                "queue_depth": len(self._queue),
+                "queue_limit": self._max_queue_size,
+                "overflow_policy": self._overflow_policy,
+                "enqueued_total": self.stats.enqueued_total,
+                "written_total": self.stats.written_total,
+                "dropped_overflow_total": self.stats.dropped_overflow_total,
+                "dropped_invalid_total": self.stats.dropped_invalid_total,
+                "inline_fallback_total": self.stats.inline_fallback_total,
+                "blocked_total": self.stats.blocked_total,
+                "flushes_total": self.stats.flushes_total,
+                "flush_failures_total": self.stats.flush_failures_total,
+                "last_batch_size": self.stats.last_batch_size,
+                "max_queue_depth": self.stats.max_queue_depth,
+            }
+
+    def reset_for_tests(
+        self,
+        *,
+        max_queue_size: int | None = None,
+        overflow_policy: str | None = None,
+        block_timeout_seconds: float | None = None,
+    ) -> None:
+        with self._cond:
+            self._queue.clear()
+            self._accepting = False
+            self.stats = AuditSinkStats()
+            if max_queue_size is not None:
+                self._max_queue_size = max(1, int(max_queue_size))
+            if overflow_policy is not None:
+                self._overflow_policy = overflow_policy
+            if block_timeout_seconds is not None:
+                self._block_timeout_seconds = max(0.0, float(block_timeout_seconds))
+
+
+def _insert_statement(db: Session, model: AuditModel):
+    if model is not GameplayActionAudit:
+        return insert(model)
+    # Rejected-action rows share the (session_id, action_nonce) key with the transactional accepted row.
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+
+audit_sink = AuditSink(
+    max_queue_size=settings.audit_sink_max_queue_size,
+    batch_size=settings.audit_sink_batch_size,
+    overflow_policy=settings.audit_sink_overflow_policy,
+    block_timeout_seconds=settings.audit_sink_block_timeout_seconds,
+)
+
+
+@dataclass
+class AuditSinkWorkerHandle:
+    sink: AuditSink
+    thread: Thread
+    stop_event: Event
+    session_factory: SessionFactory
+
+
+def _run_worker(
+    sink: AuditSink,
+    session_factory: SessionFactory,
+    stop_event: Event,
+    interval_seconds: float,
+    logger: logging.Logger,
+) -> None:
+    while not stop_event.is_set():
+        sink.wait_for_work(interval_seconds)
+        if stop_event.is_set():
+            break
+        try:
+            sink.flush(session_factory)
+        except Exception:
+            logger.warning("Audit sink flush failed; rows re-queued", exc_info=True)
+            stop_event.wait(interval_seconds)
+
+
+def start_audit_sink_worker(
+    *,
+    session_factory: SessionFactory,
+    sink: AuditSink = audit_sink,
+    interval_seconds: float = 0.25,
+    logger: logging.Logger | None = None,
+) -> AuditSinkWorkerHandle:
+    stop_event = Event()
+    log = logger or logging.getLogger("children-of-ikphelion.audit_sink")
+    sink.set_accepting(True)
+    thread = Thread(
+        target=_run_worker,
+        args=(sink, session_factory, stop_event, max(0.01, float(interval_seconds)), log),
+        name="aop-audit-sink",
+        daemon=True,
+    )
+    thread.start()
+    return AuditSinkWorkerHandle(sink=sink, thread=thread, stop_event=stop_event, session_factory=session_factory)
+
+
+def stop_audit_sink_worker(handle: AuditSinkWorkerHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    handle.sink.set_accepting(False)
+    handle.stop_event.set()
+    handle.sink.wake()
+    handle.thread.join(timeout=max(0.0, float(join_timeout_seconds)))
+    try:
+        handle.sink.flush(handle.session_factory)
+    except Exception:
+        logging.getLogger("children-of-ikphelion.audit_sink").warning("Final audit sink flush failed", exc_info=True)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from threading import RLock
+import time
+from typing import Any, TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.security import verified_token_cache
+from app.models.release_policy import ReleasePolicy
+from app.models.session import UserSession
+from app.models.user import User
+from app.services.release_policy import VersionDecision
+
+ModelT = TypeVar("ModelT")
+
+
+@dataclass(frozen=True)
+class CachedAuthContext:
+    session_id: str
+    user_id: int
+    session_values: dict[str, Any]
+    user_values: dict[str, Any]
+    version_inputs: tuple[str | None, str | None]
+    version_status: VersionDecision
+    resolved_at: datetime
+    policy_revision: int = 0
+    cached_at: float = 0.0
+
+    def with_session_values(self, values: dict[str, Any]) -> CachedAuthContext:
+        merged = dict(self.session_values)
+        merged.update(values)
+        return replace(self, session_values=merged)
+
+
+def snapshot_columns(instance: Any) -> dict[str, Any]:
+    mapper = inspect(instance).mapper
+    return {attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs}
+
+
+def detached_cached_instance(model: type[ModelT], values: dict[str, Any]) -> ModelT:
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    return instance
+
+
+def attach_cached_instance(db: Session, model: type[ModelT], values: dict[str, Any]) -> ModelT:
+    # Rebuild a detached row from cached column values and merge it without a SELECT.
+    return db.merge(detached_cached_instance(model, values), load=False)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+class AuthContextCache:
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[str, CachedAuthContext] = OrderedDict()
+        self._sessions_by_user: dict[int, set[str]] = {}
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0
+
+    def get(self, session_id: str) -> CachedAuthContext | None:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self._misses += 1
+                return None
+            if now - entry.cached_at >= self._ttl_seconds:
+                self._drop(session_id)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self._hits += 1
+            return entry
+
+    def put(self, entry: CachedAuthContext) -> None:
+        if not self.enabled:
+            return
+        stamped = replace(entry, cached_at=time.monotonic())
+        with self._lock:
+            self._drop(entry.session_id)
+            self._entries[entry.session_id] = stamped
+            self._sessions_by_user.setdefault(entry.user_id, set()).add(entry.session_id)
+            while len(self._entries) > self._max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._evictions += 1
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self._lock:
+            if self._drop(session_id):
+                self._invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for session_id in list(self._sessions_by_user.get(user_id, ())):
+                if self._drop(session_id):
+                    self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._sessions_by_user.clear()
+
+    def _drop(self, session_id: str) -> bool:
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            return False
+        user_sessions = self._sessions_by_user.get(entry.user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                self._sessions_by_user.pop(entry.user_id, None)
+        return True
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+                "invalidations_total": self._invalidations,
+                "evictions_total": self._evictions,
+                "ttl_seconds": self._ttl_seconds,
+            }
+
+    def reset_for_tests(self, *, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sessions_by_user.clear()
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+            self._evictions = 0
+            if ttl_seconds is not None:
+                self._ttl_seconds = max(0.0, float(ttl_seconds))
+
+
+def cached_context_is_usable(
+    entry: CachedAuthContext,
+    *,
+    user_id: int,
+    version_inputs: tuple[str | None, str | None],
+    policy_revision: int,
+    now: datetime,
+) -> bool:
+    if entry.user_id != user_id:
+        return False
+    if entry.version_inputs != version_inputs:
+        return False
+    if entry.policy_revision != policy_revision:
+        return False
+    expires_at = entry.session_values.get("expires_at")
+    if expires_at is None or _as_utc(expires_at) <= now:
+        return False
+    enforce_after = entry.version_status.enforce_after
+    if enforce_after is not None:
+        # A grace deadline crossed since resolution can flip force_update; re-resolve once.
+        enforce_at = _as_utc(enforce_after)
+        if entry.resolved_at < enforce_at <= now:
+            return False
+    return True
+
+
+auth_context_cache = AuthContextCache(
+    ttl_seconds=settings.auth_context_cache_ttl_seconds,
+    max_entries=settings.auth_context_cache_max_entries,
+)
+
+
+@event.listens_for(UserSession, "after_update")
+def _invalidate_session_on_write(_mapper, _connection, target: UserSession) -> None:
+    auth_context_cache.invalidate_session(str(target.id))
+    if target.revoked_at is not None:
+        verified_token_cache.purge_session(str(target.id))
+
+
+@event.listens_for(UserSession, "after_delete")
+def _invalidate_session_on_delete(_mapper, _connection, target: UserSession) -> None:
+    auth_context_cache.invalidate_session(str(target.id))
+    verified_token_cache.purge_session(str(target.id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_on_write(_mapper, _connection, target: User) -> None:
+    auth_context_cache.invalidate_user(int(target.id))
+
+
+@event.listens_for(ReleasePolicy, "after_insert")
+@event.listens_for(ReleasePolicy, "after_update")
+def _invalidate_all_on_policy_write(_mapper, _connection, _target: ReleasePolicy) -> None:
+    auth_context_cache.clear()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import RLock
+import time
+from typing import Any
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.character import Character
+from app.models.chat import ChatChannel, ChatMember
+
+
+class ChatAccessCache:
+    def __init__(self, *, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._max_entries = max(1, int(max_entries))
+        # user id -> (selected character id, cached_at); only positive answers are cached.
+        self._characters: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        # user id -> (ids of channels the user is a member of, cached_at); GLOBAL channels need no membership.
+        self._memberships: OrderedDict[int, tuple[frozenset[int], float]] = OrderedDict()
+        # channel id -> (kind, cached_at)
+        self._channels: OrderedDict[int, tuple[str, float]] = OrderedDict()
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0
+
+    def selected_character(self, user_id: int) -> int | None:
+        return self._get(self._characters, user_id)
+
+    def put_selected_character(self, user_id: int, character_id: int) -> None:
+        self._put(self._characters, user_id, character_id)
+
+    def memberships(self, user_id: int) -> frozenset[int] | None:
+        return self._get(self._memberships, user_id)
+
+    def put_memberships(self, user_id: int, channel_ids: frozenset[int]) -> None:
+        self._put(self._memberships, user_id, channel_ids)
+
+    def channel_kind(self, channel_id: int) -> str | None:
+        return self._get(self._channels, channel_id)
+
+    def put_channel_kind(self, channel_id: int, kind: str) -> None:
+        self._put(self._channels, channel_id, kind)
+
+    def invalidate_character(self, user_id: int) -> None:
+        self._drop(self._characters, user_id)
+
+    def invalidate_memberships(self, user_id: int) -> None:
+        self._drop(self._memberships, user_id)
+
+    def invalidate_channel(self, channel_id: int) -> None:
+        self._drop(self._channels, channel_id)
+
+    def _get(self, entries: OrderedDict, key: int) -> Any:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if now - entry[1] >= self._ttl_seconds:
+                entries.pop(key, None)
+                self._misses += 1
+                return None
+            entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def _put(self, entries: OrderedDict, key: int, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            entries[key] = (value, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+                self._evictions += 1
+
+    def _drop(self, entries: OrderedDict, key: int) -> None:
+        with self._lock:
+            if entries.pop(key, None) is not None:
+                self._invalidations += 1
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "selected_characters": len(self._characters),
+                "memberships": len(self._memberships),
+                "channels": len(self._channels),
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+                "invalidations_total": self._invalidations,
+                "evictions_total": self._evictions,
+                "ttl_seconds": self._ttl_seconds,
+            }
+
+    def reset_for_tests(self, *, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._characters.clear()
+            self._memberships.clear()
+            self._channels.clear()
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+            self._evictions = 0
+            if ttl_seconds is not None:
+                self._ttl_seconds = max(0.0, float(ttl_seconds))
+
+
+chat_access_cache = ChatAccessCache(
+    ttl_seconds=settings.chat_access_cache_ttl_seconds,
+    max_entries=settings.chat_access_cache_max_entries,
+)
+
+
+# Character select/delete routes and the publish-drain presence flush all write through the ORM.
+@event.listens_for(Character, "after_insert")
+@event.listens_for(Character, "after_update")
+@event.listens_for(Character, "after_delete")
+def _invalidate_character_on_write(_mapper, _connection, target: Character) -> None:
+    chat_access_cache.invalidate_character(int(target.user_id))
+
+
+@event.listens_for(ChatMember, "after_insert")
+@event.listens_for(ChatMember, "after_update")
+@event.listens_for(ChatMember, "after_delete")
+def _invalidate_memberships_on_write(_mapper, _connection, target: ChatMember) -> None:
+    chat_access_cache.invalidate_memberships(int(target.user_id))
+
+
+@event.listens_for(ChatChannel, "after_update")
+@event.listens_for(ChatChannel, "after_delete")
+def _invalidate_channel_on_write(_mapper, _connection, target: ChatChannel) -> None:
+    chat_access_cache.invalidate_channel(int(target.id))
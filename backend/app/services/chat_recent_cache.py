@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from bisect import insort
+from collections import OrderedDict
+from threading import RLock
+import time
+
+from app.core.config import settings
+
+
+class _ChannelRing:
+    __slots__ = ("ids", "frames", "exhaustive", "primed_at")
+
+    def __init__(self, ids: list[int], frames: dict[int, str], exhaustive: bool, primed_at: float) -> None:
+        # ids ascending; frames holds the pre-encoded ChatMessageResponse JSON for each id.
+        self.ids = ids
+        self.frames = frames
+        # True when the ring holds every message the channel has, so a short channel still serves full pages.
+        self.exhaustive = exhaustive
+        self.primed_at = primed_at
+
+
+class ChatRecentCache:
+    def __init__(self, *, ttl_seconds: float, messages_per_channel: int, max_channels: int) -> None:
+        self._ttl_seconds = max(0.0, float(ttl_seconds))
+        self._capacity = max(1, int(messages_per_channel))
+        self._max_channels = max(1, int(max_channels))
+        self._rings: OrderedDict[int, _ChannelRing] = OrderedDict()
+        # Sequence of the last local write per channel; a prime that raced a write is discarded instead of
+        # hiding the new message. LRU-bounded like the rings: a trimmed channel is assumed to have been written
+        # as late as the newest trimmed entry, which can only discard a prime, never accept a stale one.
+        self._write_seq = 0
+        self._last_writes: OrderedDict[int, int] = OrderedDict()
+        self._trimmed_through = 0
+        self._lock = RLock()
+        self._hits = 0
+        self._misses = 0
+        self._primes = 0
+        self._stale_primes = 0
+        self._appends = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl_seconds > 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def write_version(self) -> int:
+        with self._lock:
+            return self._write_seq
+
+    def prime(self, channel_id: int, messages: list[tuple[int, str]], *, version: int) -> None:
+        # messages: newest `capacity` rows of the channel as (id, encoded json), any order.
+        if not self.enabled:
+            return
+        ordered = sorted(messages)[-self._capacity :]
+        with self._lock:
+            if self._last_writes.get(channel_id, self._trimmed_through) > version:
+                self._stale_primes += 1
+                return
+            self._rings[channel_id] = _ChannelRing(
+                ids=[message_id for message_id, _ in ordered],
+                frames=dict(ordered),
+                exhaustive=len(messages) < self._capacity,
+                primed_at=time.monotonic(),
+            )
+            self._rings.move_to_end(channel_id)
+            self._primes += 1
+            while len(self._rings) > self._max_channels:
+                self._rings.popitem(last=False)
+                self._evictions += 1
+
+    def append(self, channel_id: int, message_id: int, encoded: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._record_write(channel_id)
+            ring = self._rings.get(channel_id)
+            if ring is None or message_id in ring.frames:
+                return
+            insort(ring.ids, message_id)
+            ring.frames[message_id] = encoded
+            while len(ring.ids) > self._capacity:
+                ring.frames.pop(ring.ids.pop(0), None)
+                ring.exhaustive = False
+            self._appends += 1
+
+    def newest(self, channel_id: int, limit: int) -> list[str] | None:
+        if not self.enabled or limit > self._capacity:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            ring = self._rings.get(channel_id)
+            if ring is not None and now - ring.primed_at >= self._ttl_seconds:
+                # Writes from other instances only reach this process through a re-prime.
+                self._rings.pop(channel_id, None)
+                ring = None
+            if ring is None:
+                self._misses += 1
+                return None
+            ids = ring.ids[-limit:] if len(ring.ids) >= limit or ring.exhaustive else None
+            if ids is None:
+                self._misses += 1
+                return None
+            self._rings.move_to_end(channel_id)
+            self._hits += 1
+            return [ring.frames[message_id] for message_id in ids]
+
+    def invalidate(self, channel_id: int) -> None:
+        with self._lock:
+            self._rings.pop(channel_id, None)
+            self._record_write(channel_id)
+
+    def _record_write(self, channel_id: int) -> None:
+        self._write_seq += 1
+        self._last_writes[channel_id] = self._write_seq
+        self._last_writes.move_to_end(channel_id)
+        while len(self._last_writes) > self._max_channels:
+            _, seq = self._last_writes.popitem(last=False)
+            self._trimmed_through = max(self._trimmed_through, seq)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "channels": len(self._rings),
+                "messages_per_channel": self._capacity,
+                "ttl_seconds": self._ttl_seconds,
+                "hits_total": self._hits,
+                "misses_total": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "primes_total": self._primes,
+                "stale_primes_total": self._stale_primes,
+                "appends_total": self._appends,
+                "evictions_total": self._evictions,
+            }
+
+    def reset_for_tests(self, *, ttl_seconds: float | None = None) -> None:
+        with self._lock:
+            self._rings.clear()
+            self._write_seq = 0
+            self._last_writes.clear()
+            self._trimmed_through = 0
+            self._hits = 0
+            self._misses = 0
+            self._primes = 0
+            self._stale_primes = 0
+            self._appends = 0
+            self._evictions = 0
+            if ttl_seconds is not None:
+                self._ttl_seconds = max(0.0, float(ttl_seconds))
+
+
+chat_recent_cache = ChatRecentCache(
+    ttl_seconds=settings.chat_recent_cache_ttl_seconds,
+    messages_per_channel=settings.chat_recent_cache_messages_per_channel,
+    max_channels=settings.chat_recent_cache_max_channels,
+)
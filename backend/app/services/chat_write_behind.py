@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+from threading import Condition, Event, Lock, Thread
+import time
+from typing import Any
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.chat import ChatMessage
+
+SessionFactory = Callable[[], Session]
+
+logger = logging.getLogger("children-of-ikphelion.chat_write_behind")
+
+
+@dataclass
+class ChatWriteBehindStats:
+    enqueued_total: int = 0
+    written_total: int = 0
+    dropped_invalid_total: int = 0
+    inline_fallback_total: int = 0
+    blocked_total: int = 0
+    flushes_total: int = 0
+    flush_failures_total: int = 0
+    id_blocks_reserved_total: int = 0
+    id_misses_total: int = 0
+    ids_expired_total: int = 0
+    last_batch_size: int = 0
+    max_queue_depth: int = 0
+
+
+class ChatWriteBehind:
+    def __init__(
+        self,
+        *,
+        max_queue_size: int,
+        batch_size: int,
+        id_block_size: int,
+        id_lease_seconds: float,
+        block_timeout_seconds: float,
+        synchronous_commit: bool,
+    ) -> None:
+        self._max_queue_size = max(1, int(max_queue_size))
+        self._batch_size = max(1, int(batch_size))
+        self._id_block_size = max(1, int(id_block_size))
+        self._id_lease_seconds = max(0.01, float(id_lease_seconds))
+        self._block_timeout_seconds = max(0.0, float(block_timeout_seconds))
+        self._synchronous_commit = bool(synchronous_commit)
+        # (row values, encoded ChatMessageResponse); the encoded copy lets cache primes include unflushed rows.
+        self._queue: deque[tuple[dict[str, Any], str]] = deque()
+        self._cond = Condition()
+        # The worker and the shutdown drain may both call flush; only one may own the queue head at a time.
+        self._flush_lock = Lock()
+        self._accepting = False
+        self._session_factory: SessionFactory | None = None
+        # (id, reserved_at) in reservation order, so the oldest lease is always at the left.
+        self._ids: deque[tuple[int, float]] = deque()
+        self._ids_lock = Lock()
+        self._id_high_water = 0
+        # Allocations and misses since the last refill; the next block is sized from it.
+        self._id_demand = 0
+        self.stats = ChatWriteBehindStats()
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def attach(self, session_factory: SessionFactory | None) -> None:
+        with self._cond:
+            self._session_factory = session_factory
+            self._accepting = session_factory is not None
+            self._cond.notify_all()
+
+    def allocate_id(self) -> int | None:
+        # Ids come from the table's own sequence, so a message can be broadcast before its row exists. This never
+        # touches the database: the worker keeps a leased block topped up, and a miss persists the message inline.
+        with self._ids_lock:
+            self._id_demand += 1
+            self._expire_ids(time.monotonic())
+            if self._ids:
+                return self._ids.popleft()[0]
+            self.stats.id_misses_total += 1
+        self.wake()
+        return None
+
+    def _expire_ids(self, now: float) -> None:
+        # An id left unused past its lease could later commit below ids other workers have already made
+        # visible; dropping it bounds how late a lower id can appear (see the settle window in list_messages).
+        while self._ids and now - self._ids[0][1] > self._id_lease_seconds:
+            self._ids.popleft()
+            self.stats.ids_expired_total += 1
+
+    def refill_ids(self, session_factory: SessionFactory, *, force: bool = False) -> int:
+        with self._ids_lock:
+            self._expire_ids(time.monotonic())
+            # Sized from recent demand so an idle worker does not burn a full block of sequence values per lease.
+            block_size = self._id_block_size if force else min(self._id_block_size, max(1, self._id_demand * 2))
+            if not force and (self._id_demand == 0 or len(self._ids) * 2 >= block_size):
+                return 0
+            self._id_demand = 0
+        reserved_at = time.monotonic()
+        db = session_factory()
+        try:
+            reserved = _reserve_ids(db, block_size, self._id_high_water)
+            db.commit()
+        finally:
+            db.close()
+        with self._ids_lock:
+            self._ids.extend((message_id, reserved_at) for message_id in reserved)
+            if reserved:
+                self._id_high_water = max(self._id_high_water, reserved[-1])
+            self.stats.id_blocks_reserved_total += 1
+        return len(reserved)
+
+    def submit(self, values: dict[str, Any], encoded: str) -> bool:
+        # False tells the caller to persist the message inline; chat rows are never dropped on overflow.
+        with self._cond:
+            if not self._accepting:
+                return False
+            if len(self._queue) >= self._max_queue_size:
+                self.stats.blocked_total += 1
+                self._cond.notify_all()
+                deadline = time.monotonic() + self._block_timeout_seconds
+                while self._accepting and len(self._queue) >= self._max_queue_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._accepting or len(self._queue) >= self._max_queue_size:
+                    self.stats.inline_fallback_total += 1
+                    return False
+            self._queue.append((values, encoded))
+            self.stats.enqueued_total += 1
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._queue))
+            if len(self._queue) >= self._batch_size:
+                self._cond.notify_all()
+            return True
+
+    def pending_for_channel(self, channel_id: int) -> list[tuple[int, str]]:
+        with self._cond:
+            return [(values["id"], encoded) for values, encoded in self._queue if values["channel_id"] == channel_id]
+
+    def lowest_pending_id(self, channel_id: int) -> int | None:
+        with self._cond:
+            return min((values["id"] for values, _ in self._queue if values["channel_id"] == channel_id), default=None)
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def wait_for_work(self, timeout_seconds: float) -> None:
+        with self._cond:
+            if len(self._queue) < self._batch_size:
+                self._cond.wait(timeout_seconds)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def flush(self, session_factory: SessionFactory) -> int:
+        with self._flush_lock:
+            return self._flush_locked(session_factory)
+
+    def _flush_locked(self, session_factory: SessionFactory) -> int:
+        written = 0
+        while True:
+            with self._cond:
+                if not self._queue:
+                    break
+                batch = [self._queue[index][0] for index in range(min(self._batch_size, len(self._queue)))]
+            try:
+                written += self._write_batch(session_factory, batch)
+            except Exception:
+                with self._cond:
+                    self.stats.flush_failures_total += 1
+                raise
+            with self._cond:
+                # Rows leave the queue only once committed, so pending_for_channel never loses sight of them.
+                for _ in batch:
+                    self._queue.popleft()
+                self._cond.notify_all()
+        return written
+
+    def _write_batch(self, session_factory: SessionFactory, batch: list[dict[str, Any]]) -> int:
+        db = session_factory()
+        try:
+            try:
+                self._apply_commit_mode(db)
+                db.execute(insert(ChatMessage), batch)
+                db.commit()
+                invalid = 0
+            except IntegrityError:
+                # A channel or sender deleted before the flush must not sink the whole batch. Access is checked
+                # before a message is acknowledged, so only rows whose channel or sender vanished since land here;
+                # their cascade would have removed them had they already been written.
+                db.rollback()
+                invalid = 0
+                for row in batch:
+                    try:
+                        self._apply_commit_mode(db)
+                        db.execute(insert(ChatMessage), [row])
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()
+                        invalid += 1
+                        logger.error(
+                            "Dropped acknowledged chat message id=%s channel_id=%s sender_user_id=%s on integrity error",
+                            row.get("id"),
+                            row.get("channel_id"),
+                            row.get("sender_user_id"),
+                            exc_info=True,
+                        )
+        finally:
+            db.close()
+        with self._cond:
+            self.stats.flushes_total += 1
+            self.stats.written_total += len(batch) - invalid
+            self.stats.dropped_invalid_total += invalid
+            self.stats.last_batch_size = len(batch)
+        return len(batch) - invalid
+
+    def _apply_commit_mode(self, db: Session) -> None:
+        if not self._synchronous_commit and db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET LOCAL synchronous_commit = off"))
+
+    def snapshot_stats(self) -> dict[str, int]:
+        with self._cond:
+            with self._ids_lock:
+                reserved_ids = len(self._ids)
+            return {
+                "accepting": int(self._accepting),
+                "queue_depth": len(self._queue),
+                "queue_limit": self._max_queue_size,
+                "synchronous_commit": int(self._synchronous_commit),
+                "reserved_ids": reserved_ids,
+                "enqueued_total": self.stats.enqueued_total,
+                "written_total": self.stats.written_total,
+                "dropped_invalid_total": self.stats.dropped_invalid_total,
+                "inline_fallback_total": self.stats.inline_fallback_total,
+                "blocked_total": self.stats.blocked_total,
+                "flushes_total": self.stats.flushes_total,
+                "flush_failures_total": self.stats.flush_failures_total,
+                "id_blocks_reserved_total": self.stats.id_blocks_reserved_total,
+                "id_misses_total": self.stats.id_misses_total,
+                "ids_expired_total": self.stats.ids_expired_total,
+                "last_batch_size": self.stats.last_batch_size,
+                "max_queue_depth": self.stats.max_queue_depth,
+            }
+
+    def reset_for_tests(
+        self,
+        *,
+        max_queue_size: int | None = None,
+        id_block_size: int | None = None,
+        id_lease_seconds: float | None = None,
+    ) -> None:
+        with self._cond:
+            self._queue.clear()
+            self._accepting = False
+            self._session_factory = None
+            self.stats = ChatWriteBehindStats()
+            with self._ids_lock:
+                self._ids.clear()
+                self._id_high_water = 0
+                self._id_demand = 0
+            if max_queue_size is not None:
+                self._max_queue_size = max(1, int(max_queue_size))
+            if id_block_size is not None:
+                self._id_block_size = max(1, int(id_block_size))
+            if id_lease_seconds is not None:
+                self._id_lease_seconds = max(0.01, float(id_lease_seconds))
+
+
+def _reserve_ids(db: Session, count: int, high_water: int) -> list[int]:
+    if db.get_bind().dialect.name == "postgresql":
+        return list(
+            db.execute(
+                text("SELECT nextval(pg_get_serial_sequence('chat_messages', 'id')) FROM generate_series(1, :count)"),
+                {"count": count},
+            ).scalars()
+        )
+    # Dialects without sequences (SQLite in tests) continue past the highest persisted or reserved id.
+    start = max(int(db.execute(select(func.coalesce(func.max(ChatMessage.id), 0))).scalar_one()), high_water)
+    return list(range(start + 1, start + 1 + count))
+
+
+chat_write_behind = ChatWriteBehind(
+    max_queue_size=settings.chat_write_behind_max_queue_size,
+    batch_size=settings.chat_write_behind_batch_size,
+    id_block_size=settings.chat_write_behind_id_block_size,
+    id_lease_seconds=settings.chat_write_behind_id_lease_seconds,
+    block_timeout_seconds=settings.chat_write_behind_block_timeout_seconds,
+    synchronous_commit=settings.chat_write_behind_synchronous_commit,
+)
+
+
+@dataclass
+class ChatWriteBehindWorkerHandle:
+    sink: ChatWriteBehind
+    thread: Thread
+    stop_event: Event
+    session_factory: SessionFactory
+
+
+def _run_worker(
+    sink: ChatWriteBehind,
+    session_factory: SessionFactory,
+    stop_event: Event,
+    interval_seconds: float,
+    logger: logging.Logger,
+) -> None:
+    while not stop_event.is_set():
+        sink.wait_for_work(interval_seconds)
+        if stop_event.is_set():
+            break
+        try:
+            sink.flush(session_factory)
+        except Exception:
+            logger.warning("Chat write-behind flush failed; rows kept queued", exc_info=True)
+            stop_event.wait(interval_seconds)
+            continue
+        try:
+            sink.refill_ids(session_factory)
+        except Exception:
+            logger.warning("Chat message id reservation failed", exc_info=True)
+
+
+def start_chat_write_behind_worker(
+    *,
+    session_factory: SessionFactory,
+    sink: ChatWriteBehind = chat_write_behind,
+    interval_seconds: float = 0.1,
+    logger: logging.Logger | None = None,
+) -> ChatWriteBehindWorkerHandle:
+    stop_event = Event()
+    log = logger or logging.getLogger("children-of-ikphelion.chat_write_behind")
+    sink.attach(session_factory)
+    thread = Thread(
+        target=_run_worker,
+        args=(sink, session_factory, stop_event, max(0.01, float(interval_seconds)), log),
+        name="aop-chat-write-behind",
+        daemon=True,
+    )
+    thread.start()
+    return ChatWriteBehindWorkerHandle(sink=sink, thread=thread, stop_event=stop_event, session_factory=session_factory)
+
+
+def stop_chat_write_behind_worker(handle: ChatWriteBehindWorkerHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    # New messages persist inline from here on; everything already acknowledged is flushed before returning.
+    handle.sink.attach(None)
+    handle.stop_event.set()
+    handle.sink.wake()
+    handle.thread.join(timeout=max(0.0, float(join_timeout_seconds)))
+    try:
+        handle.sink.flush(handle.session_factory)
+    except Exception:
+        logging.getLogger("children-of-ikphelion.chat_write_behind").error(
+            "Final chat write-behind flush failed; %d messages not persisted",
+            handle.sink.pending_count(),
+            exc_info=True,
+        )
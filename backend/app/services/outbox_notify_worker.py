@@ -212,6 +212,15 @@ class PsycopgNotifyConnection:
             raise ValueError("invalid PostgreSQL LISTEN channel")
         self._connection.execute(f'LISTEN "{normalized}"')
 
+    def notify_many(self, channel: str, payloads: list[str]) -> None:
+        normalized = (channel or "").strip()
+        if not normalized or not self._CHANNEL_PATTERN.fullmatch(normalized):
+            raise ValueError("invalid PostgreSQL NOTIFY channel")
+        # One transaction per batch: listeners receive the whole batch at commit, in order.
+        with self._connection.transaction():
+            for payload in payloads:
+                self._connection.execute("SELECT pg_notify(%s, %s)", (normalized, payload))
+
     def poll(self, timeout_seconds: float) -> list[str]:
         timeout = max(0.0, float(timeout_seconds))
         notifies_fn = getattr(self._connection, "notifies", None)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from threading import RLock
+import time
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_password
+
+
+class PasswordHashingBusyError(RuntimeError):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Password hashing queue is full")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class PasswordHashingPool:
+    def __init__(self, *, max_workers: int, max_queue_depth: int, timeout_seconds: float) -> None:
+        self._max_workers = max(0, int(max_workers))
+        self._max_queue_depth = max(1, int(max_queue_depth))
+        self._timeout_seconds = max(0.1, float(timeout_seconds))
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = RLock()
+        self._depth = 0
+        self._max_observed_depth = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._pool_restarts = 0
+        self._total_latency_ms = 0.0
+        self._max_latency_ms = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_workers > 0
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(verify_password, password, password_hash)
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        self._admit()
+        started = time.perf_counter()
+        ok = False
+        slot_owned_by_future = False
+        try:
+            if not self.enabled:
+                result = fn(*args)
+            else:
+                executor, future = self._submit(fn, *args)
+                # cancel() cannot stop a hash that is already running, so the slot stays taken until the worker
+                # actually finishes; otherwise timed-out callers would let admission outrun the pool.
+                future.add_done_callback(lambda _future: self._release_slot())
+                slot_owned_by_future = True
+                try:
+                    result = future.result(timeout=self._timeout_seconds)
+                except FutureTimeoutError as exc:
+                    future.cancel()
+                    raise PasswordHashingBusyError(retry_after_seconds=max(1, int(self._timeout_seconds))) from exc
+                except BrokenProcessPool as exc:
+                    # A worker died mid-hash; the next call gets a fresh pool, this one is told to retry.
+                    self._discard_executor(executor)
+                    raise PasswordHashingBusyError(retry_after_seconds=1) from exc
+            ok = True
+            return result
+        finally:
+            if not slot_owned_by_future:
+                self._release_slot()
+            self._record(started, ok=ok)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> tuple[ProcessPoolExecutor, Future]:
+        executor = self._ensure_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            executor = self._ensure_executor()
+            return executor, executor.submit(fn, *args)
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not executor:
+                # Another caller already replaced it.
+                return
+            self._executor = None
+            self._pool_restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._depth >= self._max_queue_depth:
+                # Shed instead of parking more request threads behind bcrypt; the caller surfaces 503.
+                self._rejected += 1
+                raise PasswordHashingBusyError(retry_after_seconds=max(1, int(round(self._average_latency_s() * 2))))
+            self._depth += 1
+            self._admitted += 1
+            self._max_observed_depth = max(self._max_observed_depth, self._depth)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._depth = max(0, self._depth - 1)
+
+    def _record(self, started: float, *, ok: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            if ok:
+                self._completed += 1
+                self._total_latency_ms += elapsed_ms
+                self._max_latency_ms = max(self._max_latency_ms, elapsed_ms)
+            else:
+                self._failed += 1
+
+    def _average_latency_s(self) -> float:
+        if self._completed == 0:
+            return 0.0
+        return self._total_latency_ms / self._completed / 1000.0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers avoid inheriting request-thread locks from the forked parent.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "workers": self._max_workers,
+                "queue_depth": self._depth,
+                "queue_depth_max_observed": self._max_observed_depth,
+                "queue_limit": self._max_queue_depth,
+                "admitted_total": self._admitted,
+                "rejected_total": self._rejected,
+                "completed_total": self._completed,
+                "failed_total": self._failed,
+                "pool_restarts_total": self._pool_restarts,
+                "avg_latency_ms": round(self._average_latency_s() * 1000.0, 3),
+                "max_latency_ms": round(self._max_latency_ms, 3),
+            }
+
+    def reset_for_tests(self, *, max_workers: int | None = None, max_queue_depth: int | None = None) -> None:
+        self.shutdown()
+        with self._lock:
+            if max_workers is not None:
+                self._max_workers = max(0, int(max_workers))
+            if max_queue_depth is not None:
+                self._max_queue_depth = max(1, int(max_queue_depth))
+            self._depth = 0
+            self._max_observed_depth = 0
+            self._admitted = 0
+            self._rejected = 0
+            self._completed = 0
+            self._failed = 0
+            self._pool_restarts = 0
+            self._total_latency_ms = 0.0
+            self._max_latency_ms = 0.0
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.password_hash_pool_workers,
+    max_queue_depth=settings.password_hash_max_queue_depth,
+    timeout_seconds=settings.password_hash_timeout_seconds,
+)
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from collections import defaultdict, deque
+from array import array
 from dataclasses import dataclass
+import logging
 from math import ceil
-from threading import RLock
+import sys
+from threading import Event, RLock, Thread
 import time
+from typing import Callable
 
 from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.models.rate_limit import RateLimitCounter
 
 
 @dataclass(frozen=True)
@@ -40,37 +46,68 @@ CHAT_ACCOUNT_RULE = RateLimitRule(
 )
 
 
+def _burst_threshold(rule: RateLimitRule) -> float:
+    # `limit` events inside the window push TAT a full window ahead; half an emission interval of
+    # slack keeps the limit-th failure tripping the lockout despite clock drift between calls.
+    interval = float(rule.window_seconds) / float(rule.limit)
+    return float(rule.window_seconds) - interval / 2.0
+
+
 class InMemoryRateLimiter:
+    # GCRA state: one theoretical-arrival time and one lockout deadline per key, stored in flat
+    # double arrays indexed through a single key->slot dict so idle keys cost a few dozen bytes.
     def __init__(self) -> None:
-        self._events: dict[tuple[str, str], deque[float]] = defaultdict(deque)
-        self._blocked_until: dict[tuple[str, str], float] = {}
+        self._slots: dict[str, int] = {}
+        self._tat = array("d")
+        self._blocked_until = array("d")
+        self._free: list[int] = []
+        self._key_bytes = 0
         self._lock = RLock()
+        self._sweeps = 0
+        self._evicted = 0
+
+    @staticmethod
+    def _key(bucket: str, subject: str) -> str:
+        return f"{bucket}\x1f{subject}"
+
+    def _slot(self, key: str) -> int:
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._tat[slot] = 0.0
+            self._blocked_until[slot] = 0.0
+        else:
+            slot = len(self._tat)
+            self._tat.append(0.0)
+            self._blocked_until.append(0.0)
+        self._slots[key] = slot
+        self._key_bytes += len(key)
+        return slot
 
-    def _prune(self, key: tuple[str, str], now: float, window_seconds: int) -> None:
-        entries = self._events.get(key)
-        if entries is None:
+    def _release(self, key: str) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
             return
-        cutoff = now - float(window_seconds)
-        while entries and entries[0] < cutoff:
-            entries.popleft()
-        if not entries:
-            self._events.pop(key, None)
+        self._free.append(slot)
+        self._key_bytes -= len(key)
 
     def check(self, bucket: str, subject: str, rule: RateLimitRule) -> tuple[bool, int]:
         if not settings.request_rate_limit_enabled:
             return True, 0
         now = time.time()
-        key = (bucket, subject)
+        key = self._key(bucket, subject)
         with self._lock:
-            blocked = self._blocked_until.get(key, 0.0)
+            slot = self._slots.get(key)
+            if slot is None:
+                return True, 0
+            blocked = self._blocked_until[slot]
             if blocked > now:
                 return False, max(1, int(ceil(blocked - now)))
-            self._prune(key, now, rule.window_seconds)
-            entries = self._events.get(key, deque())
-            if len(entries) >= rule.limit:
-                until = now + float(rule.lockout_seconds)
-                self._blocked_until[key] = until
-                self._events.pop(key, None)
+            if self._tat[slot] - now > _burst_threshold(rule):
+                self._blocked_until[slot] = now + float(rule.lockout_seconds)
+                self._tat[slot] = now
                 return False, rule.lockout_seconds
             return True, 0
 
@@ -78,32 +115,301 @@ class InMemoryRateLimiter:
         if not settings.request_rate_limit_enabled:
             return
         now = time.time()
-        key = (bucket, subject)
+        key = self._key(bucket, subject)
         with self._lock:
-            self._prune(key, now, rule.window_seconds)
-            entries = self._events[key]
-            entries.append(now)
-            if len(entries) >= rule.limit:
-                self._blocked_until[key] = now + float(rule.lockout_seconds)
-                self._events.pop(key, None)
+            slot = self._slot(key)
+            tat = max(self._tat[slot], now) + float(rule.window_seconds) / float(rule.limit)
+            if tat - now > _burst_threshold(rule):
+                self._blocked_until[slot] = now + float(rule.lockout_seconds)
+                tat = now
+            self._tat[slot] = tat
 
     def reset(self, bucket: str, subject: str) -> None:
-        key = (bucket, subject)
         with self._lock:
-            self._events.pop(key, None)
-            self._blocked_until.pop(key, None)
+            self._release(self._key(bucket, subject))
+
+    def sweep(self, now: float | None = None) -> int:
+        current = time.time() if now is None else now
+        with self._lock:
+            idle = [
+                key
+                for key, slot in self._slots.items()
+                if self._tat[slot] <= current and self._blocked_until[slot] <= current
+            ]
+            for key in idle:
+                self._release(key)
+            self._sweeps += 1
+            self._evicted += len(idle)
+            if len(self._free) > 1024 and len(self._free) > len(self._slots):
+                self._compact()
+            return len(idle)
+
+    def _compact(self) -> None:
+        tat = array("d")
+        blocked_until = array("d")
+        slots: dict[str, int] = {}
+        for key, slot in self._slots.items():
+            slots[key] = len(tat)
+            tat.append(self._tat[slot])
+            blocked_until.append(self._blocked_until[slot])
+        self._slots = slots
+        self._tat = tat
+        self._blocked_until = blocked_until
+        self._free = []
 
     def stats(self) -> dict[str, int]:
+        now = time.time()
+        with self._lock:
+            tracked_keys = len(self._slots)
+            blocked_keys = sum(1 for slot in self._slots.values() if self._blocked_until[slot] > now)
+            memory_bytes = (
+                sys.getsizeof(self._slots)
+                + self._tat.buffer_info()[1] * self._tat.itemsize
+                + self._blocked_until.buffer_info()[1] * self._blocked_until.itemsize
+                + sys.getsizeof(self._free)
+                + self._key_bytes
+                + tracked_keys * sys.getsizeof("")
+            )
+            return {
+                "tracked_keys": tracked_keys,
+                "blocked_keys": blocked_keys,
+                "allocated_slots": len(self._tat),
+                "free_slots": len(self._free),
+                "memory_bytes_estimate": memory_bytes,
+                "sweeps_total": self._sweeps,
+                "evicted_keys_total": self._evicted,
+            }
+
+    def merge_state(self, key: str, tat: float, blocked_until: float) -> None:
+        with self._lock:
+            slot = self._slot(key)
+            self._tat[slot] = max(self._tat[slot], tat)
+            self._blocked_until[slot] = max(self._blocked_until[slot], blocked_until)
+
+    def reset_for_tests(self) -> None:
+        with self._lock:
+            self._slots = {}
+            self._tat = array("d")
+            self._blocked_until = array("d")
+            self._free = []
+            self._key_bytes = 0
+            self._sweeps = 0
+            self._evicted = 0
+
+
+RATE_LIMIT_ADVISORY_LOCK_ID = 0x52_4C_43_54  # "RLCT"
+
+
+@dataclass
+class _PendingHits:
+    count: int
+    rule: RateLimitRule
+
+
+class SharedRateLimiter:
+    # Serves checks from the local GCRA state and folds failures into a Postgres counter table in
+    # batches; each flush also pulls lockouts other replicas recorded since the previous flush.
+    def __init__(self, local: InMemoryRateLimiter, *, prune_every_flushes: int = 120) -> None:
+        self._local = local
+        self._prune_every_flushes = max(1, int(prune_every_flushes))
+        self._pending: dict[str, _PendingHits] = {}
+        self._pending_resets: set[str] = set()
+        self._lock = RLock()
+        self._last_pull_at = 0.0
+        self._flushes = 0
+        self._flush_failures = 0
+        self._rows_flushed = 0
+        self._remote_lockouts_applied = 0
+
+    def check(self, bucket: str, subject: str, rule: RateLimitRule) -> tuple[bool, int]:
+        return self._local.check(bucket, subject, rule)
+
+    def record_failure(self, bucket: str, subject: str, rule: RateLimitRule) -> None:
+        if not settings.request_rate_limit_enabled:
+            return
+        self._local.record_failure(bucket, subject, rule)
+        key = InMemoryRateLimiter._key(bucket, subject)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = _PendingHits(count=1, rule=rule)
+            else:
+                pending.count += 1
+                pending.rule = rule
+
+    def reset(self, bucket: str, subject: str) -> None:
+        self._local.reset(bucket, subject)
+        key = InMemoryRateLimiter._key(bucket, subject)
         with self._lock:
-            active_event_keys = len(self._events)
-            blocked_keys = sum(1 for until in self._blocked_until.values() if until > time.time())
-        return {
-            "tracked_keys": active_event_keys,
-            "blocked_keys": blocked_keys,
-        }
+            self._pending.pop(key, None)
+            self._pending_resets.add(key)
 
+    def sweep(self, now: float | None = None) -> int:
+        return self._local.sweep(now)
 
-rate_limiter = InMemoryRateLimiter()
+    def flush(self, session_factory: Callable[[], Session]) -> int:
+        with self._lock:
+            pending = self._pending
+            resets = self._pending_resets
+            self._pending = {}
+            self._pending_resets = set()
+        now = time.time()
+        merged: dict[str, tuple[float, float]] = {}
+        db = session_factory()
+        try:
+            if db.get_bind().dialect.name == "postgresql":
+                db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": RATE_LIMIT_ADVISORY_LOCK_ID})
+            resets_to_apply = [key for key in resets if key not in pending]
+            if resets_to_apply:
+                db.execute(delete(RateLimitCounter).where(RateLimitCounter.key.in_(resets_to_apply)))
+            keys = list(pending)
+            existing: dict[str, RateLimitCounter] = {}
+            for start in range(0, len(keys), 500):
+                rows = db.execute(select(RateLimitCounter).where(RateLimitCounter.key.in_(keys[start : start + 500])))
+                existing.update({row.key: row for row in rows.scalars()})
+            for key, hits in pending.items():
+                row = existing.get(key)
+                if row is None:
+                    row = RateLimitCounter(key=key, tat=0.0, blocked_until=0.0, updated_at=now)
+                    db.add(row)
+                tat = max(float(row.tat), now) + hits.count * float(hits.rule.window_seconds) / float(hits.rule.limit)
+                blocked_until = float(row.blocked_until)
+                if tat - now > _burst_threshold(hits.rule):
+                    blocked_until = max(blocked_until, now + float(hits.rule.lockout_seconds))
+                    tat = now
+                row.tat = tat
+                row.blocked_until = blocked_until
+                row.updated_at = now
+                merged[key] = (tat, blocked_until)
+            remote = db.execute(
+                select(RateLimitCounter.key, RateLimitCounter.tat, RateLimitCounter.blocked_until).where(
+                    RateLimitCounter.updated_at >= self._last_pull_at - 1.0,
+                    RateLimitCounter.blocked_until > now,
+                )
+            ).all()
+            if (self._flushes + 1) % self._prune_every_flushes == 0:
+                db.execute(
+                    delete(RateLimitCounter).where(RateLimitCounter.tat < now, RateLimitCounter.blocked_until < now)
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(pending, resets)
+            with self._lock:
+                self._flush_failures += 1
+            raise
+        finally:
+            db.close()
+
+        for key, (tat, blocked_until) in merged.items():
+            self._local.merge_state(key, tat, blocked_until)
+        applied = 0
+        for key, tat, blocked_until in remote:
+            if key in merged:
+                continue
+            self._local.merge_state(key, float(tat), float(blocked_until))
+            applied += 1
+        with self._lock:
+            self._last_pull_at = now
+            self._flushes += 1
+            self._rows_flushed += len(merged)
+            self._remote_lockouts_applied += applied
+        return len(merged)
+
+    def _requeue(self, pending: dict[str, _PendingHits], resets: set[str]) -> None:
+        with self._lock:
+            for key, hits in pending.items():
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = hits
+                else:
+                    newer.count += hits.count
+            self._pending_resets.update(key for key in resets if key not in self._pending)
+
+    def stats(self) -> dict[str, int | str]:
+        stats: dict[str, int | str] = dict(self._local.stats())
+        with self._lock:
+            stats.update(
+                {
+                    "backend": "postgres",
+                    "pending_keys": len(self._pending),
+                    "pending_resets": len(self._pending_resets),
+                    "flushes_total": self._flushes,
+                    "flush_failures_total": self._flush_failures,
+                    "rows_flushed_total": self._rows_flushed,
+                    "remote_lockouts_applied_total": self._remote_lockouts_applied,
+                }
+            )
+        return stats
+
+    def reset_for_tests(self) -> None:
+        self._local.reset_for_tests()
+        with self._lock:
+            self._pending.clear()
+            self._pending_resets.clear()
+            self._last_pull_at = 0.0
+            self._flushes = 0
+            self._flush_failures = 0
+            self._rows_flushed = 0
+            self._remote_lockouts_applied = 0
+
+
+def _build_rate_limiter() -> InMemoryRateLimiter | SharedRateLimiter:
+    local = InMemoryRateLimiter()
+    if settings.rate_limit_backend.strip().lower() == "postgres":
+        return SharedRateLimiter(local)
+    return local
+
+
+rate_limiter = _build_rate_limiter()
+
+
+@dataclass
+class RateLimitSweeperHandle:
+    thread: Thread
+    stop_event: Event
+
+
+def _run_sweeper(
+    limiter: InMemoryRateLimiter | SharedRateLimiter,
+    stop_event: Event,
+    interval_seconds: float,
+    logger: logging.Logger,
+) -> None:
+    while not stop_event.wait(interval_seconds):
+        try:
+            limiter.sweep()
+        except Exception:
+            logger.warning("Rate limiter sweep failed", exc_info=True)
+
+
+def start_rate_limit_sweeper(
+    *,
+    limiter: InMemoryRateLimiter | SharedRateLimiter | None = None,
+    interval_seconds: float = 30.0,
+    logger: logging.Logger | None = None,
+) -> RateLimitSweeperHandle:
+    stop_event = Event()
+    thread = Thread(
+        target=_run_sweeper,
+        args=(
+            limiter or rate_limiter,
+            stop_event,
+            max(0.05, float(interval_seconds)),
+            logger or logging.getLogger("children-of-ikphelion.rate_limit"),
+        ),
+        name="aop-rate-limit-sweeper",
+        daemon=True,
+    )
+    thread.start()
+    return RateLimitSweeperHandle(thread=thread, stop_event=stop_event)
+
+
+def stop_rate_limit_sweeper(handle: RateLimitSweeperHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    handle.stop_event.set()
+    handle.thread.join(timeout=max(0.0, float(join_timeout_seconds)))
 
 
 def request_ip(request: Request) -> str:
@@ -127,3 +433,60 @@ def ensure_not_rate_limited(bucket: str, subject: str, rule: RateLimitRule) -> N
             "retry_after_seconds": retry_after,
         },
     )
+
+
+@dataclass
+class RateLimitFlusherHandle:
+    limiter: SharedRateLimiter
+    thread: Thread
+    stop_event: Event
+    session_factory: Callable[[], Session]
+
+
+def _run_flusher(
+    limiter: SharedRateLimiter,
+    session_factory: Callable[[], Session],
+    stop_event: Event,
+    interval_seconds: float,
+    logger: logging.Logger,
+) -> None:
+    while not stop_event.wait(interval_seconds):
+        try:
+            limiter.flush(session_factory)
+        except Exception:
+            logger.warning("Shared rate-limit flush failed; counters re-queued", exc_info=True)
+
+
+def start_rate_limit_flusher(
+    *,
+    session_factory: Callable[[], Session],
+    limiter: SharedRateLimiter,
+    interval_seconds: float = 0.5,
+    logger: logging.Logger | None = None,
+) -> RateLimitFlusherHandle:
+    stop_event = Event()
+    thread = Thread(
+        target=_run_flusher,
+        args=(
+            limiter,
+            session_factory,
+            stop_event,
+            max(0.05, float(interval_seconds)),
+            logger or logging.getLogger("children-of-ikphelion.rate_limit"),
+        ),
+        name="aop-rate-limit-flusher",
+        daemon=True,
+    )
+    thread.start()
+    return RateLimitFlusherHandle(limiter=limiter, thread=thread, stop_event=stop_event, session_factory=session_factory)
+
+
+def stop_rate_limit_flusher(handle: RateLimitFlusherHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    handle.stop_event.set()
+    handle.thread.join(timeout=max(0.0, float(join_timeout_seconds)))
+    try:
+        handle.limiter.flush(handle.session_factory)
+    except Exception:
+        logging.getLogger("children-of-ikphelion.rate_limit").warning("Final rate-limit flush failed", exc_info=True)
@@ -1,15 +1,66 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from collections import defaultdict
+from collections import deque
 from dataclasses import dataclass
 from datetime import UTC, datetime
+from itertools import count
+import json
+import logging
+import random
+import sys
+import time
+from typing import TYPE_CHECKING, Iterable
+from uuid import uuid4
 
 from fastapi import WebSocket
 
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.realtime_bus import RealtimeBus
+
+SEND_OVERFLOW_DROP_OLDEST = "drop_oldest"
+SEND_OVERFLOW_CONFLATE = "conflate"
+SEND_OVERFLOW_DISCONNECT = "disconnect"
+_SEND_OVERFLOW_POLICIES = {SEND_OVERFLOW_DROP_OLDEST, SEND_OVERFLOW_CONFLATE, SEND_OVERFLOW_DISCONNECT}
+
+RESUME_FRESH = "fresh"
+RESUME_RESUMED = "resumed"
+RESUME_RESYNC_REQUIRED = "resync_required"
+
+logger = logging.getLogger("children-of-ikphelion.realtime")
+
+_EMPTY: frozenset[int] = frozenset()
+
+
+def _cow_add(index: dict, key: int | str, conn_id: int) -> None:
+    index[key] = index.get(key, _EMPTY) | {conn_id}
+
+
+def _cow_discard(index: dict, key: int | str, conn_id: int) -> None:
+    current = index.get(key)
+    if current is None or conn_id not in current:
+        return
+    remaining = current - {conn_id}
+    if remaining:
+        index[key] = remaining
+    else:
+        index.pop(key, None)
+
+
+def _intern(value: str | None) -> str | None:
+    return sys.intern(value) if value else None
+
+
+def _splice(frame: str, key: str, value: int) -> str:
+    # Appends one integer field to an already encoded JSON object without re-encoding the shared payload.
+    if len(frame) <= 2:
+        return f'{{"{key}": {value}}}'
+    return f'{frame[:-1]}, "{key}": {value}}}'
+
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionMeta:
     user_id: int
     channel_id: int | None
@@ -20,66 +71,591 @@ class ConnectionMeta:
     is_hub_zone: bool = False
     adjacent_level_ids: tuple[int, ...] = ()
     allow_adjacent_preview: bool = True
+    resumable: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class ResumeOutcome:
+    status: str
+    stream_id: str
+    last_event_seq: int
+    replayed: int = 0
+
+
+class _ReplayStream:
+    __slots__ = ("stream_id", "seq", "frames", "last_frame", "last_stamped", "refs")
+
+    def __init__(self, limit: int) -> None:
+        self.stream_id = uuid4().hex
+        self.seq = 0
+        # (event seq, unstamped frame); unstamped frames are shared with every other recipient of the broadcast.
+        self.frames: deque[tuple[int, str]] = deque(maxlen=limit)
+        self.last_frame: str | None = None
+        self.last_stamped = ""
+        self.refs = 0
+
+    def stamp(self, frame: str) -> str:
+        # One broadcast reaching several sockets of the same user gets a single sequence number.
+        if frame is self.last_frame:
+            return self.last_stamped
+        self.seq += 1
+        self.frames.append((self.seq, frame))
+        self.last_frame = frame
+        self.last_stamped = _splice(frame, "event_seq", self.seq)
+        return self.last_stamped
+
+
+class _Connection:
+    __slots__ = (
+        "conn_id",
+        "websocket",
+        "meta",
+        "frames",
+        "waiter",
+        "task",
+        "sending",
+        "max_depth",
+        "dropped",
+        "conflated",
+        "last_seen",
+        "stream",
+        "detached_at",
+    )
+
+    def __init__(self, conn_id: int, websocket: WebSocket, meta: ConnectionMeta) -> None:
+        self.conn_id = conn_id
+        self.websocket: WebSocket | None = websocket
+        self.meta = meta
+        # (conflate key, encoded frame); frames are encoded once per broadcast and shared across sockets. A list
+        # is far smaller than an idle deque and the queue is bounded, so front deletes stay cheap.
+        self.frames: list[tuple[str | None, str]] = []
+        # Created only while the writer is parked on an empty queue (a Future is a fraction of an asyncio.Event).
+        self.waiter: asyncio.Future | None = None
+        self.task: asyncio.Task | None = None
+        self.sending = False
+        self.max_depth = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.last_seen = time.monotonic()
+        self.stream: _ReplayStream | None = None
+        # Set when a resumable socket goes away: the record keeps collecting its stream until the window lapses.
+        self.detached_at = 0.0
 
 
 class RealtimeHub:
-    def __init__(self) -> None:
-        self._channels: dict[int, set[WebSocket]] = defaultdict(set)
-        self._users: dict[int, set[WebSocket]] = defaultdict(set)
-        self._zones: dict[int, set[WebSocket]] = defaultdict(set)
-        self._meta: dict[WebSocket, ConnectionMeta] = {}
+    def __init__(
+        self,
+        *,
+        send_queue_max_frames: int | None = None,
+        send_overflow_policy: str | None = None,
+        heartbeat_interval_seconds: float | None = None,
+        idle_timeout_seconds: float | None = None,
+        idle_reap_batch_size: int | None = None,
+        global_notify_rate_per_second: int | None = None,
+        global_notify_wave_interval_ms: int | None = None,
+        reconnect_jitter_ms: int | None = None,
+        resume_buffer_frames: int | None = None,
+        resume_window_seconds: float | None = None,
+    ) -> None:
+        limit = settings.realtime_send_queue_max_frames if send_queue_max_frames is None else send_queue_max_frames
+        policy = (send_overflow_policy or settings.realtime_send_overflow_policy or "").strip().lower()
+        self._send_queue_max_frames = max(1, int(limit))
+        self._send_overflow_policy = policy if policy in _SEND_OVERFLOW_POLICIES else SEND_OVERFLOW_DROP_OLDEST
+        if heartbeat_interval_seconds is None:
+            heartbeat_interval_seconds = settings.realtime_heartbeat_interval_seconds
+        if idle_timeout_seconds is None:
+            idle_timeout_seconds = settings.realtime_idle_timeout_seconds
+        if idle_reap_batch_size is None:
+            idle_reap_batch_size = settings.realtime_idle_reap_batch_size
+        self._heartbeat_interval_seconds = max(0.0, float(heartbeat_interval_seconds))
+        self._idle_timeout_seconds = max(0.0, float(idle_timeout_seconds))
+        self._idle_reap_batch_size = max(1, int(idle_reap_batch_size))
+        self._heartbeat_task: asyncio.Task | None = None
+        if global_notify_rate_per_second is None:
+            global_notify_rate_per_second = settings.realtime_global_notify_rate_per_second
+        if global_notify_wave_interval_ms is None:
+            global_notify_wave_interval_ms = settings.realtime_global_notify_wave_interval_ms
+        if reconnect_jitter_ms is None:
+            reconnect_jitter_ms = settings.realtime_reconnect_jitter_ms
+        self._global_wave_interval_seconds = max(0.001, int(global_notify_wave_interval_ms) / 1000.0)
+        rate = max(0, int(global_notify_rate_per_second))
+        # 0 disables pacing: global notices go out in a single pass.
+        self._global_wave_size = max(1, int(rate * self._global_wave_interval_seconds)) if rate > 0 else 0
+        self._reconnect_jitter_ms = max(0, int(reconnect_jitter_ms))
+        if resume_buffer_frames is None:
+            resume_buffer_frames = settings.realtime_resume_buffer_frames
+        if resume_window_seconds is None:
+            resume_window_seconds = settings.realtime_resume_window_seconds
+        self._resume_buffer_frames = max(1, int(resume_buffer_frames))
+        self._resume_window_seconds = max(0.0, float(resume_window_seconds))
+        self._streams: dict[int, _ReplayStream] = {}
+        self._resumes_total = 0
+        self._resume_replayed_frames_total = 0
+        self._resync_required_total = 0
+        self._paced_tasks: set[asyncio.Task] = set()
+        self._paced_waves_total = 0
+        self._heartbeats_sent_total = 0
+        self._idle_evictions_total = 0
+        # Connections are keyed by small integer ids; every index below stores ids, not WebSocket objects.
+        self._conn_seq = count(1)
+        self._connections: dict[int, _Connection] = {}
+        self._conn_ids: dict[WebSocket, int] = {}
+        # Per-channel/zone/user shards hold immutable recipient sets. Mutations swap in a new frozenset for the one
+        # shard they touch and never await, so broadcasts read a consistent snapshot without taking a lock.
+        self._channels: dict[int, frozenset[int]] = {}
+        self._users: dict[int, frozenset[int]] = {}
+        self._zones: dict[int, frozenset[int]] = {}
+        # level id -> connections that list it in adjacent_level_ids and allow adjacent preview.
+        self._adjacent: dict[int, frozenset[int]] = {}
+        self._instances: dict[str, frozenset[int]] = {}
+        self._parties: dict[str, frozenset[int]] = {}
         self._hub_presence: dict[int, int] = {}
-        self._lock = asyncio.Lock()
+        # Shared adjacency tuples: every socket on a level usually reports the same neighbours.
+        self._adjacency_pool: dict[tuple[int, ...], tuple[int, ...]] = {}
+        self._bus: RealtimeBus | None = None
+        # Captured on first connect so sync routes running in the threadpool can hand scope changes to the loop.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._frames_enqueued_total = 0
+        self._frames_sent_total = 0
+        self._frames_dropped_total = 0
+        self._frames_conflated_total = 0
+        self._overflow_disconnects_total = 0
+        self._send_failures_total = 0
+
+    def _connection(self, websocket: WebSocket) -> _Connection | None:
+        conn_id = self._conn_ids.get(websocket)
+        return self._connections.get(conn_id) if conn_id is not None else None
+
+    def _pooled_adjacency(self, level_ids: tuple[int, ...]) -> tuple[int, ...]:
+        if not level_ids:
+            return ()
+        return self._adjacency_pool.setdefault(level_ids, level_ids)
+
+    def connection_meta(self, websocket: WebSocket) -> ConnectionMeta | None:
+        conn = self._connection(websocket)
+        return conn.meta if conn is not None else None
+
+    def touch(self, websocket: WebSocket) -> None:
+        conn = self._connection(websocket)
+        if conn is not None:
+            conn.last_seen = time.monotonic()
 
-    async def connect(self, websocket: WebSocket, meta: ConnectionMeta) -> None:
+    def _ensure_heartbeat(self) -> None:
+        if self._heartbeat_interval_seconds <= 0:
+            return
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval_seconds)
+            try:
+                await self.heartbeat_once()
+            except Exception:
+                logger.warning("Realtime heartbeat sweep failed", exc_info=True)
+
+    async def heartbeat_once(self, *, now: float | None = None) -> int:
+        # Half-open sockets still accept writes into the kernel buffer, so eviction keys off inbound activity.
+        current = time.monotonic() if now is None else now
+        detached_cutoff = current - self._resume_window_seconds
+        for conn in [conn for conn in self._connections.values() if conn.websocket is None]:
+            if conn.detached_at < detached_cutoff:
+                self._release(conn)
+        stale: list[WebSocket] = []
+        if self._idle_timeout_seconds > 0:
+            cutoff = current - self._idle_timeout_seconds
+            stale = [
+                conn.websocket
+                for conn in list(self._connections.values())
+                if conn.websocket is not None and conn.last_seen < cutoff
+            ]
+        evicted = 0
+        for start in range(0, len(stale), self._idle_reap_batch_size):
+            for socket in stale[start : start + self._idle_reap_batch_size]:
+                await self._evict_idle(socket)
+                evicted += 1
+            await asyncio.sleep(0)
+        if self._connections:
+            frame = json.dumps({"type": "heartbeat", "timestamp": datetime.now(UTC).isoformat()})
+            self._heartbeats_sent_total += await self._fan_out(tuple(self._connections), frame, sequenced=False)
+        return evicted
+
+    async def _evict_idle(self, websocket: WebSocket) -> None:
+        from app.services.observability import record_ws_disconnect
+
+        if websocket not in self._conn_ids:
+            return
+        self._idle_evictions_total += 1
+        record_ws_disconnect("idle_timeout")
+        await self.disconnect(websocket)
+        # Closing a half-open socket can stall; never hold up the sweep on it.
+        asyncio.get_running_loop().create_task(self._close_quietly(websocket, 4408))
+
+    async def _close_quietly(self, websocket: WebSocket, code: int) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=5.0)
+        except Exception:
+            pass
+
+    async def stop_heartbeat(self) -> None:
+        task = self._heartbeat_task
+        self._heartbeat_task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def attach_bus(self, bus: RealtimeBus | None) -> None:
+        self._bus = bus
+
+    def _publish(self, envelope: dict) -> None:
+        bus = self._bus
+        if bus is not None:
+            bus.publish(envelope)
+
+    async def deliver_remote(self, envelope: dict) -> None:
+        kind = envelope.get("k")
+        if kind == "scope":
+            self._apply_user_scope(int(envelope["user_id"]), envelope.get("instance_id"), envelope.get("party_id"))
+            return
+        frame = envelope.get("frame")
+        if not isinstance(frame, str):
+            return
+        if kind == "channel":
+            await self._deliver_channel(int(envelope["channel_id"]), frame)
+        elif kind == "zone":
+            await self._deliver_zone(
+                zone_level_id=int(envelope["zone_level_id"]),
+                frame=frame,
+                include_adjacent_preview=bool(envelope.get("adjacent")),
+                exclude_user_id=envelope.get("exclude_user_id"),
+                conflate_key=envelope.get("conflate_key"),
+                instance_id=envelope.get("instance_id"),
+            )
+        elif kind == "instance":
+            await self._deliver_scoped(self._instances, str(envelope["instance_id"]), frame, envelope.get("exclude_user_id"))
+        elif kind == "party":
+            await self._deliver_scoped(self._parties, str(envelope["party_id"]), frame, envelope.get("exclude_user_id"))
+        elif kind == "all":
+            await self._deliver_all(frame, reconnect_hint=bool(envelope.get("reconnect_hint")))
+
+    def _enqueue(self, conn: _Connection, frame: str, conflate_key: str | None = None) -> bool:
+        # Never awaits: a broadcast only appends the shared encoded frame and wakes the socket's writer.
+        frames = conn.frames
+        if conflate_key is not None and self._send_overflow_policy == SEND_OVERFLOW_CONFLATE:
+            for index, (key, _) in enumerate(frames):
+                if key == conflate_key:
+                    frames[index] = (conflate_key, frame)
+                    conn.conflated += 1
+                    self._frames_conflated_total += 1
+                    return True
+        if len(frames) >= self._send_queue_max_frames:
+            if self._send_overflow_policy == SEND_OVERFLOW_DISCONNECT:
+                return False
+            del frames[0]
+            conn.dropped += 1
+            self._frames_dropped_total += 1
+        frames.append((conflate_key, frame))
+        self._frames_enqueued_total += 1
+        if len(frames) > conn.max_depth:
+            conn.max_depth = len(frames)
+        waiter = conn.waiter
+        if waiter is not None:
+            conn.waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+        return True
+
+    async def _fan_out(
+        self,
+        conn_ids: Iterable[int],
+        frame: str,
+        conflate_key: str | None = None,
+        *,
+        reconnect_jitter_ms: int = 0,
+        sequenced: bool = True,
+    ) -> int:
+        enqueued = 0
+        overflowed: list[WebSocket] = []
+        connections = self._connections
+        # The payload is encoded once; event sequence numbers and jittered reconnect hints are spliced on per socket.
+        for conn_id in conn_ids:
+            conn = connections.get(conn_id)
+            if conn is None:
+                continue
+            outbound = frame
+            stream = conn.stream
+            if stream is not None and sequenced:
+                outbound = stream.stamp(frame)
+            if conn.websocket is None:
+                continue
+            if reconnect_jitter_ms > 0:
+                outbound = _splice(outbound, "reconnect_after_ms", random.randint(0, reconnect_jitter_ms))
+            if self._enqueue(conn, outbound, conflate_key):
+                enqueued += 1
+            else:
+                overflowed.append(conn.websocket)
+        for socket in overflowed:
+            await self._drop_slow_consumer(socket)
+        return enqueued
+
+    async def _drop_slow_consumer(self, websocket: WebSocket) -> None:
+        from app.services.observability import record_ws_disconnect
+
+        if websocket not in self._conn_ids:
+            return
+        self._overflow_disconnects_total += 1
+        record_ws_disconnect("send_queue_overflow")
+        await self.disconnect(websocket)
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def _writer(self, conn: _Connection) -> None:
+        websocket = conn.websocket
+        frames = conn.frames
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not frames:
+                    waiter = loop.create_future()
+                    conn.waiter = waiter
+                    await waiter
+                    continue
+                conn.sending = True
+                while frames:
+                    frame = frames[0][1]
+                    del frames[0]
+                    await websocket.send_text(frame)
+                    self._frames_sent_total += 1
+                conn.sending = False
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            conn.sending = False
+            self._send_failures_total += 1
+            logger.debug("Realtime send failed; dropping connection", exc_info=True)
+            await self.disconnect(websocket)
+
+    async def wait_until_drained(self, timeout_seconds: float = 1.0) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, float(timeout_seconds))
+        while any(conn.frames or conn.sending for conn in self._connections.values()):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0)
+        return True
+
+    def send_queue_stats(self) -> dict[str, object]:
+        # Read from the ops thread: copy the values in one C-level call before iterating.
+        records = list(self._connections.values())
+        connections = [conn for conn in records if conn.websocket is not None]
+        depths = sorted((len(conn.frames) for conn in connections), reverse=True)
+        return {
+            "connections": len(connections),
+            "queue_limit": self._send_queue_max_frames,
+            "overflow_policy": self._send_overflow_policy,
+            "queued_frames": sum(depths),
+            "max_queue_depth": depths[0] if depths else 0,
+            "max_queue_depth_observed": max((conn.max_depth for conn in connections), default=0),
+            "sockets_over_half_full": sum(1 for depth in depths if depth * 2 >= self._send_queue_max_frames),
+            "top_queue_depths": depths[:10],
+            "frames_enqueued_total": self._frames_enqueued_total,
+            "frames_sent_total": self._frames_sent_total,
+            "frames_dropped_total": self._frames_dropped_total,
+            "frames_conflated_total": self._frames_conflated_total,
+            "overflow_disconnects_total": self._overflow_disconnects_total,
+            "send_failures_total": self._send_failures_total,
+            "heartbeat_interval_seconds": self._heartbeat_interval_seconds,
+            "idle_timeout_seconds": self._idle_timeout_seconds,
+            "heartbeats_sent_total": self._heartbeats_sent_total,
+            "idle_evictions_total": self._idle_evictions_total,
+            "global_wave_size": self._global_wave_size,
+            "paced_notifications_in_flight": len(self._paced_tasks),
+            "paced_waves_total": self._paced_waves_total,
+            "resume_buffer_frames": self._resume_buffer_frames,
+            "resume_window_seconds": self._resume_window_seconds,
+            "resumable_streams": len(self._streams),
+            "detached_connections": len(records) - len(connections),
+            "resumes_total": self._resumes_total,
+            "resume_replayed_frames_total": self._resume_replayed_frames_total,
+            "resync_required_total": self._resync_required_total,
+        }
+
+    def _index_adjacent(self, conn_id: int, meta: ConnectionMeta) -> None:
+        if not meta.allow_adjacent_preview:
+            return
+        for level_id in meta.adjacent_level_ids:
+            _cow_add(self._adjacent, level_id, conn_id)
+
+    def _unindex_adjacent(self, conn_id: int, meta: ConnectionMeta) -> None:
+        for level_id in meta.adjacent_level_ids:
+            _cow_discard(self._adjacent, level_id, conn_id)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        meta: ConnectionMeta,
+        *,
+        resume_stream: str | None = None,
+        resume_from_seq: int | None = None,
+    ) -> ResumeOutcome | None:
         await websocket.accept()
+        self._loop = asyncio.get_running_loop()
         join_event: tuple[int, int] | None = None
-        async with self._lock:
-            if meta.channel_id is not None:
-                self._channels[meta.channel_id].add(websocket)
-            if meta.zone_level_id is not None:
-                self._zones[meta.zone_level_id].add(websocket)
-            self._users[meta.user_id].add(websocket)
-            self._meta[websocket] = meta
-            if meta.is_hub_zone and meta.zone_level_id is not None:
-                current_hub = self._hub_presence.get(meta.user_id)
-                if current_hub != meta.zone_level_id:
-                    self._hub_presence[meta.user_id] = meta.zone_level_id
-                    join_event = (meta.user_id, meta.zone_level_id)
+        meta.client_version = sys.intern(meta.client_version)
+        meta.instance_id = _intern(meta.instance_id)
+        meta.party_id = _intern(meta.party_id)
+        meta.adjacent_level_ids = self._pooled_adjacency(tuple(meta.adjacent_level_ids))
+        conn_id = next(self._conn_seq)
+        conn = _Connection(conn_id, websocket, meta)
+        if meta.channel_id is not None:
+            _cow_add(self._channels, meta.channel_id, conn_id)
+        if meta.zone_level_id is not None:
+            _cow_add(self._zones, meta.zone_level_id, conn_id)
+        _cow_add(self._users, meta.user_id, conn_id)
+        if meta.instance_id:
+            _cow_add(self._instances, meta.instance_id, conn_id)
+        if meta.party_id:
+            _cow_add(self._parties, meta.party_id, conn_id)
+        self._index_adjacent(conn_id, meta)
+        self._connections[conn_id] = conn
+        self._conn_ids[websocket] = conn_id
+        outcome: ResumeOutcome | None = None
+        if meta.resumable:
+            # No await between indexing and replay: a live broadcast cannot slip in ahead of the missed frames.
+            outcome = self._attach_stream(conn, resume_stream, resume_from_seq)
+        conn.task = asyncio.create_task(self._writer(conn))
+        self._ensure_heartbeat()
+        if meta.is_hub_zone and meta.zone_level_id is not None:
+            current_hub = self._hub_presence.get(meta.user_id)
+            if current_hub != meta.zone_level_id:
+                self._hub_presence[meta.user_id] = meta.zone_level_id
+                join_event = (meta.user_id, meta.zone_level_id)
         if join_event is not None:
             await self.broadcast_zone(
                 zone_level_id=join_event[1],
                 include_adjacent_preview=False,
                 exclude_user_id=join_event[0],
+                instance_id=meta.instance_id,
                 payload={"type": "hub_presence_join", "user_id": join_event[0], "level_id": join_event[1]},
             )
+        return outcome
+
+    def _attach_stream(
+        self,
+        conn: _Connection,
+        resume_stream: str | None,
+        resume_from_seq: int | None,
+    ) -> ResumeOutcome:
+        user_id = conn.meta.user_id
+        stream = self._streams.get(user_id)
+        if stream is None:
+            stream = self._streams[user_id] = _ReplayStream(self._resume_buffer_frames)
+        stream.refs += 1
+        conn.stream = stream
+        # The reconnecting socket takes over from any detached record still collecting this user's stream.
+        for other_id in self._users.get(user_id, _EMPTY):
+            other = self._connections.get(other_id)
+            if other is not None and other.websocket is None:
+                self._release(other)
+        if resume_from_seq is None:
+            return ResumeOutcome(RESUME_FRESH, stream.stream_id, stream.seq)
+        oldest_seq = stream.frames[0][0] if stream.frames else stream.seq + 1
+        if resume_stream != stream.stream_id or resume_from_seq > stream.seq or resume_from_seq < oldest_seq - 1:
+            self._resync_required_total += 1
+            conn.frames.append(
+                (
+                    None,
+                    json.dumps(
+                        {
+                            "type": "resync_required",
+                            "stream_id": stream.stream_id,
+                            "resume_from_seq": resume_from_seq,
+                            "last_event_seq": stream.seq,
+                        }
+                    ),
+                )
+            )
+            return ResumeOutcome(RESUME_RESYNC_REQUIRED, stream.stream_id, stream.seq)
+        missed = [(seq, frame) for seq, frame in stream.frames if seq > resume_from_seq]
+        conn.frames.append(
+            (
+                None,
+                json.dumps(
+                    {
+                        "type": "resume_ok",
+                        "stream_id": stream.stream_id,
+                        "resume_from_seq": resume_from_seq,
+                        "last_event_seq": stream.seq,
+                        "replayed": len(missed),
+                    }
+                ),
+            )
+        )
+        # Replay bypasses the send-queue bound: the ring is already capped and dropping here would defeat the resume.
+        conn.frames.extend((None, _splice(frame, "event_seq", seq)) for seq, frame in missed)
+        conn.max_depth = max(conn.max_depth, len(conn.frames))
+        self._resumes_total += 1
+        self._resume_replayed_frames_total += len(missed)
+        return ResumeOutcome(RESUME_RESUMED, stream.stream_id, stream.seq, len(missed))
+
+    def _release(self, conn: _Connection) -> None:
+        conn_id = conn.conn_id
+        if self._connections.pop(conn_id, None) is None:
+            return
+        meta = conn.meta
+        self._unindex_adjacent(conn_id, meta)
+        if meta.channel_id is not None:
+            _cow_discard(self._channels, meta.channel_id, conn_id)
+        if meta.zone_level_id is not None:
+            _cow_discard(self._zones, meta.zone_level_id, conn_id)
+        _cow_discard(self._users, meta.user_id, conn_id)
+        if meta.instance_id:
+            _cow_discard(self._instances, meta.instance_id, conn_id)
+        if meta.party_id:
+            _cow_discard(self._parties, meta.party_id, conn_id)
+        stream = conn.stream
+        if stream is not None:
+            conn.stream = None
+            stream.refs -= 1
+            if stream.refs <= 0 and self._streams.get(meta.user_id) is stream:
+                self._streams.pop(meta.user_id, None)
+
+    def _has_live_connection(self, user_id: int) -> bool:
+        connections = self._connections
+        for conn_id in self._users.get(user_id, _EMPTY):
+            conn = connections.get(conn_id)
+            if conn is not None and conn.websocket is not None:
+                return True
+        return False
 
     async def disconnect(self, websocket: WebSocket) -> None:
         leave_event: tuple[int, int] | None = None
-        async with self._lock:
-            meta = self._meta.pop(websocket, None)
-            if meta is None:
-                return
-            if meta.channel_id is not None:
-                sockets = self._channels.get(meta.channel_id)
-                if sockets is not None:
-                    sockets.discard(websocket)
-                    if not sockets:
-                        self._channels.pop(meta.channel_id, None)
-            if meta.zone_level_id is not None:
-                zone_sockets = self._zones.get(meta.zone_level_id)
-                if zone_sockets is not None:
-                    zone_sockets.discard(websocket)
-                    if not zone_sockets:
-                        self._zones.pop(meta.zone_level_id, None)
-            user_sockets = self._users.get(meta.user_id)
-            if user_sockets is not None:
-                user_sockets.discard(websocket)
-                if not user_sockets:
-                    self._users.pop(meta.user_id, None)
-                    hub_id = self._hub_presence.pop(meta.user_id, None)
-                    if hub_id is not None:
-                        leave_event = (meta.user_id, hub_id)
+        conn_id = self._conn_ids.pop(websocket, None)
+        if conn_id is None:
+            return
+        conn = self._connections[conn_id]
+        if conn.task is not None and conn.task is not asyncio.current_task():
+            conn.task.cancel()
+        meta = conn.meta
+        if conn.stream is not None and self._resume_window_seconds > 0:
+            # Stay indexed without a socket so broadcasts keep landing in the replay ring until the user resumes.
+            conn.websocket = None
+            conn.task = None
+            conn.waiter = None
+            conn.sending = False
+            conn.frames.clear()
+            conn.detached_at = time.monotonic()
+        else:
+            self._release(conn)
+        if not self._has_live_connection(meta.user_id):
+            hub_id = self._hub_presence.pop(meta.user_id, None)
+            if hub_id is not None:
+                leave_event = (meta.user_id, hub_id)
         if leave_event is not None:
             await self.broadcast_zone(
                 zone_level_id=leave_event[1],
@@ -90,13 +666,11 @@ class RealtimeHub:
 
     async def broadcast(self, channel_id: int, payload: dict) -> None:
         message = json.dumps(payload)
-        async with self._lock:
-            sockets = list(self._channels.get(channel_id, set()))
-        for socket in sockets:
-            try:
-                await socket.send_text(message)
-            except Exception:
-                await self.disconnect(socket)
+        self._publish({"k": "channel", "channel_id": channel_id, "frame": message})
+        await self._deliver_channel(channel_id, message)
+
+    async def _deliver_channel(self, channel_id: int, frame: str) -> None:
+        await self._fan_out(self._channels.get(channel_id, _EMPTY), frame)
 
     async def update_zone_scope(
         self,
@@ -122,47 +696,41 @@ class RealtimeHub:
 
         join_event: tuple[int, int] | None = None
         leave_event: tuple[int, int] | None = None
-        async with self._lock:
-            existing = self._meta.get(websocket)
-            if existing is None:
-                return None
-            previous_zone = existing.zone_level_id
+        conn = self._connection(websocket)
+        if conn is None:
+            return None
+        conn_id = conn.conn_id
+        meta = conn.meta
+        user_id = meta.user_id
+        previous_zone = meta.zone_level_id
+        was_hub_zone = meta.is_hub_zone
+        normalized_zone = zone_level_id if isinstance(zone_level_id, int) and zone_level_id > 0 else None
+        # Updated in place: scope changes are frequent and the slotted meta is owned by the hub.
+        self._unindex_adjacent(conn_id, meta)
+        meta.zone_level_id = normalized_zone
+        meta.is_hub_zone = bool(is_hub_zone) and normalized_zone is not None
+        meta.adjacent_level_ids = self._pooled_adjacency(tuple(sanitized_adjacent))
+        meta.allow_adjacent_preview = bool(allow_adjacent_preview)
+        self._index_adjacent(conn_id, meta)
+        if previous_zone != normalized_zone:
             if previous_zone is not None:
-                zone_sockets = self._zones.get(previous_zone)
-                if zone_sockets is not None:
-                    zone_sockets.discard(websocket)
-                    if not zone_sockets:
-                        self._zones.pop(previous_zone, None)
-
-            normalized_zone = zone_level_id if isinstance(zone_level_id, int) and zone_level_id > 0 else None
-            normalized_is_hub = bool(is_hub_zone) and normalized_zone is not None
-            updated = ConnectionMeta(
-                user_id=existing.user_id,
-                channel_id=existing.channel_id,
-                client_version=existing.client_version,
-                zone_level_id=normalized_zone,
-                instance_id=existing.instance_id,
-                party_id=existing.party_id,
-                is_hub_zone=normalized_is_hub,
-                adjacent_level_ids=tuple(sanitized_adjacent),
-                allow_adjacent_preview=bool(allow_adjacent_preview),
-            )
-            self._meta[websocket] = updated
+                _cow_discard(self._zones, previous_zone, conn_id)
             if normalized_zone is not None:
-                self._zones[normalized_zone].add(websocket)
-            previous_hub = self._hub_presence.get(existing.user_id)
-            if existing.is_hub_zone and previous_hub is not None and previous_hub != normalized_zone:
-                leave_event = (existing.user_id, previous_hub)
-                self._hub_presence.pop(existing.user_id, None)
-            if updated.is_hub_zone and normalized_zone is not None:
-                if self._hub_presence.get(existing.user_id) != normalized_zone:
-                    self._hub_presence[existing.user_id] = normalized_zone
-                    join_event = (existing.user_id, normalized_zone)
-            elif not updated.is_hub_zone:
-                current_hub = self._hub_presence.pop(existing.user_id, None)
-                if current_hub is not None:
-                    leave_event = (existing.user_id, current_hub)
+                _cow_add(self._zones, normalized_zone, conn_id)
+        previous_hub = self._hub_presence.get(user_id)
+        if was_hub_zone and previous_hub is not None and previous_hub != normalized_zone:
+            leave_event = (user_id, previous_hub)
+            self._hub_presence.pop(user_id, None)
+        if meta.is_hub_zone and normalized_zone is not None:
+            if self._hub_presence.get(user_id) != normalized_zone:
+                self._hub_presence[user_id] = normalized_zone
+                join_event = (user_id, normalized_zone)
+        elif not meta.is_hub_zone:
+            current_hub = self._hub_presence.pop(user_id, None)
+            if current_hub is not None:
+                leave_event = (user_id, current_hub)
         if leave_event is not None:
+            # Leaves go level-wide: the socket may already carry the next level's instance, and a stray leave is a no-op.
             await self.broadcast_zone(
                 zone_level_id=leave_event[1],
                 include_adjacent_preview=False,
@@ -174,9 +742,111 @@ class RealtimeHub:
                 zone_level_id=join_event[1],
                 include_adjacent_preview=False,
                 exclude_user_id=join_event[0],
+                instance_id=meta.instance_id,
                 payload={"type": "hub_presence_join", "user_id": join_event[0], "level_id": join_event[1]},
             )
-        return updated
+        return meta
+
+    async def update_instance_scope(
+        self,
+        websocket: WebSocket,
+        *,
+        instance_id: str | None,
+        party_id: str | None,
+    ) -> ConnectionMeta | None:
+        conn = self._connection(websocket)
+        if conn is None:
+            return None
+        self._set_instance_scope(conn, instance_id, party_id)
+        return conn.meta
+
+    def assign_user_scope(self, user_id: int, *, instance_id: str | None, party_id: str | None) -> None:
+        # Entry point for the HTTP world-entry route, which runs in the threadpool: indexes are only ever mutated on
+        # the loop, and other processes apply the same change from the bus.
+        self._publish({"k": "scope", "user_id": user_id, "instance_id": instance_id, "party_id": party_id})
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._apply_user_scope(user_id, instance_id, party_id)
+        else:
+            loop.call_soon_threadsafe(self._apply_user_scope, user_id, instance_id, party_id)
+
+    def _apply_user_scope(self, user_id: int, instance_id: str | None, party_id: str | None) -> None:
+        connections = self._connections
+        for conn_id in self._users.get(user_id, _EMPTY):
+            conn = connections.get(conn_id)
+            if conn is not None:
+                self._set_instance_scope(conn, instance_id, party_id)
+
+    def _set_instance_scope(self, conn: _Connection, instance_id: str | None, party_id: str | None) -> None:
+        meta = conn.meta
+        instance_id = _intern(instance_id)
+        party_id = _intern(party_id)
+        if meta.instance_id != instance_id:
+            if meta.instance_id:
+                _cow_discard(self._instances, meta.instance_id, conn.conn_id)
+            if instance_id:
+                _cow_add(self._instances, instance_id, conn.conn_id)
+            meta.instance_id = instance_id
+        if meta.party_id != party_id:
+            if meta.party_id:
+                _cow_discard(self._parties, meta.party_id, conn.conn_id)
+            if party_id:
+                _cow_add(self._parties, party_id, conn.conn_id)
+            meta.party_id = party_id
+
+    async def broadcast_instance(self, instance_id: str, payload: dict, *, exclude_user_id: int | None = None) -> int:
+        encoded = json.dumps(payload)
+        self._publish({"k": "instance", "instance_id": instance_id, "exclude_user_id": exclude_user_id, "frame": encoded})
+        return await self._deliver_scoped(self._instances, instance_id, encoded, exclude_user_id)
+
+    async def broadcast_party(self, party_id: str, payload: dict, *, exclude_user_id: int | None = None) -> int:
+        encoded = json.dumps(payload)
+        self._publish({"k": "party", "party_id": party_id, "exclude_user_id": exclude_user_id, "frame": encoded})
+        return await self._deliver_scoped(self._parties, party_id, encoded, exclude_user_id)
+
+    async def _deliver_scoped(
+        self,
+        index: dict[str, frozenset[int]],
+        key: str,
+        frame: str,
+        exclude_user_id: int | None,
+    ) -> int:
+        recipients = index.get(key, _EMPTY)
+        if exclude_user_id is not None:
+            excluded = self._users.get(exclude_user_id)
+            if excluded:
+                recipients = recipients - excluded
+        return await self._fan_out(recipients, frame)
+
+    def _zone_recipient_ids(
+        self,
+        zone_level_id: int,
+        *,
+        include_adjacent_preview: bool,
+        exclude_user_id: int | None,
+        instance_id: str | None = None,
+    ) -> frozenset[int]:
+        if zone_level_id <= 0:
+            return _EMPTY
+        recipients = self._zones.get(zone_level_id, _EMPTY)
+        if include_adjacent_preview:
+            adjacent = self._adjacent.get(zone_level_id)
+            if adjacent:
+                recipients = recipients | adjacent
+        if instance_id:
+            # Instanced traffic stays inside its instance, adjacent previewers included.
+            recipients = recipients & self._instances.get(instance_id, _EMPTY)
+        if exclude_user_id is not None:
+            excluded = self._users.get(exclude_user_id)
+            if excluded:
+                recipients = recipients - excluded
+        return recipients
 
     async def sockets_for_zone(
         self,
@@ -184,33 +854,21 @@ class RealtimeHub:
         *,
         include_adjacent_preview: bool,
         exclude_user_id: int | None = None,
+        instance_id: str | None = None,
     ) -> list[WebSocket]:
-        if zone_level_id <= 0:
-            return []
-        async with self._lock:
-            if include_adjacent_preview:
-                sockets = []
-                for socket, meta in self._meta.items():
-                    if exclude_user_id is not None and meta.user_id == exclude_user_id:
-                        continue
-                    if meta.zone_level_id == zone_level_id:
-                        sockets.append(socket)
-                        continue
-                    if not meta.allow_adjacent_preview:
-                        continue
-                    if zone_level_id in meta.adjacent_level_ids:
-                        sockets.append(socket)
-                return sockets
-            direct = list(self._zones.get(zone_level_id, set()))
-            if exclude_user_id is None:
-                return direct
-            filtered: list[WebSocket] = []
-            for socket in direct:
-                meta = self._meta.get(socket)
-                if meta is None or meta.user_id == exclude_user_id:
-                    continue
-                filtered.append(socket)
-            return filtered
+        connections = self._connections
+        recipients = self._zone_recipient_ids(
+            zone_level_id,
+            include_adjacent_preview=include_adjacent_preview,
+            exclude_user_id=exclude_user_id,
+            instance_id=instance_id,
+        )
+        sockets: list[WebSocket] = []
+        for conn_id in recipients:
+            conn = connections.get(conn_id)
+            if conn is not None and conn.websocket is not None:
+                sockets.append(conn.websocket)
+        return sockets
 
     async def broadcast_zone(
         self,
@@ -219,20 +877,47 @@ class RealtimeHub:
         payload: dict,
         include_adjacent_preview: bool = False,
         exclude_user_id: int | None = None,
+        conflate_key: str | None = None,
+        instance_id: str | None = None,
     ) -> int:
-        recipients = await self.sockets_for_zone(
+        encoded = json.dumps(payload)
+        self._publish(
+            {
+                "k": "zone",
+                "zone_level_id": zone_level_id,
+                "adjacent": include_adjacent_preview,
+                "exclude_user_id": exclude_user_id,
+                "conflate_key": conflate_key,
+                "instance_id": instance_id,
+                "frame": encoded,
+            }
+        )
+        return await self._deliver_zone(
+            zone_level_id=zone_level_id,
+            frame=encoded,
+            include_adjacent_preview=include_adjacent_preview,
+            exclude_user_id=exclude_user_id,
+            conflate_key=conflate_key,
+            instance_id=instance_id,
+        )
+
+    async def _deliver_zone(
+        self,
+        *,
+        zone_level_id: int,
+        frame: str,
+        include_adjacent_preview: bool,
+        exclude_user_id: int | None,
+        conflate_key: str | None,
+        instance_id: str | None = None,
+    ) -> int:
+        recipients = self._zone_recipient_ids(
             zone_level_id,
             include_adjacent_preview=include_adjacent_preview,
             exclude_user_id=exclude_user_id,
+            instance_id=instance_id,
         )
-        encoded = json.dumps(payload)
-        delivered = 0
-        for socket in recipients:
-            try:
-                await socket.send_text(encoded)
-                delivered += 1
-            except Exception:
-                await self.disconnect(socket)
+        delivered = await self._fan_out(recipients, frame, conflate_key)
         from app.services.observability import record_zone_broadcast
 
         record_zone_broadcast(delivered)
@@ -253,23 +938,39 @@ class RealtimeHub:
             "update_feed_url": update_feed_url,
             "timestamp": datetime.now(UTC).isoformat(),
         }
-        async with self._lock:
-            sockets = list(self._meta.keys())
-        for socket in sockets:
-            try:
-                await socket.send_text(json.dumps(payload))
-            except Exception:
-                await self.disconnect(socket)
+        await self._broadcast_all(payload, reconnect_hint=True)
 
-    async def _broadcast_all(self, payload: dict) -> None:
+    async def _broadcast_all(self, payload: dict, *, reconnect_hint: bool = False) -> None:
         encoded = json.dumps(payload)
-        async with self._lock:
-            sockets = list(self._meta.keys())
-        for socket in sockets:
-            try:
-                await socket.send_text(encoded)
-            except Exception:
-                await self.disconnect(socket)
+        self._publish({"k": "all", "frame": encoded, "reconnect_hint": reconnect_hint})
+        await self._deliver_all(encoded, reconnect_hint=reconnect_hint)
+
+    async def _deliver_all(self, frame: str, *, reconnect_hint: bool = False) -> None:
+        conn_ids = tuple(self._connections)
+        jitter_ms = self._reconnect_jitter_ms if reconnect_hint else 0
+        if self._global_wave_size <= 0 or len(conn_ids) <= self._global_wave_size:
+            await self._fan_out(conn_ids, frame, reconnect_jitter_ms=jitter_ms)
+            return
+        wave = self._global_wave_size
+        await self._fan_out(conn_ids[:wave], frame, reconnect_jitter_ms=jitter_ms)
+        self._paced_waves_total += 1
+        # Remaining waves go out in the background so ops/drain callers do not wait out the whole send window.
+        task = asyncio.get_running_loop().create_task(self._paced_fan_out(conn_ids[wave:], frame, jitter_ms))
+        self._paced_tasks.add(task)
+        task.add_done_callback(self._paced_tasks.discard)
+
+    async def _paced_fan_out(self, conn_ids: tuple[int, ...], frame: str, jitter_ms: int) -> None:
+        wave = self._global_wave_size
+        for start in range(0, len(conn_ids), wave):
+            await asyncio.sleep(self._global_wave_interval_seconds)
+            await self._fan_out(conn_ids[start : start + wave], frame, reconnect_jitter_ms=jitter_ms)
+            self._paced_waves_total += 1
+
+    async def stop_paced_notifications(self) -> None:
+        tasks = list(self._paced_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
     async def notify_content_publish_started(
         self,
@@ -329,7 +1030,8 @@ class RealtimeHub:
                 "reason_code": reason_code,
                 "cutoff_at": cutoff_iso,
                 "timestamp": datetime.now(UTC).isoformat(),
-            }
+            },
+            reconnect_hint=True,
         )
 
 
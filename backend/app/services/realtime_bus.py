@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+import json
+import logging
+from threading import Condition, Event, Thread
+import time
+from typing import TYPE_CHECKING, Any, Protocol
+from uuid import uuid4
+
+from app.core.config import settings
+from app.services.outbox_notify_worker import NotifyConnection, OutboxNotifyWorker, OutboxWakeSignal
+
+if TYPE_CHECKING:
+    from app.services.realtime import RealtimeHub
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+class PublishConnection(NotifyConnection, Protocol):
+    def notify_many(self, channel: str, payloads: list[str]) -> None: ...
+
+
+class PublishConnector(Protocol):
+    def open(self) -> PublishConnection: ...
+
+
+@dataclass
+class RealtimeBusStats:
+    published_total: int = 0
+    publish_batches_total: int = 0
+    publish_failures_total: int = 0
+    dropped_overflow_total: int = 0
+    oversize_local_only_total: int = 0
+    received_total: int = 0
+    loopback_skipped_total: int = 0
+    delivered_remote_total: int = 0
+    malformed_total: int = 0
+    max_queue_depth: int = 0
+
+
+class RealtimeBus:
+    def __init__(self, *, channel: str, max_queue_size: int, batch_size: int) -> None:
+        self.channel = (channel or "").strip() or "realtime_fanout"
+        self.origin = uuid4().hex
+        self._max_queue_size = max(1, int(max_queue_size))
+        self._batch_size = max(1, int(batch_size))
+        self._queue: deque[str] = deque()
+        self._cond = Condition()
+        self._accepting = False
+        self._sequence = 0
+        self._hub: RealtimeHub | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.stats = RealtimeBusStats()
+
+    @property
+    def accepting(self) -> bool:
+        return self._accepting
+
+    def attach(self, hub: RealtimeHub | None, loop: asyncio.AbstractEventLoop | None) -> None:
+        with self._cond:
+            self._hub = hub
+            self._loop = loop
+            self._accepting = hub is not None
+            self._cond.notify_all()
+
+    def publish(self, envelope: dict[str, Any]) -> bool:
+        # Called from the event loop; local sockets were already served, this only queues the cross-process copy.
+        with self._cond:
+            if not self._accepting:
+                return False
+            self._sequence += 1
+            encoded = json.dumps({**envelope, "o": self.origin, "s": self._sequence}, separators=(",", ":"))
+            if len(encoded.encode("utf-8")) > MAX_NOTIFY_PAYLOAD_BYTES:
+                self.stats.oversize_local_only_total += 1
+                return False
+            if len(self._queue) >= self._max_queue_size:
+                self.stats.dropped_overflow_total += 1
+                return False
+            self._queue.append(encoded)
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def wait_for_work(self, timeout_seconds: float) -> None:
+        with self._cond:
+            if not self._queue:
+                self._cond.wait(timeout_seconds)
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def take_batch(self) -> list[str]:
+        with self._cond:
+            return [self._queue.popleft() for _ in range(min(self._batch_size, len(self._queue)))]
+
+    def record_published(self, count: int) -> None:
+        with self._cond:
+            self.stats.published_total += count
+            self.stats.publish_batches_total += 1
+
+    def record_publish_failure(self, dropped: int) -> None:
+        with self._cond:
+            self.stats.publish_failures_total += 1
+            self.stats.dropped_overflow_total += dropped
+
+    def handle_signal(self, signal: OutboxWakeSignal) -> None:
+        if signal.reason != "notify" or not signal.payload:
+            return
+        try:
+            envelope = json.loads(signal.payload)
+        except json.JSONDecodeError:
+            envelope = None
+        with self._cond:
+            self.stats.received_total += 1
+            if not isinstance(envelope, dict):
+                self.stats.malformed_total += 1
+                return
+            if envelope.get("o") == self.origin:
+                self.stats.loopback_skipped_total += 1
+                return
+            hub = self._hub
+            loop = self._loop
+        if hub is None or loop is None or loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(hub.deliver_remote(envelope), loop)
+        with self._cond:
+            self.stats.delivered_remote_total += 1
+
+    def snapshot_stats(self) -> dict[str, int | str]:
+        with self._cond:
+            return {
+                "accepting": int(self._accepting),
+                "channel": self.channel,
+                "origin": self.origin,
+                "queue_depth": len(self._queue),
+                "queue_limit": self._max_queue_size,
+                "published_total": self.stats.published_total,
+                "publish_batches_total": self.stats.publish_batches_total,
+                "publish_failures_total": self.stats.publish_failures_total,
+                "dropped_overflow_total": self.stats.dropped_overflow_total,
+                "oversize_local_only_total": self.stats.oversize_local_only_total,
+                "received_total": self.stats.received_total,
+                "loopback_skipped_total": self.stats.loopback_skipped_total,
+                "delivered_remote_total": self.stats.delivered_remote_total,
+                "malformed_total": self.stats.malformed_total,
+                "max_queue_depth": self.stats.max_queue_depth,
+            }
+
+
+realtime_bus = RealtimeBus(
+    channel=settings.realtime_bus_channel,
+    max_queue_size=settings.realtime_bus_max_queue_size,
+    batch_size=settings.realtime_bus_batch_size,
+)
+
+
+@dataclass
+class RealtimeBusWorkerHandle:
+    bus: RealtimeBus
+    hub: RealtimeHub
+    listener: OutboxNotifyWorker
+    listener_thread: Thread
+    publisher_thread: Thread
+    stop_event: Event
+
+
+def _run_publisher(
+    bus: RealtimeBus,
+    connector: PublishConnector,
+    stop_event: Event,
+    reconnect_delay_seconds: float,
+    logger: logging.Logger,
+    sleep_fn: Callable[[float], None],
+) -> None:
+    connection: PublishConnection | None = None
+    while not stop_event.is_set():
+        bus.wait_for_work(0.5)
+        batch = bus.take_batch()
+        if not batch:
+            continue
+        try:
+            if connection is None:
+                connection = connector.open()
+            connection.notify_many(bus.channel, batch)
+            bus.record_published(len(batch))
+        except Exception:
+            # Fan-out is ephemeral: replaying stale frames after a reconnect is worse than dropping them.
+            bus.record_publish_failure(len(batch))
+            logger.warning("Realtime bus NOTIFY failed; reconnecting in %.2fs", reconnect_delay_seconds, exc_info=True)
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    logger.debug("Failed closing realtime bus publish connection", exc_info=True)
+                connection = None
+            if reconnect_delay_seconds > 0:
+                sleep_fn(reconnect_delay_seconds)
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Failed closing realtime bus publish connection", exc_info=True)
+
+
+def start_realtime_bus_worker(
+    *,
+    connector: PublishConnector,
+    hub: RealtimeHub,
+    bus: RealtimeBus = realtime_bus,
+    loop: asyncio.AbstractEventLoop | None = None,
+    listen_timeout_seconds: float = 5.0,
+    reconnect_delay_seconds: float = 2.0,
+    logger: logging.Logger | None = None,
+) -> RealtimeBusWorkerHandle:
+    log = logger or logging.getLogger("children-of-ikphelion.realtime_bus")
+    if loop is None:
+        loop = asyncio.get_running_loop()
+    stop_event = Event()
+    bus.attach(hub, loop)
+    hub.attach_bus(bus)
+    listener = OutboxNotifyWorker(
+        connector=connector,
+        wake_handler=bus.handle_signal,
+        channel=bus.channel,
+        listen_timeout_seconds=listen_timeout_seconds,
+        reconnect_delay_seconds=reconnect_delay_seconds,
+        logger=log,
+    )
+    listener_thread = Thread(target=listener.run, args=(stop_event,), name="aop-realtime-bus-listen", daemon=True)
+    publisher_thread = Thread(
+        target=_run_publisher,
+        args=(bus, connector, stop_event, max(0.0, float(reconnect_delay_seconds)), log, time.sleep),
+        name="aop-realtime-bus-publish",
+        daemon=True,
+    )
+    listener_thread.start()
+    publisher_thread.start()
+    return RealtimeBusWorkerHandle(
+        bus=bus,
+        hub=hub,
+        listener=listener,
+        listener_thread=listener_thread,
+        publisher_thread=publisher_thread,
+        stop_event=stop_event,
+    )
+
+
+def stop_realtime_bus_worker(handle: RealtimeBusWorkerHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    handle.hub.attach_bus(None)
+    handle.bus.attach(None, None)
+    handle.stop_event.set()
+    handle.bus.wake()
+    timeout = max(0.0, float(join_timeout_seconds))
+    handle.publisher_thread.join(timeout=timeout)
+    handle.listener_thread.join(timeout=timeout)
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from threading import RLock
+import time
 
 from packaging.version import InvalidVersion, Version
 from sqlalchemy import select
@@ -28,18 +31,118 @@ class VersionDecision:
     force_update: bool
 
 
-def _safe_version(raw: str | None) -> Version:
-    value = raw or "0.0.0"
+@dataclass(frozen=True)
+class ReleasePolicySnapshot:
+    revision: int
+    latest_version: str
+    min_supported_version: str
+    latest_content_version_key: str
+    min_supported_content_version_key: str
+    update_feed_url: str | None
+    enforce_after: datetime | None
+    latest: Version
+    minimum: Version
+    loaded_at: float
+
+
+_ZERO_VERSION = Version("0.0.0")
+_policy_lock = RLock()
+_cached_policy: ReleasePolicySnapshot | None = None
+
+
+@lru_cache(maxsize=2048)
+def _parse_version(value: str) -> Version:
     try:
         return Version(value)
     except InvalidVersion:
-        return Version("0.0.0")
+        return _ZERO_VERSION
+
+
+def _safe_version(raw: str | None) -> Version:
+    return _parse_version(raw or "0.0.0")
+
+
+def safe_version(raw: str | None) -> Version:
+    return _safe_version((raw or "0.0.0").strip() or "0.0.0")
 
 
 def _normalize_content_key(raw: str | None) -> str:
     return (raw or "").strip() or "unknown"
 
 
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def snapshot_release_policy(policy: ReleasePolicy, *, revision: int = 0) -> ReleasePolicySnapshot:
+    return ReleasePolicySnapshot(
+        revision=revision,
+        latest_version=policy.latest_version,
+        min_supported_version=policy.min_supported_version,
+        latest_content_version_key=_normalize_content_key(policy.latest_content_version_key),
+        min_supported_content_version_key=_normalize_content_key(policy.min_supported_content_version_key),
+        update_feed_url=(policy.update_feed_url or "").strip() or None,
+        enforce_after=_as_utc(policy.enforce_after),
+        latest=_safe_version(policy.latest_version),
+        minimum=_safe_version(policy.min_supported_version),
+        loaded_at=time.monotonic(),
+    )
+
+
+def _policy_fields(snapshot: ReleasePolicySnapshot) -> tuple:
+    return (
+        snapshot.latest_version,
+        snapshot.min_supported_version,
+        snapshot.latest_content_version_key,
+        snapshot.min_supported_content_version_key,
+        snapshot.update_feed_url,
+        snapshot.enforce_after,
+    )
+
+
+def _set_cached_policy(policy: ReleasePolicy) -> ReleasePolicySnapshot:
+    global _cached_policy
+    with _policy_lock:
+        current = _cached_policy
+        candidate = snapshot_release_policy(policy, revision=current.revision if current is not None else 0)
+        if current is None or _policy_fields(current) != _policy_fields(candidate):
+            # Revision only moves when the policy content changes so periodic reloads keep dependents warm.
+            candidate = snapshot_release_policy(policy, revision=candidate.revision + 1)
+        _cached_policy = candidate
+        return candidate
+
+
+def get_release_policy_snapshot(db: Session, *, force_refresh: bool = False) -> ReleasePolicySnapshot:
+    if not force_refresh:
+        with _policy_lock:
+            cached = _cached_policy
+        ttl = max(0.0, float(settings.release_policy_cache_ttl_seconds))
+        if cached is not None and time.monotonic() - cached.loaded_at < ttl:
+            return cached
+    policy = ensure_release_policy(db)
+    with _policy_lock:
+        cached = _cached_policy
+    if cached is None:
+        # A concurrent reset can clear the cache between the load and this read.
+        cached = _set_cached_policy(policy)
+    return cached
+
+
+def current_release_policy_revision() -> int:
+    with _policy_lock:
+        return _cached_policy.revision if _cached_policy is not None else 0
+
+
+def reset_release_policy_cache_for_tests() -> None:
+    global _cached_policy
+    with _policy_lock:
+        _cached_policy = None
+
+
 def next_logical_build_version(raw: str | None) -> str:
     version = _safe_version(raw)
     components = list(version.release)
@@ -60,8 +163,8 @@ def resolve_active_content_version_key(db: Session) -> str:
 
 def ensure_release_policy(db: Session) -> ReleasePolicy:
     policy = db.get(ReleasePolicy, 1)
-    active_content_key = resolve_active_content_version_key(db)
     if policy is None:
+        active_content_key = resolve_active_content_version_key(db)
         policy = ReleasePolicy(
             id=1,
             latest_version="0.0.0",
@@ -73,35 +176,38 @@ def ensure_release_policy(db: Session) -> ReleasePolicy:
         db.add(policy)
         db.commit()
         db.refresh(policy)
+        _set_cached_policy(policy)
         return policy
 
-    changed = False
-    if _normalize_content_key(policy.latest_content_version_key) == "unknown":
-        policy.latest_content_version_key = active_content_key
-        changed = True
-    if _normalize_content_key(policy.min_supported_content_version_key) == "unknown":
-        policy.min_supported_content_version_key = active_content_key
-        changed = True
-    if changed:
+    latest_unknown = _normalize_content_key(policy.latest_content_version_key) == "unknown"
+    min_unknown = _normalize_content_key(policy.min_supported_content_version_key) == "unknown"
+    if latest_unknown or min_unknown:
+        active_content_key = resolve_active_content_version_key(db)
+        if latest_unknown:
+            policy.latest_content_version_key = active_content_key
+        if min_unknown:
+            policy.min_supported_content_version_key = active_content_key
         db.add(policy)
         db.commit()
         db.refresh(policy)
+    _set_cached_policy(policy)
     return policy
 
 
 def evaluate_version(
-    policy: ReleasePolicy,
+    policy: ReleasePolicy | ReleasePolicySnapshot,
     client_version: str | None,
     client_content_version_key: str | None,
 ) -> VersionDecision:
+    snapshot = policy if isinstance(policy, ReleasePolicySnapshot) else snapshot_release_policy(policy)
     now = datetime.now(UTC)
     normalized_client_version = client_version or "0.0.0"
     normalized_client_content_key = _normalize_content_key(client_content_version_key)
-    latest = _safe_version(policy.latest_version)
-    minimum = _safe_version(policy.min_supported_version)
+    latest = snapshot.latest
+    minimum = snapshot.minimum
     client = _safe_version(normalized_client_version)
-    latest_content_key = _normalize_content_key(policy.latest_content_version_key)
-    min_content_key = _normalize_content_key(policy.min_supported_content_version_key)
+    latest_content_key = snapshot.latest_content_version_key
+    min_content_key = snapshot.min_supported_content_version_key
 
     # Content-only publishes may bump latest build marker without a binary package.
     # In that mode `min_supported_version` remains below `latest_version`, so binary update is not advertised.
@@ -113,19 +219,19 @@ def evaluate_version(
     content_force_candidate = normalized_client_content_key != min_content_key
     force_update = (
         (build_force_candidate or content_force_candidate)
-        and policy.enforce_after is not None
-        and now >= policy.enforce_after
+        and snapshot.enforce_after is not None
+        and now >= snapshot.enforce_after
     )
 
     return VersionDecision(
         client_version=normalized_client_version,
-        latest_version=policy.latest_version,
-        min_supported_version=policy.min_supported_version,
+        latest_version=snapshot.latest_version,
+        min_supported_version=snapshot.min_supported_version,
         client_content_version_key=normalized_client_content_key,
         latest_content_version_key=latest_content_key,
         min_supported_content_version_key=min_content_key,
-        update_feed_url=(policy.update_feed_url or "").strip() or None,
-        enforce_after=policy.enforce_after,
+        update_feed_url=snapshot.update_feed_url,
+        enforce_after=snapshot.enforce_after,
         update_available=update_available,
         content_update_available=content_update_available,
         force_update=force_update,
@@ -184,6 +290,7 @@ def activate_release(
 
     db.commit()
     db.refresh(policy)
+    _set_cached_policy(policy)
     return policy
 
 
@@ -241,6 +348,7 @@ def activate_content_release(
     )
     db.commit()
     db.refresh(policy)
+    _set_cached_policy(policy)
     return policy
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 import json
 from typing import Any
 
@@ -8,6 +9,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.security_event import SecurityEventAudit
+from app.services.audit_sink import audit_sink
 
 
 def write_security_event(
@@ -25,16 +27,19 @@ def write_security_event(
         detail_text = json.dumps(detail, sort_keys=True, separators=(",", ":"))
     else:
         detail_text = (detail or "").strip()
-    db.add(
-        SecurityEventAudit(
-            actor_user_id=actor_user_id,
-            session_id=(session_id or "").strip() or None,
-            event_type=(event_type or "unknown").strip() or "unknown",
-            severity=(severity or "info").strip().lower() or "info",
-            ip_address=(ip_address or "").strip() or None,
-            detail=detail_text,
-        )
-    )
+    values = {
+        "actor_user_id": actor_user_id,
+        "session_id": (session_id or "").strip() or None,
+        "event_type": (event_type or "unknown").strip() or "unknown",
+        "severity": (severity or "info").strip().lower() or "info",
+        "ip_address": (ip_address or "").strip() or None,
+        "detail": detail_text,
+        "created_at": datetime.now(UTC),
+    }
+    # commit=True always commits the caller's transaction, even when the row itself went to the sink: work the
+    # caller already flushed is invisible to db.new/db.dirty, so the session state cannot tell whether it is needed.
+    if not audit_sink.enqueue(SecurityEventAudit, values):
+        db.add(SecurityEventAudit(**values))
     if commit:
         db.commit()
 
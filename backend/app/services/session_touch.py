@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from threading import Event, RLock, Thread
+import time
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.models.session import UserSession
+
+SessionFactory = Callable[[], Session]
+
+_sessions = UserSession.__table__
+# Core executemany rather than an ORM bulk UPDATE: rows for sessions deleted since the touch are skipped
+# instead of raising StaleDataError and wedging the whole batch in the requeue loop.
+_touch_statement = update(_sessions).where(_sessions.c.id == bindparam("b_id"))
+
+
+@dataclass
+class _PendingTouch:
+    last_seen_at: datetime
+    client_version: str
+    client_content_version_key: str
+    first_recorded_at: float
+
+
+@dataclass
+class SessionTouchStats:
+    flushes_total: int = 0
+    rows_flushed_total: int = 0
+    touches_recorded_total: int = 0
+    touches_coalesced_total: int = 0
+    flush_failures_total: int = 0
+    last_flush_size: int = 0
+    last_flush_lag_ms: float = 0.0
+    max_flush_lag_ms: float = 0.0
+
+
+class SessionTouchBuffer:
+    def __init__(self, *, max_batch_size: int = 500) -> None:
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._pending: dict[str, _PendingTouch] = {}
+        self._lock = RLock()
+        self.stats = SessionTouchStats()
+
+    def record(
+        self,
+        session_id: str,
+        *,
+        last_seen_at: datetime,
+        client_version: str,
+        client_content_version_key: str,
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.stats.touches_recorded_total += 1
+            existing = self._pending.get(session_id)
+            if existing is not None:
+                self.stats.touches_coalesced_total += 1
+                existing.last_seen_at = max(existing.last_seen_at, last_seen_at)
+                existing.client_version = client_version
+                existing.client_content_version_key = client_content_version_key
+                return
+            self._pending[session_id] = _PendingTouch(
+                last_seen_at=last_seen_at,
+                client_version=client_version,
+                client_content_version_key=client_content_version_key,
+                first_recorded_at=now,
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, session_factory: SessionFactory) -> int:
+        with self._lock:
+            if not self._pending:
+                return 0
+            drained = self._pending
+            self._pending = {}
+        oldest = min(row.first_recorded_at for row in drained.values())
+        lag_ms = max(0.0, (time.monotonic() - oldest) * 1000.0)
+        rows = [
+            {
+                "b_id": session_id,
+                "last_seen_at": row.last_seen_at,
+                "client_version": row.client_version,
+                "client_content_version_key": row.client_content_version_key,
+            }
+            for session_id, row in drained.items()
+        ]
+
+        db = session_factory()
+        try:
+            for start in range(0, len(rows), self._max_batch_size):
+                db.execute(_touch_statement, rows[start : start + self._max_batch_size])
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._requeue(drained)
+            with self._lock:
+                self.stats.flush_failures_total += 1
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self.stats.flushes_total += 1
+            self.stats.rows_flushed_total += len(rows)
+            self.stats.last_flush_size = len(rows)
+            self.stats.last_flush_lag_ms = round(lag_ms, 3)
+            self.stats.max_flush_lag_ms = round(max(self.stats.max_flush_lag_ms, lag_ms), 3)
+        return len(rows)
+
+    def _requeue(self, drained: dict[str, _PendingTouch]) -> None:
+        with self._lock:
+            for session_id, row in drained.items():
+                newer = self._pending.get(session_id)
+                if newer is None:
+                    self._pending[session_id] = row
+                else:
+                    # Keep the newer values but preserve the original lag origin.
+                    newer.first_recorded_at = min(newer.first_recorded_at, row.first_recorded_at)
+
+    def snapshot_stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flushes_total": self.stats.flushes_total,
+                "rows_flushed_total": self.stats.rows_flushed_total,
+                "touches_recorded_total": self.stats.touches_recorded_total,
+                "touches_coalesced_total": self.stats.touches_coalesced_total,
+                "flush_failures_total": self.stats.flush_failures_total,
+                "last_flush_size": self.stats.last_flush_size,
+                "last_flush_lag_ms": self.stats.last_flush_lag_ms,
+                "max_flush_lag_ms": self.stats.max_flush_lag_ms,
+            }
+
+    def reset_for_tests(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self.stats = SessionTouchStats()
+
+
+session_touch_buffer = SessionTouchBuffer()
+
+
+@dataclass
+class SessionTouchFlusherHandle:
+    buffer: SessionTouchBuffer
+    thread: Thread
+    stop_event: Event
+    session_factory: SessionFactory
+
+
+def _run_flusher(
+    buffer: SessionTouchBuffer,
+    session_factory: SessionFactory,
+    stop_event: Event,
+    interval_seconds: float,
+    logger: logging.Logger,
+) -> None:
+    while not stop_event.wait(interval_seconds):
+        try:
+            buffer.flush(session_factory)
+        except Exception:
+            logger.warning("Session touch flush failed; rows re-queued for next interval", exc_info=True)
+
+
+def start_session_touch_flusher(
+    *,
+    session_factory: SessionFactory,
+    buffer: SessionTouchBuffer = session_touch_buffer,
+    interval_seconds: float = 5.0,
+    logger: logging.Logger | None = None,
+) -> SessionTouchFlusherHandle:
+    stop_event = Event()
+    log = logger or logging.getLogger("children-of-ikphelion.session_touch")
+    thread = Thread(
+        target=_run_flusher,
+        args=(buffer, session_factory, stop_event, max(0.05, float(interval_seconds)), log),
+        name="aop-session-touch-flusher",
+        daemon=True,
+    )
+    thread.start()
+    return SessionTouchFlusherHandle(buffer=buffer, thread=thread, stop_event=stop_event, session_factory=session_factory)
+
+
+def stop_session_touch_flusher(handle: SessionTouchFlusherHandle | None, *, join_timeout_seconds: float = 3.0) -> None:
+    if handle is None:
+        return
+    handle.stop_event.set()
+    handle.thread.join(timeout=max(0.0, float(join_timeout_seconds)))
+    # Final drain so touches recorded after the last interval are not lost on shutdown.
+    try:
+        handle.buffer.flush(handle.session_factory)
+    except Exception:
+        logging.getLogger("children-of-ikphelion.session_touch").warning("Final session touch flush failed", exc_info=True)
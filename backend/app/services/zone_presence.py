@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.services.realtime import RealtimeHub, realtime_hub
+
+logger = logging.getLogger("children-of-ikphelion.zone_presence")
+
+
+class ZonePresenceAggregator:
+    def __init__(self, *, hub: RealtimeHub, tick_seconds: float) -> None:
+        self._hub = hub
+        self._tick_seconds = max(0.01, float(tick_seconds))
+        # (level id, instance id) -> user id -> latest update; everything lives on the event loop, so no lock is needed.
+        self._pending: dict[tuple[int, str | None], dict[int, dict]] = {}
+        self._task: asyncio.Task | None = None
+        self._updates_received_total = 0
+        self._updates_conflated_total = 0
+        self._updates_flushed_total = 0
+        self._batches_flushed_total = 0
+        self._recipient_frames_total = 0
+        self._flush_failures_total = 0
+
+    def submit(self, *, zone_level_id: int, user_id: int, update: dict, instance_id: str | None = None) -> None:
+        key = (zone_level_id, instance_id)
+        zone = self._pending.get(key)
+        if zone is None:
+            zone = self._pending[key] = {}
+        if user_id in zone:
+            self._updates_conflated_total += 1
+        zone[user_id] = update
+        self._updates_received_total += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> int:
+        pending, self._pending = self._pending, {}
+        batches = 0
+        for (level_id, instance_id), updates in pending.items():
+            delivered = await self._hub.broadcast_zone(
+                zone_level_id=level_id,
+                include_adjacent_preview=True,
+                instance_id=instance_id,
+                payload={
+                    "type": "zone_presence_batch",
+                    "level_id": level_id,
+                    "instance_id": instance_id,
+                    "updates": list(updates.values()),
+                },
+            )
+            batches += 1
+            self._updates_flushed_total += len(updates)
+            self._recipient_frames_total += delivered
+        self._batches_flushed_total += batches
+        return batches
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._tick_seconds)
+            if not self._pending:
+                continue
+            try:
+                await self.flush()
+            except Exception:
+                self._flush_failures_total += 1
+                logger.warning("Zone presence flush failed", exc_info=True)
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._pending.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        received = self._updates_received_total
+        batches = self._batches_flushed_total
+        return {
+            "tick_ms": int(round(self._tick_seconds * 1000)),
+            "pending_zones": len(self._pending),
+            "pending_updates": sum(len(zone) for zone in self._pending.values()),
+            "updates_received_total": received,
+            "updates_conflated_total": self._updates_conflated_total,
+            "updates_flushed_total": self._updates_flushed_total,
+            "batches_flushed_total": batches,
+            "recipient_frames_total": self._recipient_frames_total,
+            "flush_failures_total": self._flush_failures_total,
+            "conflation_ratio": round(received / batches, 3) if batches else 0.0,
+        }
+
+
+zone_presence_aggregator = ZonePresenceAggregator(
+    hub=realtime_hub,
+    tick_seconds=settings.zone_presence_tick_ms / 1000.0,
+)
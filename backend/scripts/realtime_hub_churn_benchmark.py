@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""In-process stress benchmark for RealtimeHub recipient lookups under connect churn.
+
+Usage:
+  python backend/scripts/realtime_hub_churn_benchmark.py \
+    --clients 2000 \
+    --zones 8 \
+    --churn-rounds 5 \
+    --lookups 5000
+
+Simulates a hub reload: every churn round disconnects and reconnects all clients in one burst while a
+concurrent task keeps resolving zone recipients and broadcasting. Prints lookup/broadcast latency percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for _name, _value in (
+    ("JWT_SECRET", "benchmark-secret"),
+    ("OPS_API_TOKEN", "benchmark-ops"),
+    ("DB_HOST", "localhost"),
+    ("DB_USER", "benchmark"),
+    ("DB_PASSWORD", "benchmark"),
+):
+    os.environ.setdefault(_name, _value)
+
+from app.services.realtime import ConnectionMeta, RealtimeHub  # noqa: E402
+
+
+class _NullSocket:
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, payload: str) -> None:
+        return None
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int((len(ordered) - 1) * fraction))]
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "count": len(samples),
+        "avg_us": round(statistics.mean(samples), 3) if samples else 0.0,
+        "p50_us": round(_percentile(samples, 0.50), 3),
+        "p99_us": round(_percentile(samples, 0.99), 3),
+        "max_us": round(max(samples), 3) if samples else 0.0,
+    }
+
+
+async def run_benchmark(*, clients: int, zones: int, churn_rounds: int, lookups: int) -> dict[str, object]:
+    hub = RealtimeHub(send_queue_max_frames=64)
+    sockets = [_NullSocket() for _ in range(clients)]
+
+    def _meta(index: int) -> ConnectionMeta:
+        zone = index % zones + 1
+        return ConnectionMeta(
+            user_id=index + 1,
+            channel_id=1,
+            client_version="1.0.0",
+            zone_level_id=zone,
+            adjacent_level_ids=(zone % zones + 1,),
+        )
+
+    for index, socket in enumerate(sockets):
+        await hub.connect(socket, _meta(index))
+
+    lookup_samples: list[float] = []
+    broadcast_samples: list[float] = []
+    churn_done = asyncio.Event()
+
+    async def _churn() -> None:
+        for _ in range(churn_rounds):
+            for socket in sockets:
+                await hub.disconnect(socket)
+            for index, socket in enumerate(sockets):
+                await hub.connect(socket, _meta(index))
+                if index % 50 == 0:
+                    await asyncio.sleep(0)
+        churn_done.set()
+
+    async def _lookups() -> None:
+        count = 0
+        while count < lookups or not churn_done.is_set():
+            zone = count % zones + 1
+            started = time.perf_counter()
+            await hub.sockets_for_zone(zone, include_adjacent_preview=True, exclude_user_id=count % clients + 1)
+            lookup_samples.append((time.perf_counter() - started) * 1_000_000.0)
+            if count % 10 == 0:
+                started = time.perf_counter()
+                await hub.broadcast_zone(zone_level_id=zone, include_adjacent_preview=True, payload={"type": "bench"})
+                broadcast_samples.append((time.perf_counter() - started) * 1_000_000.0)
+            count += 1
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(_churn(), _lookups())
+    elapsed_s = time.perf_counter() - started
+    for socket in sockets:
+        await hub.disconnect(socket)
+    return {
+        "clients": clients,
+        "zones": zones,
+        "churn_rounds": churn_rounds,
+        "elapsed_s": round(elapsed_s, 3),
+        "reconnects_per_s": round(clients * churn_rounds / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+        "sockets_for_zone": _summary(lookup_samples),
+        "broadcast_zone_enqueue": _summary(broadcast_samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RealtimeHub connect-churn benchmark")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--churn-rounds", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+    result = asyncio.run(
+        run_benchmark(
+            clients=max(1, args.clients),
+            zones=max(1, args.zones),
+            churn_rounds=max(0, args.churn_rounds),
+            lookups=max(1, args.lookups),
+        )
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Offline load test for RealtimeHub with simulated WebSockets.
+
+Usage:
+  python backend/scripts/realtime_hub_load_test.py \
+    --clients 20000 \
+    --zones 50 \
+    --broadcasts 200 \
+    --slow-fraction 0.02 \
+    --slow-send-delay-ms 50 \
+    --output load-results/realtime_hub.json
+
+Drives connect, update_zone_scope, broadcast_zone and disconnect against in-memory fake sockets and reports
+throughput per phase, p50/p99 fan-out latency and traced memory per connection. Results are written as JSON so
+runs can be compared between commits. tests/test_realtime_hub_load.py runs a reduced configuration.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+import gc
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for _name, _value in (
+    ("JWT_SECRET", "load-test-secret"),
+    ("OPS_API_TOKEN", "load-test-ops"),
+    ("DB_HOST", "localhost"),
+    ("DB_USER", "load-test"),
+    ("DB_PASSWORD", "load-test"),
+):
+    os.environ.setdefault(_name, _value)
+
+from app.services.realtime import ConnectionMeta, RealtimeHub  # noqa: E402
+
+
+@dataclass(frozen=True)
+class LoadTestConfig:
+    clients: int = 10000
+    zones: int = 50
+    broadcasts: int = 100
+    scope_update_fraction: float = 0.25
+    slow_fraction: float = 0.0
+    slow_send_delay_ms: float = 0.0
+    send_queue_max_frames: int = 256
+    drain_timeout_seconds: float = 30.0
+
+
+class _DeliveryLog:
+    def __init__(self) -> None:
+        self.frame_seq: dict[str, int] = {}
+        self.last_delivery: dict[int, float] = {}
+        self.fast_last_delivery: dict[int, float] = {}
+        self.delivered_frames = 0
+
+
+class SimulatedWebSocket:
+    __slots__ = ("_log", "_delay_s")
+
+    def __init__(self, log: _DeliveryLog, delay_s: float) -> None:
+        self._log = log
+        self._delay_s = delay_s
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, payload: str) -> None:
+        if self._delay_s > 0:
+            await asyncio.sleep(self._delay_s)
+        log = self._log
+        log.delivered_frames += 1
+        seq = log.frame_seq.get(payload)
+        if seq is None:
+            return
+        now = time.perf_counter()
+        log.last_delivery[seq] = now
+        if self._delay_s <= 0:
+            log.fast_last_delivery[seq] = now
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int((len(ordered) - 1) * fraction))]
+
+
+def _latency_summary(samples_ms: list[float]) -> dict[str, float]:
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(_percentile(samples_ms, 0.50), 3),
+        "p99_ms": round(_percentile(samples_ms, 0.99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+def _rate(count: int, elapsed_s: float) -> float:
+    return round(count / elapsed_s, 1) if elapsed_s > 0 else 0.0
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=False,
+        )
+    except Exception:
+        return None
+    return completed.stdout.strip() or None
+
+
+async def run_load_test(config: LoadTestConfig) -> dict[str, object]:
+    hub = RealtimeHub(send_queue_max_frames=config.send_queue_max_frames, heartbeat_interval_seconds=0)
+    log = _DeliveryLog()
+    zones = max(1, config.zones)
+    slow_every = int(round(1 / config.slow_fraction)) if config.slow_fraction > 0 else 0
+    slow_delay_s = max(0.0, config.slow_send_delay_ms) / 1000.0
+    sockets = [
+        SimulatedWebSocket(log, slow_delay_s if slow_every and index % slow_every == 0 else 0.0)
+        for index in range(config.clients)
+    ]
+
+    def _meta(index: int) -> ConnectionMeta:
+        zone = index % zones + 1
+        return ConnectionMeta(
+            user_id=index + 1,
+            channel_id=None,
+            client_version="1.0.0",
+            zone_level_id=zone,
+            adjacent_level_ids=(zone % zones + 1,),
+        )
+
+    gc.collect()
+    tracemalloc.start()
+    baseline_bytes = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    for index, socket in enumerate(sockets):
+        await hub.connect(socket, _meta(index))
+    connect_s = time.perf_counter() - started
+    await asyncio.sleep(0)
+    connected_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    scope_updates = int(config.clients * max(0.0, min(1.0, config.scope_update_fraction)))
+    started = time.perf_counter()
+    for index in range(scope_updates):
+        zone = (index + 1) % zones + 1
+        await hub.update_zone_scope(sockets[index], zone_level_id=zone, adjacent_level_ids=[zone % zones + 1])
+    scope_s = time.perf_counter() - started
+
+    # Warm-up: first wake of every writer task and lazy imports stay out of the measured window.
+    await hub.broadcast_zone(zone_level_id=1, include_adjacent_preview=True, payload={"type": "warmup"})
+    await hub.wait_until_drained(timeout_seconds=config.drain_timeout_seconds)
+
+    enqueue_ms: list[float] = []
+    recipients_total = 0
+    broadcast_started: dict[int, float] = {}
+    started = time.perf_counter()
+    for seq in range(config.broadcasts):
+        frame = json.dumps({"type": "zone_presence_batch", "level_id": seq % zones + 1, "seq": seq})
+        log.frame_seq[frame] = seq
+        call_started = time.perf_counter()
+        broadcast_started[seq] = call_started
+        recipients_total += await hub.broadcast_zone(
+            zone_level_id=seq % zones + 1,
+            include_adjacent_preview=True,
+            payload={"type": "zone_presence_batch", "level_id": seq % zones + 1, "seq": seq},
+        )
+        enqueue_ms.append((time.perf_counter() - call_started) * 1000.0)
+        await asyncio.sleep(0)
+    drained = await hub.wait_until_drained(timeout_seconds=config.drain_timeout_seconds)
+    broadcast_s = time.perf_counter() - started
+    fan_out_ms = [(log.last_delivery[seq] - broadcast_started[seq]) * 1000.0 for seq in log.last_delivery]
+    fast_fan_out_ms = [(log.fast_last_delivery[seq] - broadcast_started[seq]) * 1000.0 for seq in log.fast_last_delivery]
+    queue_stats = hub.send_queue_stats()
+
+    started = time.perf_counter()
+    for socket in sockets:
+        await hub.disconnect(socket)
+    disconnect_s = time.perf_counter() - started
+
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "config": asdict(config),
+        "connect": {"elapsed_s": round(connect_s, 3), "per_second": _rate(config.clients, connect_s)},
+        "update_zone_scope": {"count": scope_updates, "elapsed_s": round(scope_s, 3), "per_second": _rate(scope_updates, scope_s)},
+        "broadcast_zone": {
+            "count": config.broadcasts,
+            "elapsed_s": round(broadcast_s, 3),
+            "drained": drained,
+            "recipients_total": recipients_total,
+            "frames_per_second": _rate(log.delivered_frames, broadcast_s),
+            "enqueue_latency": _latency_summary(enqueue_ms),
+            "fan_out_latency": _latency_summary(fan_out_ms),
+            "fan_out_latency_fast_sockets": _latency_summary(fast_fan_out_ms),
+            "frames_dropped_total": queue_stats["frames_dropped_total"],
+        },
+        "disconnect": {"elapsed_s": round(disconnect_s, 3), "per_second": _rate(config.clients, disconnect_s)},
+        "memory": {
+            "traced_bytes_for_connections": connected_bytes - baseline_bytes,
+            "bytes_per_connection": round((connected_bytes - baseline_bytes) / max(1, config.clients), 1),
+        },
+    }
+
+
+def save_results(result: dict[str, object], output: Path) -> Path:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return output
+
+
+def main() -> None:
+    defaults = LoadTestConfig()
+    parser = argparse.ArgumentParser(description="RealtimeHub load test with simulated WebSockets")
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--zones", type=int, default=defaults.zones)
+    parser.add_argument("--broadcasts", type=int, default=defaults.broadcasts)
+    parser.add_argument("--scope-update-fraction", type=float, default=defaults.scope_update_fraction)
+    parser.add_argument("--slow-fraction", type=float, default=defaults.slow_fraction)
+    parser.add_argument("--slow-send-delay-ms", type=float, default=defaults.slow_send_delay_ms)
+    parser.add_argument("--send-queue-max-frames", type=int, default=defaults.send_queue_max_frames)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+    config = LoadTestConfig(
+        clients=max(1, args.clients),
+        zones=max(1, args.zones),
+        broadcasts=max(1, args.broadcasts),
+        scope_update_fraction=args.scope_update_fraction,
+        slow_fraction=max(0.0, args.slow_fraction),
+        slow_send_delay_ms=max(0.0, args.slow_send_delay_ms),
+        send_queue_max_frames=max(1, args.send_queue_max_frames),
+    )
+    result = asyncio.run(run_load_test(config))
+    if args.output is not None:
+        save_results(result, args.output)
+    print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Per-connection memory benchmark for RealtimeHub bookkeeping.
+
+Usage:
+  python backend/scripts/realtime_hub_memory_benchmark.py \
+    --clients 50000 \
+    --zones 50 \
+    --output load-results/realtime_hub_memory.json
+
+Connects idle fake sockets and reports traced bytes per connection after connect, after one round of zone and
+instance scope changes, and after disconnect (leak check). Socket objects are allocated before tracing starts,
+so the figures cover only what the hub keeps per connection: metadata, send queue, writer task and indexes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+import gc
+import json
+import os
+from pathlib import Path
+import platform
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for _name, _value in (
+    ("JWT_SECRET", "benchmark-secret"),
+    ("OPS_API_TOKEN", "benchmark-ops"),
+    ("DB_HOST", "localhost"),
+    ("DB_USER", "benchmark"),
+    ("DB_PASSWORD", "benchmark"),
+):
+    os.environ.setdefault(_name, _value)
+
+from app.services.realtime import ConnectionMeta, RealtimeHub  # noqa: E402
+
+
+class _IdleSocket:
+    __slots__ = ()
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, payload: str) -> None:
+        return None
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+def _traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def run_benchmark(*, clients: int, zones: int) -> dict[str, object]:
+    hub = RealtimeHub(heartbeat_interval_seconds=0)
+    sockets = [_IdleSocket() for _ in range(clients)]
+    metas = [
+        ConnectionMeta(
+            user_id=index + 1,
+            channel_id=index % 10 + 1,
+            client_version="1.0.0",
+            zone_level_id=index % zones + 1,
+            adjacent_level_ids=((index + 1) % zones + 1,),
+        )
+        for index in range(clients)
+    ]
+
+    tracemalloc.start()
+    baseline = _traced()
+    for socket, meta in zip(sockets, metas):
+        await hub.connect(socket, meta)
+    # Let every writer task reach its idle wait so its coroutine frame is counted at steady state.
+    await asyncio.sleep(0)
+    connected = _traced()
+
+    for index, socket in enumerate(sockets):
+        zone = (index + 7) % zones + 1
+        await hub.update_zone_scope(socket, zone_level_id=zone, adjacent_level_ids=[zone % zones + 1])
+        await hub.update_instance_scope(socket, instance_id=f"solo-l{zone}-c{index % 3}", party_id=None)
+    rescoped = _traced()
+
+    for socket in sockets:
+        await hub.disconnect(socket)
+    await asyncio.sleep(0)
+    disconnected = _traced()
+    tracemalloc.stop()
+
+    per_client = max(1, clients)
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "clients": clients,
+        "zones": zones,
+        "bytes_per_connection": round((connected - baseline) / per_client, 1),
+        "bytes_per_connection_after_rescope": round((rescoped - baseline) / per_client, 1),
+        "retained_bytes_after_disconnect": disconnected - baseline,
+        "traced_bytes_for_connections": connected - baseline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RealtimeHub per-connection memory benchmark")
+    parser.add_argument("--clients", type=int, default=50000)
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+    result = asyncio.run(run_benchmark(clients=max(1, args.clients), zones=max(1, args.zones)))
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    print(json.dumps(result, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.db.base import Base  # noqa: E402
+from app.models.security_event import SecurityEventAudit  # noqa: E402
+from app.services.audit_sink import AUDIT_OVERFLOW_BLOCK, AUDIT_OVERFLOW_DROP, audit_sink  # noqa: E402
+from app.services.security_events import write_security_event  # noqa: E402
+
+
+def _session_factory():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _event_count(session_local) -> int:
+    db = session_local()
+    try:
+        return int(db.execute(select(func.count(SecurityEventAudit.id))).scalar_one())
+    finally:
+        db.close()
+
+
+def test_security_events_are_batched_without_request_commits() -> None:
+    session_local = _session_factory()
+    audit_sink.reset_for_tests(max_queue_size=100, overflow_policy=AUDIT_OVERFLOW_DROP)
+    audit_sink.set_accepting(True)
+    try:
+        db = session_local()
+        for index in range(3):
+            write_security_event(db, event_type="login_failed_invalid_credentials", detail={"n": index}, commit=True)
+        assert not db.new
+        db.close()
+        assert _event_count(session_local) == 0
+        assert audit_sink.pending_count() == 3
+
+        assert audit_sink.flush(session_local) == 3
+        assert _event_count(session_local) == 3
+        stats = audit_sink.snapshot_stats()
+        assert stats["flushes_total"] == 1
+        assert stats["last_batch_size"] == 3
+    finally:
+        audit_sink.reset_for_tests()
+
+
+def test_overflow_policy_drops_or_falls_back_inline() -> None:
+    session_local = _session_factory()
+    audit_sink.reset_for_tests(max_queue_size=1, overflow_policy=AUDIT_OVERFLOW_DROP)
+    audit_sink.set_accepting(True)
+    try:
+        db = session_local()
+        write_security_event(db, event_type="first")
+        write_security_event(db, event_type="dropped")
+        assert audit_sink.snapshot_stats()["dropped_overflow_total"] == 1
+
+        audit_sink.reset_for_tests(max_queue_size=1, overflow_policy=AUDIT_OVERFLOW_BLOCK, block_timeout_seconds=0.01)
+        audit_sink.set_accepting(True)
+        write_security_event(db, event_type="queued")
+        write_security_event(db, event_type="inline", commit=True)
+        db.close()
+        assert audit_sink.snapshot_stats()["inline_fallback_total"] == 1
+        assert _event_count(session_local) == 1
+    finally:
+        audit_sink.reset_for_tests()
+
+
+def test_commit_flag_commits_work_the_caller_already_flushed() -> None:
+    session_local = _session_factory()
+    audit_sink.reset_for_tests(max_queue_size=100, overflow_policy=AUDIT_OVERFLOW_DROP)
+    audit_sink.set_accepting(True)
+    try:
+        db = session_local()
+        db.add(SecurityEventAudit(event_type="caller_work", severity="info", detail=""))
+        db.flush()
+        assert not (db.new or db.dirty or db.deleted)
+        write_security_event(db, event_type="refresh_failed_publish_drain_logout", commit=True)
+        db.close()
+        assert _event_count(session_local) == 1
+        assert audit_sink.pending_count() == 1
+    finally:
+        audit_sink.reset_for_tests()
@@ -0,0 +1,177 @@
+import asyncio
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.api.deps import get_async_auth_context, get_auth_context  # noqa: E402
+from app.api.routes.auth import logout  # noqa: E402
+from app.core.security import create_access_token, decode_access_token, verified_token_cache  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.release_policy import ReleasePolicy  # noqa: E402
+from app.models.session import UserSession  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.auth_context_cache import auth_context_cache  # noqa: E402
+from app.services.release_policy import reset_release_policy_cache_for_tests  # noqa: E402
+from app.services.session_touch import session_touch_buffer  # noqa: E402
+
+
+def _session_factory():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _seed(session_local) -> tuple[int, str]:
+    db = session_local()
+    user = User(email="cache@test.com", display_name="Cache", password_hash="x", is_admin=False)
+    db.add(user)
+    db.add(
+        ReleasePolicy(
+            id=1,
+            latest_version="1.0.0",
+            min_supported_version="1.0.0",
+            latest_content_version_key="cv_1",
+            min_supported_content_version_key="cv_1",
+            updated_by="test",
+        )
+    )
+    db.commit()
+    db.refresh(user)
+    db.add(
+        UserSession(
+            id="cache-session",
+            user_id=user.id,
+            refresh_token_hash="hash",
+            client_version="1.0.0",
+            client_content_version_key="cv_1",
+            expires_at=datetime.now(UTC) + timedelta(hours=1),
+            last_seen_at=datetime.now(UTC),
+        )
+    )
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id, "cache-session"
+
+
+def _resolve(session_local, token: str):
+    db = session_local()
+    try:
+        context = get_auth_context(
+            db=db,
+            credentials=HTTPAuthorizationCredentials(scheme="Bearer", credentials=token),
+            client_version="1.0.0",
+            client_content_version="cv_1",
+            client_content_contract=None,
+        )
+        return context.user.id, context.session.id, context.session.current_level_id
+    finally:
+        db.close()
+
+
+def test_cached_auth_context_skips_lookups_on_repeat_requests() -> None:
+    auth_context_cache.reset_for_tests(ttl_seconds=30.0)
+    reset_release_policy_cache_for_tests()
+    session_touch_buffer.reset_for_tests()
+    engine, session_local = _session_factory()
+    user_id, session_id = _seed(session_local)
+    token = create_access_token(user_id, session_id)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda _c, _cur, sql, *_rest: statements.append(sql))
+
+    assert _resolve(session_local, token) == (user_id, session_id, None)
+    cold_statements = len(statements)
+    assert cold_statements > 1
+
+    statements.clear()
+    assert _resolve(session_local, token) == (user_id, session_id, None)
+    assert statements == []
+    assert auth_context_cache.stats()["hits_total"] == 1
+    assert session_touch_buffer.pending_count() == 1
+
+
+def test_session_revocation_invalidates_cached_auth_context() -> None:
+    auth_context_cache.reset_for_tests(ttl_seconds=30.0)
+    reset_release_policy_cache_for_tests()
+    _engine, session_local = _session_factory()
+    user_id, session_id = _seed(session_local)
+    token = create_access_token(user_id, session_id)
+    _resolve(session_local, token)
+    assert auth_context_cache.stats()["entries"] == 1
+
+    verified_token_cache.reset_for_tests()
+    decode_access_token(token)
+    assert verified_token_cache.stats()["entries"] == 1
+
+    db = session_local()
+    logout(credentials=HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db=db)
+    db.close()
+    assert auth_context_cache.stats()["entries"] == 0
+    assert verified_token_cache.stats()["entries"] == 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        _resolve(session_local, token)
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail["message"] == "Session revoked"
+
+
+def test_verified_token_cache_reuses_payload_until_expiry() -> None:
+    verified_token_cache.reset_for_tests()
+    token = create_access_token(7, "token-cache-session")
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+    assert first == second
+    assert first["sid"] == "token-cache-session"
+    assert verified_token_cache.stats()["hits_total"] == 1
+
+    digest = verified_token_cache.digest(token)
+    verified_token_cache.put(digest, dict(first, exp=int(datetime.now(UTC).timestamp()) - 1))
+    assert verified_token_cache.get(digest) is None
+    assert verified_token_cache.stats()["entries"] == 0
+
+
+def test_async_auth_context_resolves_without_threadpool_session(tmp_path: Path) -> None:
+    pytest.importorskip("aiosqlite")
+    auth_context_cache.reset_for_tests(ttl_seconds=30.0)
+    reset_release_policy_cache_for_tests()
+    db_path = tmp_path / "auth.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", future=True)
+    Base.metadata.create_all(engine)
+    user_id, session_id = _seed(sessionmaker(bind=engine, autocommit=False, autoflush=False))
+    token = create_access_token(user_id, session_id)
+
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+        try:
+            results = []
+            for _ in range(2):
+                async with session_local() as db:
+                    context = await get_async_auth_context(
+                        db=db,
+                        credentials=HTTPAuthorizationCredentials(scheme="Bearer", credentials=token),
+                        client_version="1.0.0",
+                        client_content_version="cv_1",
+                        client_content_contract=None,
+                    )
+                    results.append((context.user.id, context.session.id, context.user.email))
+            return results
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(run()) == [(user_id, session_id, "cache@test.com")] * 2
+    assert auth_context_cache.stats()["hits_total"] == 1
@@ -1,6 +1,9 @@
+import asyncio
 import os
+from pathlib import Path
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 os.environ.setdefault("JWT_SECRET", "test-secret")
@@ -16,19 +19,33 @@ from app.models.user import User  # noqa: E402
 from app.schemas.character import CharacterCreateRequest  # noqa: E402
 
 
-def _db_session() -> Session:
-    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+def _db_session(path: Path) -> Session:
+    engine = create_engine(f"sqlite+pysqlite:///{path}", future=True)
     Base.metadata.create_all(engine)
     session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
     return session_local()
 
 
+def _list_characters_async(path: Path, auth: AuthContext):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_local = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            async with session_local() as db:
+                return await list_characters(context=auth, db=db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
 def _auth_context(user: User) -> AuthContext:
     return AuthContext(user=user, session=None, version_status=None)
 
 
-def test_character_create_then_list_returns_all_rows() -> None:
-    db = _db_session()
+def test_character_create_then_list_returns_all_rows(tmp_path: Path) -> None:
+    db_path = tmp_path / "characters.db"
+    db = _db_session(db_path)
     user = User(email="roundtrip@test.com", display_name="Roundtrip", password_hash="hash", is_admin=False)
     db.add(user)
     db.commit()
@@ -82,7 +99,7 @@ def test_character_create_then_list_returns_all_rows() -> None:
         db=db,
     )
 
-    rows = list_characters(context=auth, db=db)
+    rows = _list_characters_async(db_path, auth)
     assert len(rows) == 2
     assert [row.name for row in rows] == ["FirstHero", "SecondHero"]
     assert all(row.level == 1 for row in rows)
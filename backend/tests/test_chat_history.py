@@ -0,0 +1,313 @@
+import asyncio
+import json
+import os
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.api.deps import AuthContext  # noqa: E402
+from app.api.routes.chat import (  # noqa: E402
+    _can_access_channel,
+    _has_selected_character,
+    _to_message_response,
+    create_or_get_direct_channel,
+    list_messages,
+)
+from app.db.base import Base  # noqa: E402
+from app.models.character import Character  # noqa: E402
+from app.models.chat import ChatChannel, ChatMember, ChatMessage  # noqa: E402
+from app.models.session import UserSession  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.chat import DirectChannelRequest  # noqa: E402
+from app.schemas.common import VersionStatus  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services.chat_access_cache import chat_access_cache  # noqa: E402
+from app.services.chat_recent_cache import ChatRecentCache, chat_recent_cache  # noqa: E402
+from app.services.chat_write_behind import chat_write_behind  # noqa: E402
+
+
+def _version_status() -> VersionStatus:
+    return VersionStatus(
+        client_version="test-1.0.0",
+        latest_version="test-1.0.0",
+        min_supported_version="test-1.0.0",
+        client_content_version_key="runtime_gameplay_v1",
+        latest_content_version_key="runtime_gameplay_v1",
+        min_supported_content_version_key="runtime_gameplay_v1",
+        enforce_after=None,
+        update_available=False,
+        content_update_available=False,
+        force_update=False,
+        update_feed_url=None,
+    )
+
+
+def _seed(db: Session) -> tuple[AuthContext, int]:
+    # Every test starts from a fresh database whose ids collide with the previous one.
+    chat_access_cache.reset_for_tests(ttl_seconds=10.0)
+    reader = User(email="chat-reader@test.com", display_name="Reader", password_hash="hash", is_admin=False)
+    writer = User(email="chat-writer@test.com", display_name="Writer", password_hash="hash", is_admin=False)
+    channel = ChatChannel(name="Global", kind="GLOBAL")
+    db.add_all([reader, writer, channel])
+    db.commit()
+    db.add(
+        Character(
+            user_id=reader.id,
+            level_id=None,
+            location_x=0,
+            location_y=0,
+            name="ChatHero",
+            preset_key="sellsword",
+            appearance_key="human_male",
+            appearance_profile={},
+            race="Human",
+            background="Drifter",
+            affiliation="Unaffiliated",
+            stat_points_total=10,
+            stat_points_used=0,
+            level=1,
+            experience=0,
+            equipment={},
+            inventory=[],
+            stats={},
+            skills={},
+            is_selected=True,
+        )
+    )
+    session = UserSession(
+        id="sess-chat-history",
+        user_id=reader.id,
+        refresh_token_hash="hash",
+        client_version="test-1.0.0",
+        client_content_version_key="runtime_gameplay_v1",
+        drain_state="active",
+        expires_at=datetime.now(UTC) + timedelta(days=1),
+    )
+    db.add(session)
+    for index in range(1, 8):
+        sender = writer if index % 2 else reader
+        db.add(ChatMessage(channel_id=channel.id, sender_user_id=sender.id, content=f"m{index}"))
+    db.commit()
+    db.refresh(reader)
+    db.refresh(session)
+    return AuthContext(user=reader, session=session, version_status=_version_status()), channel.id
+
+
+def test_chat_history_pages_by_message_id(tmp_path: Path, monkeypatch) -> None:
+    pytest.importorskip("aiosqlite")
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    monkeypatch.setattr(settings, "chat_after_id_settle_seconds", 0.0)
+    db_path = tmp_path / "chat.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", future=True)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)() as db:
+        context, channel_id = _seed(db)
+
+    async def run() -> None:
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+        try:
+            async with session_local() as db:
+
+                async def page(**kwargs) -> list[str]:
+                    rows = await list_messages(
+                        channel_id=channel_id,
+                        limit=kwargs.pop("limit", 3),
+                        before_id=kwargs.pop("before_id", None),
+                        after_id=kwargs.pop("after_id", None),
+                        context=context,
+                        db=db,
+                    )
+                    return [row.content for row in rows]
+
+                newest = await list_messages(
+                    channel_id=channel_id, limit=3, before_id=None, after_id=None, context=context, db=db
+                )
+                assert [row.content for row in newest] == ["m5", "m6", "m7"]
+                assert [row.sender_display_name for row in newest] == ["Writer", "Reader", "Writer"]
+                assert await page(before_id=newest[0].id) == ["m2", "m3", "m4"]
+                assert await page(before_id=2) == ["m1"]
+                assert await page(after_id=2) == ["m3", "m4", "m5"]
+                assert await page(after_id=3, before_id=6, limit=10) == ["m4", "m5"]
+                assert await page(after_id=7) == []
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(run())
+
+
+def test_recent_messages_are_served_from_the_channel_ring(tmp_path: Path, monkeypatch) -> None:
+    pytest.importorskip("aiosqlite")
+    chat_recent_cache.reset_for_tests(ttl_seconds=30.0)
+    monkeypatch.setattr(settings, "chat_after_id_settle_seconds", 0.0)
+    db_path = tmp_path / "chat.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", future=True)
+    Base.metadata.create_all(engine)
+    session_local_sync = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    with session_local_sync() as db:
+        context, channel_id = _seed(db)
+
+    async def run() -> None:
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        session_local = async_sessionmaker(async_engine, expire_on_commit=False)
+        try:
+            async with session_local() as db:
+
+                async def read(**kwargs):
+                    return await list_messages(
+                        channel_id=channel_id,
+                        limit=kwargs.pop("limit", 3),
+                        before_id=kwargs.pop("before_id", None),
+                        after_id=kwargs.pop("after_id", None),
+                        context=context,
+                        db=db,
+                    )
+
+                primed = await read()
+                assert [row.content for row in primed] == ["m5", "m6", "m7"]
+
+                with session_local_sync() as sync_db:
+                    message = ChatMessage(channel_id=channel_id, sender_user_id=context.user.id, content="m8")
+                    sync_db.add(message)
+                    sync_db.commit()
+                    sync_db.refresh(message)
+                    response = _to_message_response(message, "Reader")
+                    chat_recent_cache.append(channel_id, message.id, response.model_dump_json())
+
+                cached = await read()
+                body = json.loads(cached.body)
+                assert [row["content"] for row in body] == ["m6", "m7", "m8"]
+                assert body[-1] == json.loads(response.model_dump_json())
+                # Catch-up reads always go to the database, which applies the settle rules.
+                caught_up = await read(after_id=primed[-1].id)
+                assert [row.content for row in caught_up] == ["m8"]
+                older = await read(before_id=primed[0].id)
+                assert [row.content for row in older] == ["m2", "m3", "m4"]
+
+                stats = chat_recent_cache.stats()
+                assert (stats["hits_total"], stats["primes_total"], stats["appends_total"]) == (1, 1, 1)
+        finally:
+            await async_engine.dispose()
+            chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+
+    asyncio.run(run())
+
+
+def test_direct_channel_is_found_by_canonical_member_pair() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)() as db:
+        context, _ = _seed(db)
+        writer_id = db.execute(select(User.id).where(User.email == "chat-writer@test.com")).scalar_one()
+
+        created = create_or_get_direct_channel(DirectChannelRequest(target_user_id=writer_id), context=context, db=db)
+        again = create_or_get_direct_channel(DirectChannelRequest(target_user_id=writer_id), context=context, db=db)
+        assert created == again
+        assert created.name == "DM: Reader / Writer"
+
+        channel = db.get(ChatChannel, created.id)
+        assert (channel.direct_low_user_id, channel.direct_high_user_id) == tuple(sorted((context.user.id, writer_id)))
+        members = db.execute(select(ChatMember.user_id).where(ChatMember.channel_id == created.id)).scalars().all()
+        assert sorted(members) == sorted((context.user.id, writer_id))
+        assert db.execute(select(func.count(ChatChannel.id)).where(ChatChannel.kind == "DIRECT")).scalar_one() == 1
+
+
+def test_chat_access_checks_are_cached_until_selection_or_membership_changes() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)() as db:
+        context, global_id = _seed(db)
+        user_id = context.user.id
+        private = ChatChannel(name="Private", kind="DIRECT")
+        db.add(private)
+        db.commit()
+
+        assert _has_selected_character(db, user_id)
+        assert _can_access_channel(db, user_id, global_id)
+        assert not _can_access_channel(db, user_id, private.id)
+        statements.clear()
+        assert _has_selected_character(db, user_id)
+        assert _can_access_channel(db, user_id, global_id)
+        assert not _can_access_channel(db, user_id, private.id)
+        assert statements == []
+
+        db.add(ChatMember(channel_id=private.id, user_id=user_id))
+        db.commit()
+        assert _can_access_channel(db, user_id, private.id)
+
+        character = db.execute(select(Character).where(Character.user_id == user_id)).scalar_one()
+        character.is_selected = False
+        db.commit()
+        assert not _has_selected_character(db, user_id)
+
+        stats = chat_access_cache.stats()
+        assert stats["hits_total"] >= 4
+        assert stats["invalidations_total"] == 2
+
+
+def test_recent_cache_write_tracking_is_bounded_and_rejects_raced_primes() -> None:
+    cache = ChatRecentCache(ttl_seconds=30.0, messages_per_channel=10, max_channels=2)
+    raced = cache.write_version()
+    for channel_id in range(1, 6):
+        cache.append(channel_id, 1, "{}")
+    assert len(cache._last_writes) == 2
+
+    cache.prime(1, [(1, "{}")], version=raced)
+    assert cache.newest(1, 1) is None
+    cache.prime(1, [(1, "{}")], version=cache.write_version())
+    assert cache.newest(1, 1) == ["{}"]
+    assert cache.stats()["stale_primes_total"] == 1
+
+
+def test_after_id_reads_stop_before_unsettled_or_queued_ids(tmp_path: Path, monkeypatch) -> None:
+    pytest.importorskip("aiosqlite")
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    db_path = tmp_path / "chat.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", future=True)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)() as db:
+        context, channel_id = _seed(db)
+        settled_at = datetime.now(UTC) - timedelta(minutes=5)
+        for message in db.execute(select(ChatMessage).where(ChatMessage.id <= 4)).scalars():
+            message.created_at = settled_at
+        db.commit()
+
+    async def run() -> list[str]:
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        try:
+            async with async_sessionmaker(async_engine, expire_on_commit=False)() as db:
+                rows = await list_messages(
+                    channel_id=channel_id, limit=10, before_id=None, after_id=0, context=context, db=db
+                )
+                return [row.content for row in rows]
+        finally:
+            await async_engine.dispose()
+
+    # m5..m7 were written moments ago: a lower id may still commit behind them.
+    monkeypatch.setattr(settings, "chat_after_id_settle_seconds", 60.0)
+    assert asyncio.run(run()) == ["m1", "m2", "m3", "m4"]
+
+    # Id 3 still sitting in the write-behind queue holds the page back to the rows beneath it.
+    monkeypatch.setattr(settings, "chat_after_id_settle_seconds", 0.0)
+    with sessionmaker(bind=engine)() as db:
+        db.delete(db.get(ChatMessage, 3))
+        db.commit()
+    chat_write_behind.reset_for_tests()
+    chat_write_behind.attach(lambda: None)
+    try:
+        assert chat_write_behind.submit({"id": 3, "channel_id": channel_id}, "{}")
+        assert asyncio.run(run()) == ["m1", "m2"]
+    finally:
+        chat_write_behind.reset_for_tests()
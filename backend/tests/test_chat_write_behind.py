@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.api.routes.chat import _persist_message  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.chat import ChatChannel, ChatMessage  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.chat_recent_cache import chat_recent_cache  # noqa: E402
+from app.services.chat_write_behind import (  # noqa: E402
+    chat_write_behind,
+    start_chat_write_behind_worker,
+    stop_chat_write_behind_worker,
+)
+
+
+def _session_factory():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    db = session_local()
+    db.add(User(email="chat-wb@test.com", display_name="Sender", password_hash="hash", is_admin=False))
+    db.add(ChatChannel(name="Global", kind="GLOBAL"))
+    db.commit()
+    db.close()
+    return session_local
+
+
+def _persisted(session_local) -> list[tuple[int, str]]:
+    db = session_local()
+    try:
+        return [tuple(row) for row in db.execute(select(ChatMessage.id, ChatMessage.content).order_by(ChatMessage.id))]
+    finally:
+        db.close()
+
+
+def _send(session_local, content: str) -> int:
+    db = session_local()
+    try:
+        return _persist_message(
+            db, channel_id=1, sender_user_id=1, sender_display_name="Sender", content=content
+        ).id
+    finally:
+        db.close()
+
+
+def test_messages_get_reserved_ids_and_are_bulk_inserted() -> None:
+    session_local = _session_factory()
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    chat_write_behind.reset_for_tests(id_block_size=4)
+    chat_write_behind.attach(session_local)
+    try:
+        assert chat_write_behind.refill_ids(session_local, force=True) == 4
+        ids = [_send(session_local, f"m{index}") for index in range(4)]
+        assert ids == [1, 2, 3, 4]
+        assert _persisted(session_local) == []
+        assert [message_id for message_id, _ in chat_write_behind.pending_for_channel(1)] == ids
+        assert chat_write_behind.lowest_pending_id(1) == 1
+
+        assert chat_write_behind.flush(session_local) == 4
+        assert _persisted(session_local) == [(index + 1, f"m{index}") for index in range(4)]
+        stats = chat_write_behind.snapshot_stats()
+        assert (stats["flushes_total"], stats["queue_depth"], stats["id_blocks_reserved_total"]) == (1, 0, 1)
+    finally:
+        chat_write_behind.reset_for_tests()
+
+
+def test_shutdown_flushes_queue_and_falls_back_to_inline_writes() -> None:
+    session_local = _session_factory()
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    chat_write_behind.reset_for_tests(id_block_size=10)
+    chat_write_behind.refill_ids(session_local, force=True)
+    handle = start_chat_write_behind_worker(session_factory=session_local, interval_seconds=60.0)
+    try:
+        queued_id = _send(session_local, "queued")
+        assert chat_write_behind.pending_count() == 1
+    finally:
+        stop_chat_write_behind_worker(handle)
+    assert chat_write_behind.pending_count() == 0
+    assert _persisted(session_local) == [(queued_id, "queued")]
+
+    assert not chat_write_behind.accepting
+    inline_id = _send(session_local, "inline")
+    assert inline_id > queued_id
+    assert _persisted(session_local)[-1] == (inline_id, "inline")
+    chat_write_behind.reset_for_tests()
+
+
+def test_id_misses_persist_inline_and_expired_leases_are_dropped() -> None:
+    session_local = _session_factory()
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    chat_write_behind.reset_for_tests(id_block_size=10, id_lease_seconds=0.05)
+    chat_write_behind.attach(session_local)
+    try:
+        # No block yet: the send never reserves ids itself, it writes the row inline and records demand.
+        inline_id = _send(session_local, "inline")
+        assert _persisted(session_local) == [(inline_id, "inline")]
+        assert chat_write_behind.snapshot_stats()["id_misses_total"] == 1
+
+        # The worker's refill is sized from demand rather than the full block.
+        assert chat_write_behind.refill_ids(session_local) == 2
+        assert chat_write_behind.refill_ids(session_local) == 0
+        time.sleep(0.1)
+        assert chat_write_behind.allocate_id() is None
+        stats = chat_write_behind.snapshot_stats()
+        assert (stats["ids_expired_total"], stats["reserved_ids"]) == (2, 0)
+    finally:
+        chat_write_behind.reset_for_tests()
+
+
+def test_concurrent_flushes_write_each_row_once(monkeypatch) -> None:
+    chat_write_behind.reset_for_tests()
+    chat_write_behind.attach(lambda: None)
+    written: list[int] = []
+
+    def slow_write(_session_factory, batch):
+        time.sleep(0.05)
+        written.extend(row["id"] for row in batch)
+        return len(batch)
+
+    monkeypatch.setattr(chat_write_behind, "_write_batch", slow_write)
+    try:
+        for message_id in range(1, 4):
+            assert chat_write_behind.submit({"id": message_id, "channel_id": 1}, "{}")
+        threads = [threading.Thread(target=chat_write_behind.flush, args=(None,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert written == [1, 2, 3]
+        assert chat_write_behind.pending_count() == 0
+    finally:
+        chat_write_behind.reset_for_tests()
+
+
+def test_rows_rejected_by_integrity_errors_are_logged(caplog) -> None:
+    session_local = _session_factory()
+    chat_recent_cache.reset_for_tests(ttl_seconds=0.0)
+    chat_write_behind.reset_for_tests()
+    chat_write_behind.attach(session_local)
+    inline_id = _send(session_local, "inline")
+    try:
+        row = {"channel_id": 1, "sender_user_id": 1, "content": "dup", "created_at": datetime.now(UTC)}
+        assert chat_write_behind.submit({**row, "id": inline_id}, "{}")
+        assert chat_write_behind.submit({**row, "id": inline_id + 1}, "{}")
+        with caplog.at_level(logging.ERROR, logger="children-of-ikphelion.chat_write_behind"):
+            assert chat_write_behind.flush(session_local) == 1
+        assert f"id={inline_id} channel_id=1 sender_user_id=1" in caplog.text
+        assert chat_write_behind.snapshot_stats()["dropped_invalid_total"] == 1
+    finally:
+        chat_write_behind.reset_for_tests()
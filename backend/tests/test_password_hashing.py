@@ -0,0 +1,94 @@
+import os
+import time
+from threading import Event, Thread
+
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.services.password_hashing import PasswordHashingBusyError, PasswordHashingPool  # noqa: E402
+
+
+def test_process_pool_hashes_and_verifies_passwords() -> None:
+    pool = PasswordHashingPool(max_workers=1, max_queue_depth=4, timeout_seconds=30.0)
+    try:
+        password_hash = pool.hash("correct horse")
+        assert pool.verify("correct horse", password_hash) is True
+        assert pool.verify("wrong horse", password_hash) is False
+    finally:
+        pool.shutdown()
+    stats = pool.stats()
+    assert stats["completed_total"] == 3
+    assert stats["queue_depth"] == 0
+
+
+def test_admission_queue_sheds_work_beyond_limit() -> None:
+    pool = PasswordHashingPool(max_workers=0, max_queue_depth=1, timeout_seconds=5.0)
+    started = Event()
+    release = Event()
+
+    def _blocking() -> bool:
+        started.set()
+        release.wait(timeout=5.0)
+        return True
+
+    worker = Thread(target=pool._run, args=(_blocking,))
+    worker.start()
+    assert started.wait(timeout=5.0)
+    try:
+        with pytest.raises(PasswordHashingBusyError):
+            pool.verify("secret", "hash")
+        assert pool.stats()["queue_depth"] == 1
+    finally:
+        release.set()
+        worker.join(timeout=5.0)
+
+    stats = pool.stats()
+    assert stats["rejected_total"] == 1
+    assert stats["admitted_total"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_timed_out_hash_keeps_its_slot_until_the_worker_finishes() -> None:
+    pool = PasswordHashingPool(max_workers=1, max_queue_depth=1, timeout_seconds=30.0)
+    try:
+        # Warm the worker so the timed-out call below is already running, which cancel() cannot stop.
+        assert pool._run(abs, -1) == 1
+        pool._timeout_seconds = 0.1
+        with pytest.raises(PasswordHashingBusyError):
+            pool._run(time.sleep, 1.5)
+        assert pool.stats()["queue_depth"] == 1
+        with pytest.raises(PasswordHashingBusyError):
+            pool.verify("secret", "hash")
+        assert pool.stats()["rejected_total"] == 1
+
+        deadline = time.monotonic() + 10.0
+        while pool.stats()["queue_depth"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.stats()["queue_depth"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_broken_worker_pool_is_replaced() -> None:
+    pool = PasswordHashingPool(max_workers=1, max_queue_depth=4, timeout_seconds=30.0)
+    try:
+        with pytest.raises(PasswordHashingBusyError):
+            pool._run(os._exit, 1)
+        assert pool.stats()["pool_restarts_total"] == 1
+        assert pool._run(abs, -2) == 2
+
+        # A pool that broke between calls is replaced at submit time and the call goes through.
+        broken = pool._executor
+        broken._broken = "worker died"
+        assert pool._run(abs, -3) == 3
+        assert pool._executor is not broken
+        stats = pool.stats()
+        assert stats["pool_restarts_total"] == 2
+        assert stats["queue_depth"] == 0
+    finally:
+        pool.shutdown()
@@ -0,0 +1,75 @@
+import os
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.db.base import Base  # noqa: E402
+from app.services.rate_limit import InMemoryRateLimiter, RateLimitRule, SharedRateLimiter  # noqa: E402
+
+RULE = RateLimitRule(limit=3, window_seconds=60, lockout_seconds=120)
+
+
+def test_gcra_blocks_after_limit_and_reset_clears_key() -> None:
+    limiter = InMemoryRateLimiter()
+    for _ in range(2):
+        limiter.record_failure("auth_ip", "ip:1", RULE)
+        assert limiter.check("auth_ip", "ip:1", RULE) == (True, 0)
+
+    limiter.record_failure("auth_ip", "ip:1", RULE)
+    allowed, retry_after = limiter.check("auth_ip", "ip:1", RULE)
+    assert allowed is False
+    assert 0 < retry_after <= RULE.lockout_seconds
+    assert limiter.check("auth_ip", "ip:2", RULE) == (True, 0)
+    assert limiter.stats()["blocked_keys"] == 1
+
+    limiter.reset("auth_ip", "ip:1")
+    assert limiter.check("auth_ip", "ip:1", RULE) == (True, 0)
+    assert limiter.stats()["tracked_keys"] == 0
+
+
+def test_sweeper_evicts_idle_keys_and_compacts_storage() -> None:
+    limiter = InMemoryRateLimiter()
+    for index in range(5000):
+        limiter.record_failure("auth_account", f"acct:{index}", RULE)
+    limiter.record_failure("auth_account", "acct:blocked", RateLimitRule(limit=1, window_seconds=60, lockout_seconds=600))
+    before = limiter.stats()
+    assert before["tracked_keys"] == 5001
+    assert before["memory_bytes_estimate"] > 0
+
+    evicted = limiter.sweep(now=time.time() + RULE.window_seconds + 1)
+    after = limiter.stats()
+    assert evicted == 5000
+    assert after["tracked_keys"] == 1
+    assert after["blocked_keys"] == 1
+    assert after["allocated_slots"] == 1
+    assert after["memory_bytes_estimate"] < before["memory_bytes_estimate"]
+
+
+def test_shared_store_aggregates_failures_across_replicas() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    replica_a = SharedRateLimiter(InMemoryRateLimiter())
+    replica_b = SharedRateLimiter(InMemoryRateLimiter())
+
+    replica_a.record_failure("auth_account", "acct:shared", RULE)
+    replica_a.record_failure("auth_account", "acct:shared", RULE)
+    replica_b.record_failure("auth_account", "acct:shared", RULE)
+    assert replica_a.check("auth_account", "acct:shared", RULE) == (True, 0)
+    assert replica_b.check("auth_account", "acct:shared", RULE) == (True, 0)
+
+    assert replica_a.flush(session_local) == 1
+    assert replica_b.flush(session_local) == 1
+    assert replica_b.check("auth_account", "acct:shared", RULE)[0] is False
+
+    replica_a.flush(session_local)
+    assert replica_a.check("auth_account", "acct:shared", RULE)[0] is False
+    assert replica_a.stats()["remote_lockouts_applied_total"] == 1
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+from queue import Empty, Queue
+from threading import Lock
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.services.realtime import ConnectionMeta, RealtimeHub  # noqa: E402
+from app.services.realtime_bus import (  # noqa: E402
+    RealtimeBus,
+    start_realtime_bus_worker,
+    stop_realtime_bus_worker,
+)
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, payload: str) -> None:
+        self.messages.append(json.loads(payload))
+
+
+class _InProcessBroker:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._listeners: dict[str, list[Queue]] = {}
+
+    def subscribe(self, channel: str) -> Queue:
+        queue: Queue = Queue()
+        with self._lock:
+            self._listeners.setdefault(channel, []).append(queue)
+        return queue
+
+    def notify(self, channel: str, payloads: list[str]) -> None:
+        with self._lock:
+            listeners = list(self._listeners.get(channel, []))
+        for queue in listeners:
+            for payload in payloads:
+                queue.put(payload)
+
+
+class _BrokerConnection:
+    def __init__(self, broker: _InProcessBroker) -> None:
+        self._broker = broker
+        self._queue: Queue | None = None
+
+    def listen(self, channel: str) -> None:
+        self._queue = self._broker.subscribe(channel)
+
+    def poll(self, timeout_seconds: float) -> list[str]:
+        if self._queue is None:
+            return []
+        try:
+            payloads = [self._queue.get(timeout=min(timeout_seconds, 0.05))]
+        except Empty:
+            return []
+        while not self._queue.empty():
+            payloads.append(self._queue.get_nowait())
+        return payloads
+
+    def notify_many(self, channel: str, payloads: list[str]) -> None:
+        self._broker.notify(channel, payloads)
+
+    def close(self) -> None:
+        return None
+
+
+class _BrokerConnector:
+    def __init__(self, broker: _InProcessBroker) -> None:
+        self._broker = broker
+
+    def open(self) -> _BrokerConnection:
+        return _BrokerConnection(self._broker)
+
+
+async def _wait_for(predicate, timeout_seconds: float = 2.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout_seconds
+    while not predicate():
+        if asyncio.get_running_loop().time() >= deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+def test_hub_events_fan_out_across_processes() -> None:
+    async def run() -> None:
+        broker = _InProcessBroker()
+        hub_a, hub_b = RealtimeHub(), RealtimeHub()
+        bus_a = RealtimeBus(channel="realtime_fanout", max_queue_size=100, batch_size=10)
+        bus_b = RealtimeBus(channel="realtime_fanout", max_queue_size=100, batch_size=10)
+        handle_a = start_realtime_bus_worker(
+            connector=_BrokerConnector(broker), hub=hub_a, bus=bus_a, listen_timeout_seconds=0.05
+        )
+        handle_b = start_realtime_bus_worker(
+            connector=_BrokerConnector(broker), hub=hub_b, bus=bus_b, listen_timeout_seconds=0.05
+        )
+        try:
+            local = FakeSocket()
+            remote = FakeSocket()
+            other_zone = FakeSocket()
+            await hub_a.connect(local, ConnectionMeta(user_id=1, channel_id=5, client_version="1.0.0", zone_level_id=3))
+            await hub_b.connect(remote, ConnectionMeta(user_id=2, channel_id=5, client_version="1.0.0", zone_level_id=3))
+            await hub_b.connect(other_zone, ConnectionMeta(user_id=3, channel_id=None, client_version="1.0.0", zone_level_id=4))
+            assert await _wait_for(
+                lambda: handle_a.listener.stats.wake_dispatches >= 1 and handle_b.listener.stats.wake_dispatches >= 1
+            )
+
+            await hub_a.broadcast(5, {"type": "chat_message", "id": 1})
+            await hub_a.broadcast_zone(zone_level_id=3, exclude_user_id=1, payload={"type": "zone_presence", "user_id": 1})
+            await hub_a.notify_force_update("1.0.1", "content-2", None)
+
+            assert await _wait_for(lambda: len(remote.messages) == 3 and len(other_zone.messages) == 1)
+            assert [message["type"] for message in remote.messages] == ["chat_message", "zone_presence", "force_update"]
+            assert [message["type"] for message in other_zone.messages] == ["force_update"]
+            await hub_a.wait_until_drained()
+            assert [message["type"] for message in local.messages] == ["chat_message", "force_update"]
+
+            stats_a = bus_a.snapshot_stats()
+            assert stats_a["published_total"] == 3
+            assert stats_a["loopback_skipped_total"] == 3
+            assert bus_b.snapshot_stats()["delivered_remote_total"] == 3
+        finally:
+            stop_realtime_bus_worker(handle_a)
+            stop_realtime_bus_worker(handle_b)
+
+    asyncio.run(run())
+
+
+def test_oversize_payloads_stay_local() -> None:
+    bus = RealtimeBus(channel="realtime_fanout", max_queue_size=1, batch_size=1)
+    assert bus.publish({"k": "all", "frame": "x"}) is False
+    bus.attach(RealtimeHub(), None)
+    assert bus.publish({"k": "all", "frame": "x" * 9000}) is False
+    assert bus.publish({"k": "all", "frame": "x"}) is True
+    assert bus.publish({"k": "all", "frame": "y"}) is False
+    stats = bus.snapshot_stats()
+    assert stats["oversize_local_only_total"] == 1
+    assert stats["dropped_overflow_total"] == 1
@@ -0,0 +1,58 @@
+import asyncio
+import importlib.util
+import json
+import os
+from pathlib import Path
+import sys
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+_SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+
+
+def _load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name, _SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+load_test = _load_script("realtime_hub_load_test")
+memory_benchmark = _load_script("realtime_hub_memory_benchmark")
+
+
+def test_load_harness_reports_latency_throughput_and_memory(tmp_path: Path) -> None:
+    clients = int(os.environ.get("REALTIME_LOAD_TEST_CLIENTS", "10000"))
+    config = load_test.LoadTestConfig(
+        clients=clients,
+        zones=25,
+        broadcasts=20,
+        slow_fraction=0.01,
+        slow_send_delay_ms=5,
+        drain_timeout_seconds=30.0,
+    )
+    result = asyncio.run(load_test.run_load_test(config))
+    output = load_test.save_results(result, tmp_path / "realtime_hub.json")
+
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    assert saved["config"]["clients"] == clients
+    broadcast = saved["broadcast_zone"]
+    assert broadcast["drained"] is True
+    assert broadcast["fan_out_latency"]["count"] == 20
+    assert broadcast["fan_out_latency"]["p99_ms"] >= broadcast["fan_out_latency"]["p50_ms"] > 0
+    assert broadcast["recipients_total"] == 20 * (2 * clients // 25)
+    assert saved["connect"]["per_second"] > 0
+    assert saved["disconnect"]["per_second"] > 0
+    assert saved["memory"]["bytes_per_connection"] > 0
+
+
+def test_hub_bookkeeping_stays_within_per_connection_budget() -> None:
+    result = asyncio.run(memory_benchmark.run_benchmark(clients=5000, zones=25))
+    # Slotted metadata, id-keyed indexes and lazily created waiters keep the hub near 1.7 KB per idle socket.
+    assert 0 < result["bytes_per_connection"] < 2400
+    assert result["bytes_per_connection_after_rescope"] < 2400
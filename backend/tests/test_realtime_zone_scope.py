@@ -1,7 +1,25 @@
 import asyncio
 import json
+import os
+import time
 
-from app.services.realtime import ConnectionMeta, RealtimeHub
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.services.realtime import (  # noqa: E402
+    RESUME_FRESH,
+    RESUME_RESUMED,
+    RESUME_RESYNC_REQUIRED,
+    SEND_OVERFLOW_CONFLATE,
+    SEND_OVERFLOW_DISCONNECT,
+    ConnectionMeta,
+    RealtimeHub,
+)
+from app.services.observability import zone_runtime_stats  # noqa: E402
+from app.services.zone_presence import ZonePresenceAggregator  # noqa: E402
 
 
 class FakeSocket:
@@ -43,6 +61,7 @@ def test_zone_broadcast_respects_active_zone_and_adjacent_preview() -> None:
             payload={"type": "zone_presence", "level_id": 1},
         )
         assert delivered_direct == 1
+        assert await hub.wait_until_drained()
         assert len(socket_a.messages) == 1
         assert len(socket_b.messages) == 0
         assert len(socket_c.messages) == 0
@@ -53,6 +72,7 @@ def test_zone_broadcast_respects_active_zone_and_adjacent_preview() -> None:
             payload={"type": "zone_presence", "level_id": 1},
         )
         assert delivered_with_adjacent == 2
+        assert await hub.wait_until_drained()
         assert len(socket_a.messages) == 2
         assert len(socket_b.messages) == 1
         assert len(socket_c.messages) == 0
@@ -75,7 +95,410 @@ def test_zone_broadcast_respects_active_zone_and_adjacent_preview() -> None:
             payload={"type": "zone_presence", "level_id": 1},
         )
         assert delivered_after_scope_change == 1
+        assert await hub.wait_until_drained()
         assert len(socket_a.messages) == 2
         assert len(socket_c.messages) == 1
 
     asyncio.run(run())
+
+
+def test_adjacent_preview_index_tracks_scope_changes_and_disconnects() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        watcher = FakeSocket()
+        bystander = FakeSocket()
+        await hub.connect(
+            watcher,
+            ConnectionMeta(user_id=1, channel_id=None, client_version="1.0.0", zone_level_id=2, adjacent_level_ids=(5,)),
+        )
+        await hub.connect(bystander, ConnectionMeta(user_id=2, channel_id=None, client_version="1.0.0", zone_level_id=9))
+
+        assert await hub.sockets_for_zone(5, include_adjacent_preview=True) == [watcher]
+        assert await hub.sockets_for_zone(5, include_adjacent_preview=False) == []
+
+        await hub.update_zone_scope(watcher, zone_level_id=2, adjacent_level_ids=[6])
+        assert await hub.sockets_for_zone(5, include_adjacent_preview=True) == []
+        assert await hub.sockets_for_zone(6, include_adjacent_preview=True) == [watcher]
+
+        await hub.update_zone_scope(watcher, zone_level_id=2, adjacent_level_ids=[6], allow_adjacent_preview=False)
+        assert await hub.sockets_for_zone(6, include_adjacent_preview=True) == []
+
+        await hub.update_zone_scope(watcher, zone_level_id=2, adjacent_level_ids=[6])
+        await hub.disconnect(watcher)
+        assert await hub.sockets_for_zone(6, include_adjacent_preview=True) == []
+        assert hub._adjacent == {}
+
+    asyncio.run(run())
+
+
+class GatedSocket(FakeSocket):
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = asyncio.Event()
+        self.closed_code: int | None = None
+
+    async def send_text(self, payload: str) -> None:
+        await self.gate.wait()
+        await super().send_text(payload)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_code = code
+
+
+def test_slow_socket_queue_overflow_policies() -> None:
+    async def run() -> None:
+        hub = RealtimeHub(send_queue_max_frames=2, send_overflow_policy=SEND_OVERFLOW_CONFLATE)
+        slow = GatedSocket()
+        fast = FakeSocket()
+        await hub.connect(slow, ConnectionMeta(user_id=1, channel_id=7, client_version="1.0.0"))
+        await hub.connect(fast, ConnectionMeta(user_id=2, channel_id=7, client_version="1.0.0"))
+        await asyncio.sleep(0)
+
+        for seq in range(5):
+            await hub.broadcast(7, {"type": "chat", "seq": seq})
+            for _ in range(3):
+                await asyncio.sleep(0)
+        assert await hub.wait_until_drained(timeout_seconds=0.01) is False
+        assert [message["seq"] for message in fast.messages] == [0, 1, 2, 3, 4]
+        stats = hub.send_queue_stats()
+        assert stats["max_queue_depth"] == 2
+        assert stats["frames_dropped_total"] >= 2
+
+        slow.gate.set()
+        assert await hub.wait_until_drained()
+        assert [message["seq"] for message in slow.messages][-2:] == [3, 4]
+
+        slow.gate.clear()
+        await asyncio.sleep(0)
+        slow_conn = hub._connection(slow)
+        hub._enqueue(slow_conn, json.dumps({"seq": "a"}), "presence:9")
+        hub._enqueue(slow_conn, json.dumps({"seq": "b"}), "presence:9")
+        assert hub.send_queue_stats()["frames_conflated_total"] >= 1
+        slow.gate.set()
+        assert await hub.wait_until_drained()
+        assert slow.messages[-1] == {"seq": "b"}
+        assert {"seq": "a"} not in slow.messages
+
+        strict = RealtimeHub(send_queue_max_frames=1, send_overflow_policy=SEND_OVERFLOW_DISCONNECT)
+        stuck = GatedSocket()
+        await strict.connect(stuck, ConnectionMeta(user_id=3, channel_id=8, client_version="1.0.0"))
+        for seq in range(3):
+            await strict.broadcast(8, {"seq": seq})
+        assert stuck.closed_code == 1013
+        assert strict.send_queue_stats()["connections"] == 0
+        assert strict.send_queue_stats()["overflow_disconnects_total"] == 1
+
+    asyncio.run(run())
+
+
+def test_zone_presence_aggregator_flushes_one_batch_per_zone() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        aggregator = ZonePresenceAggregator(hub=hub, tick_seconds=60.0)
+        town = FakeSocket()
+        neighbour = FakeSocket()
+        await hub.connect(town, ConnectionMeta(user_id=1, channel_id=None, client_version="1.0.0", zone_level_id=1))
+        await hub.connect(
+            neighbour,
+            ConnectionMeta(user_id=2, channel_id=None, client_version="1.0.0", zone_level_id=2, adjacent_level_ids=(1,)),
+        )
+
+        for step in range(10):
+            for user_id in (1, 3, 4):
+                aggregator.submit(
+                    zone_level_id=1,
+                    user_id=user_id,
+                    update={"user_id": user_id, "level_id": 1, "location_x": step, "location_y": 0},
+                )
+        assert await aggregator.flush() == 1
+        assert await hub.wait_until_drained()
+
+        assert len(town.messages) == 1
+        batch = town.messages[0]
+        assert batch["type"] == "zone_presence_batch"
+        assert sorted(update["user_id"] for update in batch["updates"]) == [1, 3, 4]
+        assert all(update["location_x"] == 9 for update in batch["updates"])
+        assert neighbour.messages == [batch]
+
+        other_instance = FakeSocket()
+        await hub.connect(
+            other_instance,
+            ConnectionMeta(user_id=5, channel_id=None, client_version="1.0.0", zone_level_id=1, instance_id="solo-l1-c5"),
+        )
+        aggregator.submit(zone_level_id=1, user_id=5, instance_id="solo-l1-c5", update={"user_id": 5, "level_id": 1})
+        aggregator.submit(zone_level_id=1, user_id=1, update={"user_id": 1, "level_id": 1})
+        assert aggregator.stats()["pending_zones"] == 2
+        assert await aggregator.flush() == 2
+        assert await hub.wait_until_drained()
+        instanced = other_instance.messages[0]
+        assert instanced["instance_id"] == "solo-l1-c5"
+        assert [update["user_id"] for update in instanced["updates"]] == [5]
+        assert all(message.get("instance_id") is None for message in town.messages)
+        assert all(5 not in [update["user_id"] for update in message["updates"]] for message in town.messages)
+
+        stats = aggregator.stats()
+        assert stats["updates_received_total"] == 32
+        assert stats["updates_conflated_total"] == 27
+        assert stats["batches_flushed_total"] == 3
+        assert stats["conflation_ratio"] == round(32 / 3, 3)
+        await aggregator.stop()
+
+    asyncio.run(run())
+
+
+def test_recipient_snapshots_are_copy_on_write() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        first = FakeSocket()
+        second = FakeSocket()
+        await hub.connect(first, ConnectionMeta(user_id=1, channel_id=4, client_version="1.0.0", zone_level_id=1))
+        snapshot = hub._zones[1]
+        channel_snapshot = hub._channels[4]
+
+        await hub.connect(second, ConnectionMeta(user_id=2, channel_id=4, client_version="1.0.0", zone_level_id=1))
+        first_id, second_id = hub._conn_ids[first], hub._conn_ids[second]
+        meta = hub.connection_meta(first)
+        await hub.update_zone_scope(first, zone_level_id=2, adjacent_level_ids=None)
+        assert hub.connection_meta(first) is meta
+        assert snapshot == frozenset({first_id})
+        assert channel_snapshot == frozenset({first_id})
+        assert hub._zones[1] == frozenset({second_id})
+        assert hub._zones[2] == frozenset({first_id})
+
+        await hub.disconnect(second)
+        assert 1 not in hub._zones
+        assert hub._channels[4] == frozenset({first_id})
+        assert await hub.sockets_for_zone(2, include_adjacent_preview=False, exclude_user_id=1) == []
+
+    asyncio.run(run())
+
+
+def test_instance_and_party_broadcasts_reach_only_members() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        solo = FakeSocket()
+        party_a = FakeSocket()
+        party_b = FakeSocket()
+        await hub.connect(
+            solo,
+            ConnectionMeta(user_id=1, channel_id=None, client_version="1.0.0", zone_level_id=5, instance_id="solo-l5-c1"),
+        )
+        for user_id, socket in ((2, party_a), (3, party_b)):
+            await hub.connect(
+                socket,
+                ConnectionMeta(
+                    user_id=user_id,
+                    channel_id=None,
+                    client_version="1.0.0",
+                    zone_level_id=5,
+                    instance_id="party-l5-p9",
+                    party_id="p9",
+                ),
+            )
+
+        assert await hub.broadcast_instance("party-l5-p9", {"type": "npc_state"}) == 2
+        assert await hub.broadcast_party("p9", {"type": "party_ping"}, exclude_user_id=2) == 1
+        assert await hub.broadcast_instance("solo-l5-c1", {"type": "npc_state"}) == 1
+        assert await hub.wait_until_drained()
+        assert [message["type"] for message in party_a.messages] == ["npc_state"]
+        assert [message["type"] for message in party_b.messages] == ["npc_state", "party_ping"]
+        assert [message["type"] for message in solo.messages] == ["npc_state"]
+
+        meta = await hub.update_instance_scope(solo, instance_id="party-l5-p9", party_id="p9")
+        assert meta is not None and meta.party_id == "p9"
+        assert "solo-l5-c1" not in hub._instances
+        assert await hub.broadcast_party("p9", {"type": "party_ping"}) == 3
+
+        await hub.disconnect(party_a)
+        await hub.disconnect(party_b)
+        await hub.disconnect(solo)
+        assert hub._instances == {}
+        assert hub._parties == {}
+
+    asyncio.run(run())
+
+
+def test_zone_broadcasts_stay_inside_the_sender_instance() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        first = FakeSocket()
+        second = FakeSocket()
+        previewer = FakeSocket()
+        await hub.connect(
+            first,
+            ConnectionMeta(user_id=1, channel_id=None, client_version="1.0.0", zone_level_id=5, instance_id="hub-l5"),
+        )
+        await hub.connect(
+            second,
+            ConnectionMeta(user_id=2, channel_id=None, client_version="1.0.0", zone_level_id=5, instance_id="solo-l5-c2"),
+        )
+        await hub.connect(
+            previewer,
+            ConnectionMeta(
+                user_id=3,
+                channel_id=None,
+                client_version="1.0.0",
+                zone_level_id=6,
+                adjacent_level_ids=(5,),
+                instance_id="solo-l6-c3",
+            ),
+        )
+
+        delivered = await hub.broadcast_zone(
+            zone_level_id=5,
+            include_adjacent_preview=True,
+            instance_id="hub-l5",
+            payload={"type": "zone_presence", "user_id": 9},
+        )
+        assert delivered == 1
+        assert await hub.sockets_for_zone(5, include_adjacent_preview=True, instance_id="solo-l5-c2") == [second]
+        assert await hub.broadcast_zone(zone_level_id=5, include_adjacent_preview=True, payload={"type": "ping"}) == 3
+        assert await hub.wait_until_drained()
+        assert [message["type"] for message in first.messages] == ["zone_presence", "ping"]
+        assert [message["type"] for message in second.messages] == ["ping"]
+        assert [message["type"] for message in previewer.messages] == ["ping"]
+
+        await hub.deliver_remote(
+            {"k": "zone", "zone_level_id": 5, "adjacent": False, "instance_id": "solo-l5-c2", "frame": json.dumps({"type": "remote"})}
+        )
+        assert await hub.wait_until_drained()
+        assert second.messages[-1] == {"type": "remote"}
+        assert first.messages[-1] == {"type": "ping"}
+
+    asyncio.run(run())
+
+
+def test_world_entry_scope_is_applied_on_the_loop_and_forwarded_over_the_bus() -> None:
+    async def run() -> None:
+        hub = RealtimeHub()
+        published: list[dict] = []
+        hub._publish = published.append
+        socket = FakeSocket()
+        await hub.connect(socket, ConnectionMeta(user_id=4, channel_id=None, client_version="1.0.0", zone_level_id=5))
+
+        await asyncio.to_thread(hub.assign_user_scope, 4, instance_id="party-l5-p2", party_id="p2")
+        await asyncio.sleep(0)
+        meta = hub.connection_meta(socket)
+        assert (meta.instance_id, meta.party_id) == ("party-l5-p2", "p2")
+        assert hub._instances["party-l5-p2"] == frozenset({hub._conn_ids[socket]})
+        assert published == [{"k": "scope", "user_id": 4, "instance_id": "party-l5-p2", "party_id": "p2"}]
+
+        await hub.deliver_remote({"k": "scope", "user_id": 4, "instance_id": "solo-l5-c4", "party_id": None})
+        assert (meta.instance_id, meta.party_id) == ("solo-l5-c4", None)
+        assert "party-l5-p2" not in hub._instances
+        assert hub._parties == {}
+
+    asyncio.run(run())
+
+
+def test_heartbeat_sweep_evicts_idle_sockets_in_batches() -> None:
+    async def run() -> None:
+        hub = RealtimeHub(heartbeat_interval_seconds=0, idle_timeout_seconds=30, idle_reap_batch_size=2)
+        live = GatedSocket()
+        live.gate.set()
+        idle = [GatedSocket() for _ in range(5)]
+        await hub.connect(live, ConnectionMeta(user_id=1, channel_id=3, client_version="1.0.0", zone_level_id=1))
+        for index, socket in enumerate(idle, start=2):
+            await hub.connect(socket, ConnectionMeta(user_id=index, channel_id=3, client_version="1.0.0", zone_level_id=1))
+            hub._connection(socket).last_seen -= 60
+        hub.touch(live)
+        before = zone_runtime_stats()["ws_disconnect_reasons"].get("idle_timeout", 0)
+
+        assert await hub.heartbeat_once() == 5
+        await asyncio.sleep(0)
+        assert await hub.wait_until_drained()
+        assert all(socket.closed_code == 4408 for socket in idle)
+        assert await hub.sockets_for_zone(1, include_adjacent_preview=False) == [live]
+        assert [message["type"] for message in live.messages] == ["heartbeat"]
+        assert zone_runtime_stats()["ws_disconnect_reasons"]["idle_timeout"] == before + 5
+        stats = hub.send_queue_stats()
+        assert stats["idle_evictions_total"] == 5
+        assert stats["heartbeats_sent_total"] == 1
+
+    asyncio.run(run())
+
+
+def test_global_notifications_are_paced_in_waves_with_reconnect_jitter() -> None:
+    async def run() -> None:
+        hub = RealtimeHub(
+            heartbeat_interval_seconds=0,
+            global_notify_rate_per_second=40,
+            global_notify_wave_interval_ms=50,
+            reconnect_jitter_ms=5000,
+        )
+        sockets = [FakeSocket() for _ in range(5)]
+        for index, socket in enumerate(sockets, start=1):
+            await hub.connect(socket, ConnectionMeta(user_id=index, channel_id=None, client_version="1.0.0"))
+
+        await hub.notify_force_update("1.0.1", "content-2", None)
+        assert await hub.wait_until_drained()
+        assert sum(len(socket.messages) for socket in sockets) == 2
+        assert hub.send_queue_stats()["paced_notifications_in_flight"] == 1
+
+        await asyncio.gather(*hub._paced_tasks)
+        assert await hub.wait_until_drained()
+        assert hub.send_queue_stats()["paced_waves_total"] == 3
+        for socket in sockets:
+            [message] = socket.messages
+            assert message["type"] == "force_update"
+            assert 0 <= message["reconnect_after_ms"] <= 5000
+
+        await hub.notify_content_publish_warning(
+            event_id=1, content_version_key="content-2", reason_code="publish", deadline_iso=None, seconds_remaining=30
+        )
+        await asyncio.gather(*hub._paced_tasks)
+        assert await hub.wait_until_drained()
+        assert all("reconnect_after_ms" not in socket.messages[-1] for socket in sockets)
+
+    asyncio.run(run())
+
+
+def test_resumable_stream_replays_missed_frames_or_requests_resync() -> None:
+    async def run() -> None:
+        hub = RealtimeHub(heartbeat_interval_seconds=0, resume_buffer_frames=3, resume_window_seconds=30)
+
+        def meta() -> ConnectionMeta:
+            return ConnectionMeta(user_id=1, channel_id=5, client_version="1.0.0", resumable=True)
+
+        first = FakeSocket()
+        outcome = await hub.connect(first, meta())
+        assert (outcome.status, outcome.last_event_seq) == (RESUME_FRESH, 0)
+        await hub.broadcast(5, {"type": "chat_message", "id": "a"})
+        await hub.broadcast(5, {"type": "chat_message", "id": "b"})
+        assert await hub.wait_until_drained()
+        assert [message["event_seq"] for message in first.messages] == [1, 2]
+
+        await hub.disconnect(first)
+        await hub.broadcast(5, {"type": "chat_message", "id": "c"})
+        assert hub.send_queue_stats()["detached_connections"] == 1
+
+        second = FakeSocket()
+        outcome = await hub.connect(second, meta(), resume_stream=outcome.stream_id, resume_from_seq=1)
+        assert (outcome.status, outcome.last_event_seq, outcome.replayed) == (RESUME_RESUMED, 3, 2)
+        await hub.broadcast(5, {"type": "chat_message", "id": "d"})
+        assert await hub.wait_until_drained()
+        assert second.messages[0]["type"] == "resume_ok"
+        assert [(message["id"], message["event_seq"]) for message in second.messages[1:]] == [("b", 2), ("c", 3), ("d", 4)]
+        assert hub.send_queue_stats()["detached_connections"] == 0
+
+        await hub.disconnect(second)
+        for frame_id in "efgh":
+            await hub.broadcast(5, {"type": "chat_message", "id": frame_id})
+        third = FakeSocket()
+        resync = await hub.connect(third, meta(), resume_stream=outcome.stream_id, resume_from_seq=4)
+        assert (resync.status, resync.last_event_seq) == (RESUME_RESYNC_REQUIRED, 8)
+        fourth = FakeSocket()
+        other_stream = await hub.connect(fourth, meta(), resume_stream="stale", resume_from_seq=8)
+        assert other_stream.status == RESUME_RESYNC_REQUIRED
+        assert await hub.wait_until_drained()
+        assert [message["type"] for message in third.messages] == ["resync_required"]
+        assert third.messages[0]["last_event_seq"] == 8
+
+        await hub.disconnect(third)
+        await hub.disconnect(fourth)
+        await hub.heartbeat_once(now=time.monotonic() + 31)
+        stats = hub.send_queue_stats()
+        assert (stats["resumable_streams"], stats["detached_connections"]) == (0, 0)
+        assert hub._channels == {} and hub._users == {}
+
+    asyncio.run(run())
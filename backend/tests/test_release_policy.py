@@ -1,12 +1,26 @@
+import os
 from datetime import UTC, datetime, timedelta
 
 import pytest
-
-from app.models.release_policy import ReleasePolicy
-from app.services.release_policy import (
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.db.base import Base  # noqa: E402
+from app.models.release_policy import ReleasePolicy  # noqa: E402
+from app.services.release_policy import (  # noqa: E402
     _validate_release_activation_versions,
+    activate_release,
+    current_release_policy_revision,
     evaluate_version,
+    get_release_policy_snapshot,
     next_logical_build_version,
+    reset_release_policy_cache_for_tests,
 )
 
 
@@ -80,3 +94,46 @@ def test_release_activation_allows_regression_with_override() -> None:
         requested_latest="1.0.118",
         allow_version_regression=True,
     )
+
+
+def test_release_policy_snapshot_is_served_from_memory_until_activation() -> None:
+    reset_release_policy_cache_for_tests()
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    db = session_local()
+    db.add(
+        ReleasePolicy(
+            id=1,
+            latest_version="1.0.0",
+            min_supported_version="1.0.0",
+            latest_content_version_key="cv_1",
+            min_supported_content_version_key="cv_1",
+            updated_by="test",
+        )
+    )
+    db.commit()
+
+    first = get_release_policy_snapshot(db)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda _c, _cur, sql, *_rest: statements.append(sql))
+    assert get_release_policy_snapshot(db) is first
+    assert evaluate_version(first, "1.0.0", "cv_1").update_available is False
+    assert statements == []
+
+    activate_release(
+        db,
+        latest_version="1.0.1",
+        min_supported_version="1.0.0",
+        latest_content_version_key="cv_1",
+        min_supported_content_version_key="cv_1",
+        update_feed_url=None,
+        build_release_notes="",
+        user_facing_notes="",
+        grace_minutes=5,
+        updated_by="test",
+    )
+    refreshed = get_release_policy_snapshot(db)
+    assert refreshed.revision == first.revision + 1 == current_release_policy_revision()
+    assert evaluate_version(refreshed, "1.0.0", "cv_1").latest_version == "1.0.1"
+    db.close()
@@ -0,0 +1,112 @@
+import os
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("OPS_API_TOKEN", "test-ops")
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_USER", "test")
+os.environ.setdefault("DB_PASSWORD", "test")
+
+from app.db.base import Base  # noqa: E402
+from app.models.session import UserSession  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.session_touch import SessionTouchBuffer  # noqa: E402
+
+
+def _seed_sessions(count: int):
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    db = session_local()
+    user = User(email="touch@test.com", display_name="Touch", password_hash="x", is_admin=False)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    stale = datetime.now(UTC) - timedelta(hours=2)
+    for index in range(count):
+        db.add(
+            UserSession(
+                id=f"touch-{index}",
+                user_id=user.id,
+                refresh_token_hash=f"hash-{index}",
+                client_version="1.0.0",
+                client_content_version_key="cv_1",
+                expires_at=datetime.now(UTC) + timedelta(hours=1),
+                last_seen_at=stale,
+            )
+        )
+    db.commit()
+    db.close()
+    return engine, session_local
+
+
+def test_touches_coalesce_per_session_and_flush_in_batches() -> None:
+    engine, session_local = _seed_sessions(3)
+    buffer = SessionTouchBuffer(max_batch_size=2)
+    now = datetime.now(UTC)
+    for index in range(3):
+        buffer.record(f"touch-{index}", last_seen_at=now, client_version="1.0.0", client_content_version_key="cv_1")
+    buffer.record("touch-0", last_seen_at=now, client_version="1.0.1", client_content_version_key="cv_2")
+    assert buffer.pending_count() == 3
+
+    updates: list[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda _c, _cur, sql, *_rest: updates.append(sql) if sql.lstrip().upper().startswith("UPDATE") else None,
+    )
+    assert buffer.flush(session_local) == 3
+    assert len(updates) == 2
+    assert buffer.pending_count() == 0
+
+    stats = buffer.snapshot_stats()
+    assert stats["touches_coalesced_total"] == 1
+    assert stats["last_flush_size"] == 3
+    assert stats["last_flush_lag_ms"] >= 0.0
+
+    db = session_local()
+    first = db.get(UserSession, "touch-0")
+    assert first.client_version == "1.0.1"
+    assert first.client_content_version_key == "cv_2"
+    assert first.last_seen_at.replace(tzinfo=UTC) >= now - timedelta(seconds=1)
+    db.close()
+
+
+def test_failed_flush_requeues_touches() -> None:
+    buffer = SessionTouchBuffer()
+    buffer.record("missing", last_seen_at=datetime.now(UTC), client_version="1.0.0", client_content_version_key="cv_1")
+
+    def broken_factory():
+        raise_engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+        return sessionmaker(bind=raise_engine)()
+
+    try:
+        buffer.flush(broken_factory)
+    except Exception:
+        pass
+    else:
+        assert False, "Expected flush failure without a user_sessions table"
+    assert buffer.pending_count() == 1
+    assert buffer.snapshot_stats()["flush_failures_total"] == 1
+
+
+def test_flush_skips_sessions_deleted_since_the_touch() -> None:
+    _, session_local = _seed_sessions(2)
+    buffer = SessionTouchBuffer()
+    now = datetime.now(UTC)
+    for index in range(2):
+        buffer.record(f"touch-{index}", last_seen_at=now, client_version="1.0.2", client_content_version_key="cv_1")
+    db = session_local()
+    db.delete(db.get(UserSession, "touch-1"))
+    db.commit()
+    db.close()
+
+    assert buffer.flush(session_local) == 2
+    assert buffer.pending_count() == 0
+    assert buffer.snapshot_stats()["flush_failures_total"] == 0
+    db = session_local()
+    assert db.get(UserSession, "touch-0").client_version == "1.0.2"
+    db.close()